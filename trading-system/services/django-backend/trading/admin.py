@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Forecast, StrategyConfig
+from .models import Forecast, RiskAssessment, StrategyConfig, Trade
 
 
 @admin.register(Forecast)
@@ -14,3 +14,19 @@ class ForecastAdmin(admin.ModelAdmin):
 class StrategyConfigAdmin(admin.ModelAdmin):
     list_display = ('key', 'value')
     search_fields = ('key',)
+
+
+@admin.register(RiskAssessment)
+class RiskAssessmentAdmin(admin.ModelAdmin):
+    list_display = ('asset', 'horizon', 'approved', 'risk_score', 'position_size', 'timestamp')
+    list_filter = ('approved', 'asset', 'horizon', 'timestamp')
+    search_fields = ('asset',)
+    ordering = ('-timestamp',)
+
+
+@admin.register(Trade)
+class TradeAdmin(admin.ModelAdmin):
+    list_display = ('id', 'asset', 'side', 'filled_size', 'average_fill_price', 'status', 'timestamp')
+    list_filter = ('side', 'status', 'asset', 'timestamp')
+    search_fields = ('asset', 'id', 'forecast_id')
+    ordering = ('-timestamp',)
@@ -0,0 +1,110 @@
+import csv
+import io
+import math
+import atexit
+import threading
+from datetime import timezone as dt_timezone
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from trading_shared.ids import create_id_generator
+from .models import Forecast
+from .notifications import get_redis_client
+
+FORECAST_COPY_COLUMNS = ('id', 'asset', 'horizon', 'prediction', 'confidence', 'timestamp')
+
+_id_generator = None
+_id_generator_lock = threading.Lock()
+
+
+def get_id_generator():
+    """
+    Snowflake id generator of this process, created on first use.
+
+    Forecasts written by the forecast engine carry Snowflake ids, so bulk
+    imports use them too instead of the table's sequence. The generator is
+    created lazily so that every server worker process, once forked, leases
+    its own worker id (unless ID_WORKER_ID is set). The lease is given back
+    when the process exits.
+    """
+    global _id_generator
+    with _id_generator_lock:
+        if _id_generator is None:
+            _id_generator = create_id_generator(settings.ID_WORKER_ID, get_redis_client())
+            atexit.register(_id_generator.close)
+    return _id_generator
+
+
+def parse_forecast_rows(records):
+    """
+    Validate raw forecast dicts into row tuples for bulk insertion.
+
+    This is a lean per-row check instead of ForecastSerializer(many=True),
+    which is too slow for backfills of millions of rows. Forecasts without
+    a timestamp are stamped with the current time. NaN and infinite values
+    are rejected, since float() accepts them and COPY would store them.
+    """
+    if not isinstance(records, list):
+        raise ValidationError('Expected a list of forecasts')
+
+    now = timezone.now()
+    rows = []
+    for index, record in enumerate(records):
+        try:
+            asset = str(record['asset'])
+            horizon = str(record['horizon'])
+            prediction = float(record['prediction'])
+            confidence = float(record['confidence'])
+            timestamp = record.get('timestamp')
+            if timestamp is None:
+                timestamp = now
+            else:
+                timestamp = parse_datetime(timestamp)
+                if timestamp is None:
+                    raise ValueError('invalid timestamp')
+                if timezone.is_naive(timestamp):
+                    timestamp = timezone.make_aware(timestamp, dt_timezone.utc)
+        except KeyError as exc:
+            raise ValidationError({index: f'Missing field {exc}'})
+        except (TypeError, ValueError, AttributeError) as exc:
+            raise ValidationError({index: f'Invalid forecast: {exc}'})
+
+        if len(asset) > 20 or len(horizon) > 10:
+            raise ValidationError({index: 'asset or horizon is too long'})
+        if not (math.isfinite(prediction) and math.isfinite(confidence)):
+            raise ValidationError({index: 'prediction and confidence must be finite numbers'})
+
+        rows.append((asset, horizon, prediction, confidence, timestamp))
+    return rows
+
+
+def copy_forecasts(rows):
+    """Insert forecast rows with new Snowflake ids in one transaction, via COPY on PostgreSQL"""
+    if not rows:
+        return 0
+
+    ids = get_id_generator()
+    rows = [(ids.next_id(),) + row for row in rows]
+
+    table = Forecast._meta.db_table
+    columns = ', '.join(FORECAST_COPY_COLUMNS)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for forecast_id, asset, horizon, prediction, confidence, timestamp in rows:
+                writer.writerow((forecast_id, asset, horizon, prediction, confidence, timestamp.isoformat()))
+            buffer.seek(0)
+
+            cursor.cursor.copy_expert(
+                f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES (%s, %s, %s, %s, %s, %s)", rows
+            )
+
+    return len(rows)
@@ -0,0 +1,43 @@
+import django_filters
+from .models import Forecast, ForecastDaily, ForecastHourly, RiskAssessment, Trade
+
+
+class ForecastFilter(django_filters.FilterSet):
+    since = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='gte')
+    until = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='lt')
+
+    class Meta:
+        model = Forecast
+        fields = ['asset', 'horizon', 'since', 'until']
+
+
+class ForecastHourlyFilter(django_filters.FilterSet):
+    since = django_filters.IsoDateTimeFilter(field_name='bucket', lookup_expr='gte')
+    until = django_filters.IsoDateTimeFilter(field_name='bucket', lookup_expr='lt')
+
+    class Meta:
+        model = ForecastHourly
+        fields = ['asset', 'horizon', 'since', 'until']
+
+
+class ForecastDailyFilter(ForecastHourlyFilter):
+    class Meta(ForecastHourlyFilter.Meta):
+        model = ForecastDaily
+
+
+class RiskAssessmentFilter(django_filters.FilterSet):
+    since = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='gte')
+    until = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='lt')
+
+    class Meta:
+        model = RiskAssessment
+        fields = ['forecast_id', 'asset', 'horizon', 'approved', 'since', 'until']
+
+
+class TradeFilter(django_filters.FilterSet):
+    since = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='gte')
+    until = django_filters.IsoDateTimeFilter(field_name='timestamp', lookup_expr='lt')
+
+    class Meta:
+        model = Trade
+        fields = ['forecast_id', 'asset', 'side', 'status', 'since', 'until']
@@ -0,0 +1,149 @@
+# Generated by Django 4.2.16 on 2026-10-18 01:14
+
+from django.db import migrations, models
+
+# Raw forecasts older than this are dropped; the aggregates are kept
+RETENTION = "INTERVAL '90 days'"
+
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS timescaledb",
+    # Unique constraints on a hypertable must include the partitioning column
+    "ALTER TABLE trading_forecast DROP CONSTRAINT trading_forecast_pkey",
+    "ALTER TABLE trading_forecast ADD PRIMARY KEY (id, timestamp)",
+    """
+    SELECT create_hypertable(
+        'trading_forecast', 'timestamp',
+        chunk_time_interval => INTERVAL '1 day',
+        create_default_indexes => FALSE,
+        migrate_data => TRUE
+    )
+    """,
+    f"SELECT add_retention_policy('trading_forecast', {RETENTION})",
+]
+
+for view, bucket, start_offset, schedule in [
+    ('trading_forecast_hourly', '1 hour', '3 hours', '30 minutes'),
+    ('trading_forecast_daily', '1 day', '3 days', '1 hour'),
+]:
+    FORWARD_SQL += [
+        f"""
+        CREATE MATERIALIZED VIEW {view}
+        WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+        SELECT time_bucket(INTERVAL '{bucket}', timestamp) AS bucket,
+               asset,
+               horizon,
+               count(*) AS forecast_count,
+               avg(prediction) AS avg_prediction,
+               min(prediction) AS min_prediction,
+               max(prediction) AS max_prediction,
+               avg(confidence) AS avg_confidence
+        FROM trading_forecast
+        GROUP BY bucket, asset, horizon
+        WITH NO DATA
+        """,
+        f"CREATE INDEX {view}_asset_bucket_idx ON {view} (asset, bucket DESC)",
+        f"""
+        SELECT add_continuous_aggregate_policy('{view}',
+            start_offset => INTERVAL '{start_offset}',
+            end_offset => INTERVAL '1 hour',
+            schedule_interval => INTERVAL '{schedule}'
+        )
+        """,
+    ]
+
+# A hypertable cannot have a primary key without its partitioning column, so
+# the rows are copied back into a plain table with the single-column primary
+# key of 0001. Its other indexes are recreated from their old definitions
+REVERSE_SQL = [
+    "DROP MATERIALIZED VIEW IF EXISTS trading_forecast_daily",
+    "DROP MATERIALIZED VIEW IF EXISTS trading_forecast_hourly",
+    "SELECT remove_retention_policy('trading_forecast', if_exists => TRUE)",
+    "CREATE TABLE trading_forecast_plain (LIKE trading_forecast INCLUDING DEFAULTS INCLUDING IDENTITY)",
+    "INSERT INTO trading_forecast_plain SELECT * FROM trading_forecast",
+    "DROP TABLE trading_forecast",
+    "ALTER TABLE trading_forecast_plain RENAME TO trading_forecast",
+    "ALTER TABLE trading_forecast ADD CONSTRAINT trading_forecast_pkey PRIMARY KEY (id)",
+    """
+    SELECT setval(pg_get_serial_sequence('trading_forecast', 'id'), COALESCE(MAX(id), 0) + 1, false)
+    FROM trading_forecast
+    """,
+]
+
+
+def timescaledb_available(schema_editor):
+    """Only PostgreSQL servers with the TimescaleDB extension get the hypertable"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb'")
+        return cursor.fetchone() is not None
+
+
+def create_hypertable(apps, schema_editor):
+    if not timescaledb_available(schema_editor):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in FORWARD_SQL:
+            cursor.execute(statement)
+
+
+def restore_plain_table(apps, schema_editor):
+    if not timescaledb_available(schema_editor):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = 'trading_forecast' AND indexname <> 'trading_forecast_pkey'"
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        for statement in REVERSE_SQL + indexes:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    # Continuous aggregates cannot be created inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('trading', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_hypertable, restore_plain_table),
+        migrations.CreateModel(
+            name='ForecastDaily',
+            fields=[
+                ('bucket', models.DateTimeField(primary_key=True, serialize=False)),
+                ('asset', models.CharField(max_length=20)),
+                ('horizon', models.CharField(max_length=10)),
+                ('forecast_count', models.BigIntegerField()),
+                ('avg_prediction', models.FloatField()),
+                ('min_prediction', models.FloatField()),
+                ('max_prediction', models.FloatField()),
+                ('avg_confidence', models.FloatField()),
+            ],
+            options={
+                'db_table': 'trading_forecast_daily',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ForecastHourly',
+            fields=[
+                ('bucket', models.DateTimeField(primary_key=True, serialize=False)),
+                ('asset', models.CharField(max_length=20)),
+                ('horizon', models.CharField(max_length=10)),
+                ('forecast_count', models.BigIntegerField()),
+                ('avg_prediction', models.FloatField()),
+                ('min_prediction', models.FloatField()),
+                ('max_prediction', models.FloatField()),
+                ('avg_confidence', models.FloatField()),
+            ],
+            options={
+                'db_table': 'trading_forecast_hourly',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-18 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0002_forecast_hypertable'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='forecast',
+            index=models.Index(fields=['timestamp', 'id'], name='forecast_ts_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='forecast',
+            index=models.Index(fields=['asset', 'timestamp', 'id'], name='forecast_asset_ts_id_idx'),
+        ),
+    ]
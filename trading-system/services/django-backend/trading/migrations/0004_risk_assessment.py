@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-18 01:26
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0003_forecast_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RiskAssessment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset', models.CharField(max_length=20)),
+                ('horizon', models.CharField(max_length=10)),
+                ('prediction', models.FloatField()),
+                ('confidence', models.FloatField()),
+                ('approved', models.BooleanField()),
+                ('risk_score', models.FloatField()),
+                ('position_size', models.FloatField()),
+                ('portfolio_var', models.FloatField(blank=True, null=True)),
+                ('portfolio_cvar', models.FloatField(blank=True, null=True)),
+                ('marginal_var', models.FloatField(blank=True, null=True)),
+                ('reasons', models.JSONField(default=list)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['timestamp', 'id'], name='riskassessment_ts_id_idx'), models.Index(fields=['asset', 'timestamp', 'id'], name='riskassessment_asset_ts_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.16 on 2026-10-18 01:28
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0004_risk_assessment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='riskassessment',
+            name='forecast_id',
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Trade',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('forecast_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('asset', models.CharField(max_length=20)),
+                ('horizon', models.CharField(blank=True, max_length=10, null=True)),
+                ('side', models.CharField(choices=[('BUY', 'Buy'), ('SELL', 'Sell')], max_length=4)),
+                ('ordered_size', models.FloatField()),
+                ('filled_size', models.FloatField()),
+                ('ordered_price', models.FloatField()),
+                ('average_fill_price', models.FloatField()),
+                ('status', models.CharField(max_length=20)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['timestamp', 'id'], name='trade_ts_id_idx'), models.Index(fields=['asset', 'timestamp', 'id'], include=('side', 'filled_size', 'average_fill_price'), name='trade_asset_ts_pnl_idx')],
+            },
+        ),
+    ]
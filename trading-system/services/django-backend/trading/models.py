@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Forecast(models.Model):
@@ -8,6 +9,13 @@ class Forecast(models.Model):
     confidence = models.FloatField()
     timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination on (timestamp, id), optionally filtered by asset
+            models.Index(fields=['timestamp', 'id'], name='forecast_ts_id_idx'),
+            models.Index(fields=['asset', 'timestamp', 'id'], name='forecast_asset_ts_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.asset} - {self.horizon} - {self.prediction} ({self.timestamp})"
 
@@ -18,3 +26,109 @@ class StrategyConfig(models.Model):
 
     def __str__(self):
         return f"{self.key}: {self.value}"
+
+
+class RiskAssessment(models.Model):
+    """Audit trail of risk engine decisions, written in batches by the risk engine"""
+    forecast_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    asset = models.CharField(max_length=20)
+    horizon = models.CharField(max_length=10)
+    prediction = models.FloatField()
+    confidence = models.FloatField()
+    approved = models.BooleanField()
+    risk_score = models.FloatField()
+    position_size = models.FloatField()
+    portfolio_var = models.FloatField(null=True, blank=True)
+    portfolio_cvar = models.FloatField(null=True, blank=True)
+    marginal_var = models.FloatField(null=True, blank=True)
+    reasons = models.JSONField(default=list)
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='riskassessment_ts_id_idx'),
+            models.Index(fields=['asset', 'timestamp', 'id'], name='riskassessment_asset_ts_idx'),
+        ]
+
+    def __str__(self):
+        status = 'approved' if self.approved else 'rejected'
+        return f"{self.asset} - {self.horizon} - {status} ({self.timestamp})"
+
+
+class Trade(models.Model):
+    """
+    Executions reported by lean-execution.
+
+    Ids are Snowflake ids generated by the execution service (time-ordered,
+    unique across workers). forecast_id refers to Forecast.id; it is not a
+    foreign key because the forecast hypertable's primary key includes the
+    timestamp.
+    """
+    SIDE_CHOICES = [
+        ('BUY', 'Buy'),
+        ('SELL', 'Sell'),
+    ]
+
+    id = models.BigIntegerField(primary_key=True)
+    forecast_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    asset = models.CharField(max_length=20)
+    horizon = models.CharField(max_length=10, null=True, blank=True)
+    side = models.CharField(max_length=4, choices=SIDE_CHOICES)
+    ordered_size = models.FloatField()
+    filled_size = models.FloatField()
+    ordered_price = models.FloatField()
+    average_fill_price = models.FloatField()
+    status = models.CharField(max_length=20)
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='trade_ts_id_idx'),
+            # Per-asset P&L: covers the columns needed without visiting the table
+            models.Index(
+                fields=['asset', 'timestamp', 'id'],
+                include=['side', 'filled_size', 'average_fill_price'],
+                name='trade_asset_ts_pnl_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.asset} - {self.side} {self.filled_size} @ {self.average_fill_price} ({self.timestamp})"
+
+
+class ForecastAggregate(models.Model):
+    """
+    Pre-rolled forecast statistics per asset, horizon and time bucket.
+
+    Backed by TimescaleDB continuous aggregates over the trading_forecast
+    hypertable (see migration 0002), so these models are read-only.
+
+    Django needs a primary key, but `bucket` is not unique: a row is
+    identified by (bucket, asset, horizon). Never look rows up, save or
+    delete them by pk. The API only lists them, paginated on that key.
+    """
+    bucket = models.DateTimeField(primary_key=True)
+    asset = models.CharField(max_length=20)
+    horizon = models.CharField(max_length=10)
+    forecast_count = models.BigIntegerField()
+    avg_prediction = models.FloatField()
+    min_prediction = models.FloatField()
+    max_prediction = models.FloatField()
+    avg_confidence = models.FloatField()
+
+    class Meta:
+        abstract = True
+        managed = False
+
+    def __str__(self):
+        return f"{self.asset} - {self.horizon} - {self.avg_prediction} ({self.bucket})"
+
+
+class ForecastHourly(ForecastAggregate):
+    class Meta(ForecastAggregate.Meta):
+        db_table = 'trading_forecast_hourly'
+
+
+class ForecastDaily(ForecastAggregate):
+    class Meta(ForecastAggregate.Meta):
+        db_table = 'trading_forecast_daily'
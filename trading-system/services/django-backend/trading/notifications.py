@@ -0,0 +1,46 @@
+import json
+import logging
+import redis
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Must match risk-engine/strategy_config.py
+STRATEGY_CONFIG_CHANNEL = 'strategy_config'
+STRATEGY_CONFIG_VERSION_KEY = 'strategy_config:version'
+
+_redis_client = None
+
+
+def get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL)
+    return _redis_client
+
+
+def publish_strategy_config(changes):
+    """
+    Announce changed strategy config values to the trading services.
+
+    The version counter is incremented first, so subscribers can drop
+    notifications older than what they already applied. Notifications
+    carry only the changed keys. A service that sees the version jump by
+    more than one reloads the whole table. Failures are logged and not
+    raised: the database row is already saved, and services also reload
+    the table every STRATEGY_CONFIG_RELOAD_INTERVAL seconds.
+    """
+    try:
+        client = get_redis_client()
+        version = client.incr(STRATEGY_CONFIG_VERSION_KEY)
+        message = {
+            'version': version,
+            'config': {key: str(value) for key, value in changes.items()},
+            'timestamp': timezone.now().isoformat()
+        }
+        client.publish(STRATEGY_CONFIG_CHANNEL, json.dumps(message))
+        return version
+    except redis.RedisError as e:
+        logger.error(f"Failed to publish strategy config change: {e}")
+        return None
@@ -0,0 +1,116 @@
+import base64
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on the columns in `key_fields`.
+
+    Each page is fetched with a range condition on the key instead of an
+    OFFSET, so the cost of a page depends on the page size, not on how far
+    into the table it is. The first key field is a datetime, and the key
+    must be unique. Results are newest first unless the request asks for
+    ?ordering=<first key field>. `key_types` parses each key field back from
+    the cursor.
+    """
+    key_fields = ()
+    key_types = ()
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 100
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ascending = request.query_params.get('ordering') == self.key_fields[0]
+
+        if self.ascending:
+            queryset = queryset.order_by(*self.key_fields)
+        else:
+            queryset = queryset.order_by(*(f'-{field}' for field in self.key_fields))
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self.after(cursor))
+
+        # Fetch one extra row to know whether there is a next page
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def after(self, cursor):
+        """Condition for the rows that come after `cursor` in the page order"""
+        lookup = 'gt' if self.ascending else 'lt'
+        condition = Q()
+        for i, field in enumerate(self.key_fields):
+            equal = dict(zip(self.key_fields[:i], cursor[:i]))
+            condition |= Q(**equal, **{f'{field}__{lookup}': cursor[i]})
+        return condition
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8').split('|')
+            if len(values) != len(self.key_fields):
+                raise ValueError(encoded)
+            cursor = [parse(value) for parse, value in zip(self.key_types, values)]
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in cursor):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, instance):
+        values = [getattr(instance, field) for field in self.key_fields]
+        raw = '|'.join(value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in values)
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class TimestampKeysetPagination(KeysetPagination):
+    """Keyset pagination on (timestamp, id), served by the composite indexes of the tables"""
+    key_fields = ('timestamp', 'id')
+    key_types = (parse_datetime, int)
+
+
+class BucketKeysetPagination(KeysetPagination):
+    """Keyset pagination of the forecast aggregates, whose rows are unique per (bucket, asset, horizon)"""
+    key_fields = ('bucket', 'asset', 'horizon')
+    key_types = (parse_datetime, str, str)
@@ -1,12 +1,57 @@
 from rest_framework import serializers
-from .models import Forecast, StrategyConfig
+from rest_framework.permissions import SAFE_METHODS
+from .models import Forecast, ForecastDaily, ForecastHourly, RiskAssessment, StrategyConfig, Trade
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """Limits the serialized fields to the comma-separated ?fields= query parameter of read requests"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # On writes the parameter is ignored, so it cannot drop fields from validation
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        requested = request.query_params.get('fields')
+        if requested:
+            allowed = set(requested.split(','))
+            for field_name in set(self.fields) - allowed:
+                self.fields.pop(field_name)
+
+class ForecastSerializer(DynamicFieldsModelSerializer):
+    # Snowflake ids exceed JavaScript's safe integer range, so they are sent as strings
+    id = serializers.CharField(read_only=True)
 
-class ForecastSerializer(serializers.ModelSerializer):
     class Meta:
         model = Forecast
         fields = '__all__'
         read_only_fields = ('timestamp',)
 
+class ForecastHourlySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ForecastHourly
+        fields = '__all__'
+
+class ForecastDailySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ForecastDaily
+        fields = '__all__'
+
+class RiskAssessmentSerializer(serializers.ModelSerializer):
+    forecast_id = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = RiskAssessment
+        fields = '__all__'
+
+class TradeSerializer(serializers.ModelSerializer):
+    id = serializers.CharField(read_only=True)
+    forecast_id = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Trade
+        fields = '__all__'
+
 class StrategyConfigSerializer(serializers.ModelSerializer):
     class Meta:
         model = StrategyConfig
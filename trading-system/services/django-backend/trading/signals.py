@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import StrategyConfig
+from .notifications import publish_strategy_config
+
+
+@receiver(post_save, sender=StrategyConfig)
+def strategy_config_saved(sender, instance, **kwargs):
+    """Notify the trading services once the change is committed"""
+    changes = {instance.key: instance.value}
+    transaction.on_commit(lambda: publish_strategy_config(changes))
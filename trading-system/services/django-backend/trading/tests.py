@@ -1,3 +1,119 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from trading_shared.ids import MAX_WORKER_ID
+from . import bulk
+from .models import Forecast
 
-# Create your tests here.
+
+class AuthenticatedTestCase(APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user('trader', password='secret')
+        self.client.force_authenticate(user)
+
+
+class ForecastPaginationTests(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        start = timezone.now() - timedelta(days=1)
+        # Two forecasts per timestamp, so pages must break ties on the id
+        for i in range(7):
+            forecast = Forecast.objects.create(asset='BTCUSD', horizon='1h', prediction=0.01 * i, confidence=0.8)
+            Forecast.objects.filter(pk=forecast.pk).update(timestamp=start + timedelta(hours=i // 2))
+
+    def collect(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [int(row['id']) for row in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_pages_cover_every_forecast_once_newest_first(self):
+        ids = self.collect(reverse('forecast-list-create') + '?page_size=2')
+        expected = list(Forecast.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_pages_oldest_first(self):
+        ids = self.collect(reverse('forecast-list-create') + '?page_size=3&ordering=timestamp')
+        expected = list(Forecast.objects.order_by('timestamp', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_invalid_cursor_is_not_found(self):
+        url = reverse('forecast-list-create')
+        for cursor in ['not-base64!', 'YWJj', 'bm90LWEtZGF0ZXwx']:
+            response = self.client.get(url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+
+    def test_fields_limit_reads(self):
+        response = self.client.get(reverse('forecast-list-create'), {'fields': 'asset,prediction'})
+        self.assertEqual(set(response.data['results'][0]), {'asset', 'prediction'})
+
+    def test_fields_are_ignored_on_writes(self):
+        url = reverse('forecast-list-create') + '?fields=asset'
+        response = self.client.post(url, {'asset': 'ETHUSD', 'horizon': '1h'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('prediction', response.data)
+
+        response = self.client.post(
+            url, {'asset': 'ETHUSD', 'horizon': '1h', 'prediction': 0.02, 'confidence': 0.9}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('confidence', response.data)
+
+
+@override_settings(ID_WORKER_ID=7)
+class ForecastBulkTests(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        # The generator is created once per process; make it pick up the test's worker id
+        bulk._id_generator = None
+        self.addCleanup(setattr, bulk, '_id_generator', None)
+        self.url = reverse('forecast-bulk-create')
+
+    def test_json_import_with_snowflake_ids(self):
+        forecasts = [
+            {'asset': 'BTCUSD', 'horizon': '1h', 'prediction': 0.01, 'confidence': 0.9},
+            {'asset': 'ETHUSD', 'horizon': '4h', 'prediction': -0.02, 'confidence': 0.8,
+             'timestamp': '2024-01-01T00:00:00'},
+        ]
+        response = self.client.post(self.url, forecasts, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'created': 2})
+        ids = list(Forecast.objects.order_by('id').values_list('id', flat=True))
+        self.assertEqual(len(ids), 2)
+        self.assertTrue(all((i >> 12) & MAX_WORKER_ID == 7 for i in ids))
+        self.assertEqual(Forecast.objects.get(asset='ETHUSD').timestamp.isoformat(), '2024-01-01T00:00:00+00:00')
+
+    def test_ndjson_import(self):
+        lines = [json.dumps({'asset': 'BTCUSD', 'horizon': '1h', 'prediction': 0.01 * i, 'confidence': 0.9})
+                 for i in range(3)]
+        response = self.client.post(self.url, '\n'.join(lines) + '\n', content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Forecast.objects.count(), 3)
+
+    def test_non_finite_values_reject_the_whole_import(self):
+        valid = {'asset': 'BTCUSD', 'horizon': '1h', 'prediction': 0.01, 'confidence': 0.9}
+        for invalid in [{'prediction': 'NaN'}, {'confidence': 'inf'}]:
+            response = self.client.post(self.url, [valid, {**valid, **invalid}], format='json')
+            self.assertEqual(response.status_code, 400, invalid)
+            self.assertIn('1', response.json())
+
+        # json.loads accepts a bare NaN, so NDJSON relies on the same check
+        body = json.dumps(valid) + '\n' + '{"asset": "BTCUSD", "horizon": "1h", "prediction": NaN, "confidence": 0.9}\n'
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+
+        self.assertFalse(Forecast.objects.exists())
+
+    def test_missing_field_is_reported_by_index(self):
+        response = self.client.post(self.url, [{'asset': 'BTCUSD', 'horizon': '1h', 'prediction': 0.01}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('confidence', str(response.json()['0']))
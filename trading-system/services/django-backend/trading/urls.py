@@ -3,6 +3,11 @@ from . import views
 
 urlpatterns = [
     path('forecasts/', views.ForecastListCreateView.as_view(), name='forecast-list-create'),
+    path('forecasts/bulk/', views.ForecastBulkCreateView.as_view(), name='forecast-bulk-create'),
+    path('forecasts/hourly/', views.ForecastHourlyListView.as_view(), name='forecast-hourly-list'),
+    path('forecasts/daily/', views.ForecastDailyListView.as_view(), name='forecast-daily-list'),
+    path('risk/assessments/', views.RiskAssessmentListView.as_view(), name='risk-assessment-list'),
+    path('trades/', views.TradeListView.as_view(), name='trade-list'),
     path('strategy/config/', views.StrategyConfigListView.as_view(), name='strategy-config-list'),
     path('strategy/config/<str:key>/', views.StrategyConfigDetailView.as_view(), name='strategy-config-detail'),
     path('strategy/config/<str:key>/update/', views.StrategyConfigUpdateView.as_view(), name='strategy-config-update'),
@@ -2,19 +2,84 @@ from django.shortcuts import render
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .models import Forecast, StrategyConfig
-from .serializers import ForecastSerializer, StrategyConfigSerializer
+from .bulk import copy_forecasts, parse_forecast_rows
+from .filters import ForecastDailyFilter, ForecastFilter, ForecastHourlyFilter, RiskAssessmentFilter, TradeFilter
+from .models import Forecast, ForecastDaily, ForecastHourly, RiskAssessment, StrategyConfig, Trade
+from .pagination import BucketKeysetPagination, TimestampKeysetPagination
+from .parsers import NDJSONParser
+from .serializers import (
+    ForecastDailySerializer, ForecastHourlySerializer, ForecastSerializer,
+    RiskAssessmentSerializer, StrategyConfigSerializer, TradeSerializer
+)
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import JSONParser
 
 
 class ForecastListCreateView(generics.ListCreateAPIView):
     queryset = Forecast.objects.all()
     serializer_class = ForecastSerializer
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
-    filterset_fields = ['asset', 'horizon']
-    ordering_fields = ['timestamp']
-    ordering = ['-timestamp']
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ForecastFilter
+    # Ordering (?ordering=timestamp for oldest first) is applied by the paginator
+    pagination_class = TimestampKeysetPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        # Only load the requested columns (plus the pagination key)
+        fields = self.request.query_params.get('fields')
+        if self.request.method == 'GET' and fields:
+            model_fields = {field.name for field in Forecast._meta.get_fields()}
+            columns = (set(fields.split(',')) & model_fields) | {'id', 'timestamp'}
+            queryset = queryset.only(*columns)
+
+        return queryset
+
+
+class ForecastBulkCreateView(APIView):
+    """Bulk ingest of forecasts as a JSON array or NDJSON, written with COPY in one transaction"""
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request):
+        rows = parse_forecast_rows(request.data)
+        created = copy_forecasts(rows)
+        return Response({'created': created}, status=status.HTTP_201_CREATED)
+
+
+class ForecastHourlyListView(generics.ListAPIView):
+    """Hourly forecast aggregates, newest bucket first (?ordering=bucket for oldest first)"""
+    queryset = ForecastHourly.objects.all()
+    serializer_class = ForecastHourlySerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ForecastHourlyFilter
+    pagination_class = BucketKeysetPagination
+
+
+class ForecastDailyListView(generics.ListAPIView):
+    """Daily forecast aggregates, newest bucket first (?ordering=bucket for oldest first)"""
+    queryset = ForecastDaily.objects.all()
+    serializer_class = ForecastDailySerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ForecastDailyFilter
+    pagination_class = BucketKeysetPagination
+
+
+class RiskAssessmentListView(generics.ListAPIView):
+    """Risk engine decisions, newest first (?approved=false for rejections only)"""
+    queryset = RiskAssessment.objects.all()
+    serializer_class = RiskAssessmentSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = RiskAssessmentFilter
+    pagination_class = TimestampKeysetPagination
+
+
+class TradeListView(generics.ListAPIView):
+    """Executions, newest first (?forecast_id= for the trades of one forecast)"""
+    queryset = Trade.objects.all()
+    serializer_class = TradeSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TradeFilter
+    pagination_class = TimestampKeysetPagination
 
 
 class StrategyConfigListView(generics.ListAPIView):
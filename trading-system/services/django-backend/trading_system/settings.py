@@ -85,7 +85,7 @@ from decouple import config
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': config('DB_ENGINE', default='django.db.backends.postgresql'),
         'NAME': config('DB_NAME', default='tradingdb'),
         'USER': config('DB_USER', default='trader'),
         'PASSWORD': config('DB_PASS', default='secure_password_change_me'),
@@ -155,9 +155,15 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Redis (Celery broker and strategy config notifications)
+REDIS_URL = f"redis://:{config('REDIS_PASSWORD', default='redis_password')}@{config('REDIS_HOST', default='redis')}:{config('REDIS_PORT', default='6379')}"
+
+# Snowflake worker id for bulk-imported forecasts; empty = leased from Redis per process
+ID_WORKER_ID = config('ID_WORKER_ID', default=None, cast=lambda v: int(v) if v else None)
+
 # Celery Configuration
-CELERY_BROKER_URL = f"redis://:{config('REDIS_PASSWORD', default='redis_password')}@{config('REDIS_HOST', default='redis')}:{config('REDIS_PORT', default='6379')}"
-CELERY_RESULT_BACKEND = f"redis://:{config('REDIS_PASSWORD', default='redis_password')}@{config('REDIS_HOST', default='redis')}:{config('REDIS_PORT', default='6379')}"
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
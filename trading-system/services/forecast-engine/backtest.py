@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Backtests of the forecast -> risk -> execution chain over stored bars.
+
+    python backtest.py --assets BTCUSD ETHUSD --days 365 --set risk_factor=0.8
+
+prepare() runs the expensive, parameter-independent part once. It loads
+the bars, builds features with MarketData.engineer_features and
+predicts every bar in one call to a model trained on the bars before the
+backtest period. It also computes the realized volatility the risk engine
+would have seen. simulate() then applies the per-forecast risk rules
+(risk_batch, the vectorized checks of RiskEngine.evaluate_forecast_risk)
+and the execution sizing (position_size * 1000 units, like LeanExecutionEngine.build_order)
+for one parameter set. It only uses array operations, so evaluating
+another parameter set over a year of hourly bars takes milliseconds.
+
+Each approved forecast opens a position at the bar close and closes it
+one horizon later. Its P&L is booked at the exit bar. The drawdown limit
+depends on the P&L path, so the vectorized mode ignores it. The
+event-driven mode walks the bars in time order and rejects trades while
+the equity drawdown exceeds max_drawdown_limit. This is the backtest's
+own equity, not the live engine's portfolio drawdown.
+
+The portfolio gates of the live engine are not simulated: there is no
+portfolio VaR limit, and approved trades are not booked as exposure, so
+open positions never block a later trade. The metrics are therefore an
+optimistic bound on the live chain, and parameter sets that rely on the
+portfolio gates (e.g. a high risk_factor) are not ranked fairly.
+"""
+
+import logging
+import argparse
+from collections import deque, namedtuple
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from trading_shared.risk_batch import evaluate_risk_batch, ewma_volatility
+from features import FEATURE_COLUMNS, HORIZON_BARS, target_column
+from market_data import MarketData
+from model_backends import DEFAULT_BACKEND, MODEL_BACKENDS
+from training import fit_model
+
+logger = logging.getLogger(__name__)
+
+# LeanExecutionEngine.build_order: order size = position_size * 1000
+ORDER_UNITS = 1000
+
+# Defaults of init_strategy_config
+DEFAULT_PARAMETERS = {
+    'risk_factor': 1.0,
+    'position_size_limit': 0.1,
+    'confidence_threshold': 0.7,
+    'max_drawdown_limit': 0.05,
+    'volatility_multiplier': 1.0,
+}
+
+# Per-bar inputs of a backtest, as equally long arrays in time order
+BacktestData = namedtuple('BacktestData', [
+    'timestamps', 'exit_timestamps', 'assets', 'asset_names', 'closes',
+    'price_changes', 'predictions', 'confidences', 'volatilities'
+])
+
+BacktestResult = namedtuple('BacktestResult', ['metrics', 'trades', 'equity'])
+
+
+def performance_metrics(equity, pnl, approved, capital, periods_per_year=24 * 365):
+    """Summary statistics of a simulated run (without the live portfolio VaR and drawdown gates, see module docstring)"""
+    equity = np.concatenate(([capital], equity))
+    returns = np.diff(equity) / equity[:-1]
+    peak = np.maximum.accumulate(equity)
+    trades = int(approved.sum())
+    std = returns.std() if len(returns) > 1 else 0.0
+
+    return {
+        'trades': trades,
+        'approval_rate': trades / len(approved) if len(approved) else 0.0,
+        'total_pnl': float(equity[-1] - capital),
+        'total_return': float(equity[-1] / capital - 1),
+        'sharpe': float(returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0,
+        'max_drawdown': float(np.max(1 - equity / peak)),
+        'hit_rate': float((pnl[approved] > 0).mean()) if trades else 0.0,
+    }
+
+
+def simulate(data, params=None, capital=100000.0, cost_bps=0.0, mode='vectorized'):
+    """
+    Apply risk rules and execution sizing to prepared data for one parameter set.
+
+    Returns a dict with the per-bar approved mask, position sizes and P&L,
+    the equity at every exit timestamp and the performance metrics.
+    """
+    params = {**DEFAULT_PARAMETERS, **(params or {})}
+    risk = evaluate_risk_batch(
+        data.predictions, data.confidences, data.volatilities,
+        risk_factor=params['risk_factor'],
+        position_size_limit=params['position_size_limit'],
+        confidence_threshold=params['confidence_threshold'],
+        volatility_multiplier=params['volatility_multiplier']
+    )
+
+    units = risk['position_size'] * ORDER_UNITS
+    trade_pnl = (
+        np.sign(data.predictions) * units * data.price_changes
+        - units * data.closes * cost_bps / 10000
+    )
+
+    if mode == 'event':
+        approved = _drawdown_gate(data, risk['approved'], trade_pnl, capital, params['max_drawdown_limit'])
+    elif mode == 'vectorized':
+        approved = risk['approved']
+    else:
+        raise ValueError(f"Unknown backtest mode: {mode}")
+
+    pnl = np.where(approved, trade_pnl, 0.0)
+
+    # Book the P&L at the exit bar and accumulate it per exit timestamp
+    equity_times, slots = np.unique(data.exit_timestamps, return_inverse=True)
+    equity = capital + np.cumsum(np.bincount(slots, weights=pnl, minlength=len(equity_times)))
+
+    return {
+        'approved': approved,
+        'position_size': risk['position_size'],
+        'risk_score': risk['risk_score'],
+        'pnl': pnl,
+        'equity_times': equity_times,
+        'equity': equity,
+        'metrics': performance_metrics(equity, trade_pnl, approved, capital),
+    }
+
+
+def _drawdown_gate(data, approved, trade_pnl, capital, max_drawdown_limit):
+    """Event-driven pass: reject trades while the drawdown of the booked equity exceeds the limit"""
+    gated = np.zeros_like(approved)
+    open_trades = deque()  # (exit timestamp, pnl), in entry order
+    equity = peak = capital
+    exits = data.exit_timestamps
+
+    for i in np.flatnonzero(approved):
+        now = data.timestamps[i]
+        # Book every trade that has closed by now
+        while open_trades and open_trades[0][0] <= now:
+            equity += open_trades.popleft()[1]
+            peak = max(peak, equity)
+
+        if 1 - equity / peak > max_drawdown_limit:
+            continue
+        gated[i] = True
+        open_trades.append((exits[i], trade_pnl[i]))
+    return gated
+
+
+class Backtester:
+    """Replays stored bars through the forecast engine's features, a model and the risk rules"""
+
+    def __init__(self, market_data, capital=100000.0, cost_bps=0.0, volatility_decay=0.94,
+                 volatility_min_periods=10, default_volatility=0.025, seed=42, backend=DEFAULT_BACKEND):
+        self.market_data = market_data
+        self.backend = backend
+        self.capital = capital
+        self.cost_bps = cost_bps
+        self.volatility_decay = volatility_decay
+        self.volatility_min_periods = volatility_min_periods
+        self.default_volatility = default_volatility
+        self.seed = seed
+        self.data = None
+
+    def load_bars(self, asset, start, end):
+        """Bars with start < timestamp <= end, from the bar store or synthetic"""
+        if self.market_data.bar_store.has_data(asset):
+            return self.market_data.bar_store.read_bars(asset, start=start, end=end)
+        if not self.market_data.synthetic_data:
+            raise ValueError(f"No market data stored for {asset}")
+
+        logger.warning(f"No market data stored for {asset}, using synthetic data")
+        days = (datetime.utcnow() - start).days + 1
+        df = self.market_data.generate_synthetic_data(asset, days)
+        return df[(df['timestamp'] > start) & (df['timestamp'] <= end)].reset_index(drop=True)
+
+    def prepare_asset(self, asset, start, end, horizon, train_days):
+        """Features, out-of-sample predictions and risk inputs for one asset"""
+        # One extra week so the rolling features are complete at the start of training
+        df = self.load_bars(asset, start - timedelta(days=train_days + 7), end)
+        bars = HORIZON_BARS[horizon]
+        df['price_change'] = df['close'].shift(-bars) - df['close']
+        df['exit_timestamp'] = df['timestamp'].shift(-bars)
+        df['risk_volatility'] = np.concatenate((
+            [self.default_volatility],
+            ewma_volatility(
+                df['close'].pct_change().to_numpy()[1:],
+                decay=self.volatility_decay,
+                min_periods=self.volatility_min_periods,
+                default=self.default_volatility
+            )
+        ))
+        df = self.market_data.engineer_features(df)
+
+        train = df[df['timestamp'] < start]
+        test = df[(df['timestamp'] >= start) & df['exit_timestamp'].notna()]
+        if len(train) < 100 or test.empty:
+            raise ValueError(f"Not enough bars to backtest {asset} ({len(train)} training, {len(test)} test rows)")
+
+        model, metadata = fit_model(train[FEATURE_COLUMNS], train[target_column(horizon)], n_jobs=-1, backend=self.backend)
+        logger.info(f"Trained backtest model for {asset} on {len(train)} bars. MSE: {metadata['mse']:.6f}")
+
+        return test.assign(prediction=model.predict(test[FEATURE_COLUMNS].to_numpy()))
+
+    def prepare(self, assets, start, end=None, horizon='1h', train_days=30):
+        """Build the per-bar inputs for all assets once; returns BacktestData"""
+        end = end or datetime.utcnow()
+        frames = []
+        for code, asset in enumerate(assets):
+            frames.append(self.prepare_asset(asset, start, end, horizon, train_days).assign(asset_code=code))
+        df = pd.concat(frames).sort_values(['timestamp', 'asset_code'], kind='stable')
+
+        # Confidence is drawn like the live engine does (uniform 0.7-1.0), but seeded
+        rng = np.random.default_rng(self.seed)
+        self.data = BacktestData(
+            timestamps=df['timestamp'].to_numpy(),
+            exit_timestamps=df['exit_timestamp'].to_numpy(),
+            assets=df['asset_code'].to_numpy(),
+            asset_names=list(assets),
+            closes=df['close'].to_numpy(dtype=np.float64),
+            price_changes=df['price_change'].to_numpy(dtype=np.float64),
+            predictions=df['prediction'].to_numpy(dtype=np.float64),
+            confidences=0.7 + rng.random(len(df)) * 0.3,
+            volatilities=df['risk_volatility'].to_numpy(dtype=np.float64)
+        )
+        logger.info(f"Prepared {len(df)} bars of {len(assets)} assets for backtesting")
+        return self.data
+
+    def run(self, params=None, mode='vectorized'):
+        """Simulate one parameter set on the prepared data; returns a BacktestResult"""
+        if self.data is None:
+            raise ValueError("No data prepared; call prepare() first")
+
+        result = simulate(self.data, params, self.capital, self.cost_bps, mode)
+        approved = result['approved']
+        trades = pd.DataFrame({
+            'timestamp': self.data.timestamps[approved],
+            'exit_timestamp': self.data.exit_timestamps[approved],
+            'asset': np.array(self.data.asset_names)[self.data.assets[approved]],
+            'side': np.where(self.data.predictions[approved] > 0, 'BUY', 'SELL'),
+            'size': result['position_size'][approved] * ORDER_UNITS,
+            'price': self.data.closes[approved],
+            'pnl': result['pnl'][approved],
+        })
+        equity = pd.Series(result['equity'], index=pd.DatetimeIndex(result['equity_times']), name='equity')
+        return BacktestResult(result['metrics'], trades, equity)
+
+
+def parse_parameters(assignments):
+    """Parse key=value pairs into a StrategyConfig parameter dict"""
+    params = {}
+    for assignment in assignments:
+        key, _, value = assignment.partition('=')
+        if key not in DEFAULT_PARAMETERS:
+            raise ValueError(f"Unknown strategy parameter: {key}")
+        params[key] = float(value)
+    return params
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Backtest the forecast -> risk -> execution chain")
+    parser.add_argument('--assets', nargs='+', default=['BTCUSD', 'ETHUSD', 'SOLUSD'])
+    parser.add_argument('--days', type=int, default=365, help="length of the backtest period")
+    parser.add_argument('--train-days', type=int, default=30, help="bars before the period used to train the model")
+    parser.add_argument('--horizon', default='1h', choices=sorted(HORIZON_BARS))
+    parser.add_argument('--mode', default='vectorized', choices=['vectorized', 'event'])
+    parser.add_argument('--backend', default=DEFAULT_BACKEND, choices=sorted(MODEL_BACKENDS))
+    parser.add_argument('--capital', type=float, default=100000.0)
+    parser.add_argument('--cost-bps', type=float, default=0.0)
+    parser.add_argument('--set', nargs='*', default=[], metavar='KEY=VALUE', help="strategy parameters")
+    args = parser.parse_args()
+
+    backtester = Backtester(MarketData(), capital=args.capital, cost_bps=args.cost_bps, backend=args.backend)
+    backtester.prepare(args.assets, datetime.utcnow() - timedelta(days=args.days), horizon=args.horizon,
+                       train_days=args.train_days)
+    result = backtester.run(parse_parameters(args.set), mode=args.mode)
+
+    for name, value in result.metrics.items():
+        print(f"{name:15} {value:.4f}" if isinstance(value, float) else f"{name:15} {value}")
+
+
+if __name__ == "__main__":
+    main()
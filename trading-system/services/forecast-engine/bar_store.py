@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import sys
+import time
+import shutil
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DAY_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+BAR_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+COLUMN_DTYPES = {
+    'timestamp': 'datetime64[ns]',
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+}
+
+
+class BarStore:
+    """
+    Local OHLCV bar store partitioned by asset and day.
+
+    Layout: <data_dir>/<asset>/<YYYY-MM-DD>/<column>.npy, one NumPy array per
+    column. Reads prune partitions by date range and memory-map the column
+    files, so only the requested days and columns are paged in. Timestamps
+    are naive UTC.
+
+    Each day is a symlink to a hidden version directory. A write stores the
+    new version next to the old one and swaps the link with one rename, so
+    a reader sees either the old or the new partition, never none. Readers
+    resolve the link once per day, so all columns come from one version,
+    and a replaced version is only removed by the following write.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+
+    def _asset_path(self, asset):
+        return os.path.join(self.data_dir, asset.replace('/', '_'))
+
+    def days(self, asset):
+        """Return the sorted list of day partitions stored for an asset"""
+        path = self._asset_path(asset)
+        if not os.path.isdir(path):
+            return []
+        # Only day names; staging and old version directories are hidden
+        return sorted(name for name in os.listdir(path) if DAY_PATTERN.fullmatch(name))
+
+    def has_data(self, asset):
+        return bool(self.days(asset))
+
+    def read_bars(self, asset, start=None, end=None, columns=None):
+        """Read bars for an asset with start < timestamp <= end as a DataFrame"""
+        columns = columns or BAR_COLUMNS
+        if 'timestamp' not in columns:
+            columns = ['timestamp'] + list(columns)
+
+        # Prune partitions outside the requested date range
+        start_day = pd.Timestamp(start).strftime('%Y-%m-%d') if start is not None else None
+        end_day = pd.Timestamp(end).strftime('%Y-%m-%d') if end is not None else None
+        days = [
+            day for day in self.days(asset)
+            if (start_day is None or day >= start_day) and (end_day is None or day <= end_day)
+        ]
+
+        if not days:
+            return pd.DataFrame({column: np.array([], dtype=COLUMN_DTYPES[column]) for column in columns})
+
+        asset_path = self._asset_path(asset)
+        data = {}
+        day_paths = [os.path.realpath(os.path.join(asset_path, day)) for day in days]
+        for column in columns:
+            parts = [
+                np.load(os.path.join(day_path, f"{column}.npy"), mmap_mode='r')
+                for day_path in day_paths
+            ]
+            # A single partition is used as-is (no copy); several are concatenated once
+            data[column] = parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+        df = pd.DataFrame(data, copy=False)
+
+        # Trim the boundary partitions to the exact range
+        mask = np.ones(len(df), dtype=bool)
+        if start is not None:
+            mask &= df['timestamp'].values > np.datetime64(pd.Timestamp(start))
+        if end is not None:
+            mask &= df['timestamp'].values <= np.datetime64(pd.Timestamp(end))
+        if not mask.all():
+            df = df[mask].reset_index(drop=True)
+
+        return df
+
+    def write_bars(self, asset, df):
+        """Write bars for an asset, merging with any bars already stored for the same days"""
+        df = df[BAR_COLUMNS].copy()
+        df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True).dt.tz_localize(None)
+        df = df.astype(COLUMN_DTYPES)
+
+        asset_path = self._asset_path(asset)
+        os.makedirs(asset_path, exist_ok=True)
+
+        for day, day_df in df.groupby(df['timestamp'].dt.strftime('%Y-%m-%d')):
+            day_path = os.path.join(asset_path, day)
+            if os.path.isdir(day_path):
+                current = os.path.realpath(day_path)
+                existing = pd.DataFrame({
+                    column: np.load(os.path.join(current, f"{column}.npy"))
+                    for column in BAR_COLUMNS
+                })
+                day_df = pd.concat([existing, day_df])
+
+            day_df = (
+                day_df.drop_duplicates(subset='timestamp', keep='last')
+                .sort_values('timestamp')
+            )
+
+            self._swap_partition(asset_path, day, day_df)
+
+        logger.info(f"Stored {len(df)} bars for {asset}")
+
+    def _swap_partition(self, asset_path, day, day_df):
+        """Write a new version of a day partition and point the day's link at it"""
+        day_path = os.path.join(asset_path, day)
+        version = f".{day}.{time.time_ns()}"
+        os.makedirs(os.path.join(asset_path, version))
+        for column in BAR_COLUMNS:
+            np.save(os.path.join(asset_path, version, f"{column}.npy"), day_df[column].to_numpy())
+
+        previous = None
+        if os.path.islink(day_path):
+            previous = os.path.realpath(day_path)
+        elif os.path.isdir(day_path):
+            # A partition written before versioning; a link cannot replace a directory
+            previous = os.path.join(asset_path, f".{day}.legacy")
+            os.replace(day_path, previous)
+
+        link = os.path.join(asset_path, f"{version}.link")
+        os.symlink(version, link)
+        os.replace(link, day_path)
+
+        # The replaced version stays for readers that already resolved the link;
+        # older versions are removed
+        keep = {version, os.path.basename(previous) if previous else None}
+        for name in os.listdir(asset_path):
+            if name.startswith(f".{day}.") and not name.endswith('.link') and name not in keep:
+                shutil.rmtree(os.path.join(asset_path, name), ignore_errors=True)
+
+
+def main():
+    """Import OHLCV bars from a CSV file into the bar store"""
+    from decouple import config
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Import OHLCV bars into the bar store')
+    parser.add_argument('asset', help='Asset symbol, e.g. BTCUSD')
+    parser.add_argument('csv_file', help='CSV file with timestamp,open,high,low,close,volume columns')
+    parser.add_argument('--data-dir', default=config('BAR_DATA_DIR', default='data/bars'))
+    args = parser.parse_args()
+
+    store = BarStore(args.data_dir)
+    store.write_bars(args.asset, pd.read_csv(args.csv_file))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the model backends on the engine's training data (MarketData,
+no database or Redis needed).
+
+    python benchmark_models.py --assets BTCUSD ETHUSD --backends random_forest lightgbm linear
+
+For every asset and backend it reports:
+- the training time, walk-forward folds included (what the TrainingScheduler pays)
+- the walk-forward MSE
+- the latency of a single-row predict, as in generate_forecast
+- the per-row cost of a batch predict
+- the size of the pickled model
+Use it to pick MODEL_BACKEND and the per-asset MODEL_BACKENDS overrides.
+"""
+
+import time
+import pickle
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from decouple import config
+from features import HORIZON_BARS
+from market_data import MarketData
+from model_backends import MODEL_BACKENDS
+from training import fit_model
+
+logger = logging.getLogger(__name__)
+
+
+def benchmark_backend(X, y, backend, n_jobs=-1, n_splits=3, repeat=200):
+    """Train one backend on (X, y) and measure it; returns a dict of results"""
+    start = time.perf_counter()
+    model, metadata = fit_model(X, y, n_jobs=n_jobs, n_splits=n_splits, backend=backend)
+    train_seconds = time.perf_counter() - start
+
+    # Single rows are passed as C-ordered arrays, like the live forecast path does
+    rows = np.ascontiguousarray(X.to_numpy())
+    single = []
+    for i in range(repeat):
+        row = rows[i % len(rows)].reshape(1, -1)
+        start = time.perf_counter()
+        model.predict(row)
+        single.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    model.predict(rows)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'backend': backend,
+        'rows': len(X),
+        'train_s': train_seconds,
+        'mse': metadata['mse'],
+        'predict_1_p50_us': float(np.percentile(single, 50)) * 1e6,
+        'predict_1_p99_us': float(np.percentile(single, 99)) * 1e6,
+        'predict_batch_us_per_row': batch_seconds / len(rows) * 1e6,
+        'model_kb': len(pickle.dumps(model)) / 1024,
+    }
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Benchmark the forecast model backends")
+    parser.add_argument('--assets', nargs='+', default=['BTCUSD'])
+    parser.add_argument('--horizon', default='1h', choices=sorted(HORIZON_BARS))
+    parser.add_argument('--backends', nargs='+', default=sorted(MODEL_BACKENDS), choices=sorted(MODEL_BACKENDS))
+    parser.add_argument('--repeat', type=int, default=200, help="single-row predictions to time")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="training threads")
+    args = parser.parse_args()
+
+    market_data = MarketData()
+    n_splits = config('TRAINING_SPLITS', default=3, cast=int)
+    results = []
+    for asset in args.assets:
+        X, y, _ = market_data.prepare_training_data(asset, args.horizon)
+        for backend in args.backends:
+            logger.info(f"Benchmarking {backend} on {asset} ({len(X)} rows)")
+            results.append({'asset': asset, **benchmark_backend(X, y, backend, args.n_jobs, n_splits, args.repeat)})
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:.6g}'.format):
+        print(pd.DataFrame(results).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+from collections import deque
+import numpy as np
+
+# Feature columns consumed by the forecast model (order matters)
+FEATURE_COLUMNS = [
+    'volatility', 'sma_24', 'sma_168', 'rsi', 'macd',
+    'close_lag_1', 'close_lag_2', 'close_lag_3'
+]
+
+# Bars per forecast horizon (hourly bars)
+HORIZON_BARS = {'1h': 1, '4h': 4, '1d': 24}
+
+
+def target_column(horizon):
+    """Column holding the return over the next `horizon`, e.g. 'target_4h'"""
+    return f"target_{horizon}"
+
+
+def parse_horizons(value):
+    """Parse a horizon list like '1h,4h,1d'"""
+    horizons = [item.strip() for item in value.split(',') if item.strip()]
+    for horizon in horizons:
+        if horizon not in HORIZON_BARS:
+            raise ValueError(f"Unknown forecast horizon: {horizon}")
+    if not horizons:
+        raise ValueError("No forecast horizon configured")
+    return horizons
+
+
+class RollingWindow:
+    """Fixed-size window keeping a running sum and sum of squares"""
+
+    __slots__ = ('size', 'values', 'total', 'total_sq', 'pushes')
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.pushes = 0
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def push(self, value):
+        """Add a value, evicting the oldest one once the window is full"""
+        if self.full:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+        # Re-sum once per window length so floating point drift from the
+        # add/subtract updates cannot accumulate (amortized O(1))
+        self.pushes += 1
+        if self.pushes % self.size == 0:
+            self.total = float(sum(self.values))
+            self.total_sq = float(sum(v * v for v in self.values))
+
+    def mean(self):
+        return self.total / len(self.values)
+
+    def std(self):
+        """Sample standard deviation (ddof=1), matching pandas rolling std"""
+        n = len(self.values)
+        mean = self.total / n
+        variance = (self.total_sq - n * mean * mean) / (n - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+
+class AdjustedEWM:
+    """Exponentially weighted mean equivalent to pandas ewm(span=..., adjust=True)"""
+
+    __slots__ = ('decay', 'numerator', 'denominator')
+
+    def __init__(self, span):
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.numerator = 0.0
+        self.denominator = 0.0
+
+    def push(self, value):
+        self.numerator = self.numerator * self.decay + value
+        self.denominator = self.denominator * self.decay + 1.0
+
+    def value(self):
+        return self.numerator / self.denominator
+
+
+class IncrementalFeatureState:
+    """
+    Per-asset feature state updated in O(1) per bar.
+
+    Produces the same values as ForecastEngine.engineer_features for the most
+    recent bar without recomputing the rolling windows over the full history.
+    """
+
+    def __init__(self, rsi_window=14):
+        self.volatility = RollingWindow(24)
+        self.sma_24 = RollingWindow(24)
+        self.sma_168 = RollingWindow(168)
+        self.rsi_gain = RollingWindow(rsi_window)
+        self.rsi_loss = RollingWindow(rsi_window)
+        self.ema_12 = AdjustedEWM(12)
+        self.ema_26 = AdjustedEWM(26)
+        self.closes = deque(maxlen=4)
+        self.last_timestamp = None
+
+    @property
+    def is_ready(self):
+        """True once every window holds enough bars to produce a feature vector"""
+        return (
+            self.sma_168.full and self.volatility.full and
+            self.rsi_gain.full and len(self.closes) == 4
+        )
+
+    def update(self, close, timestamp=None):
+        """Feed one new bar close into the state"""
+        close = float(close)
+
+        if self.closes:
+            previous = self.closes[-1]
+            self.volatility.push(close / previous - 1.0)
+            delta = close - previous
+        else:
+            # pandas treats the first (NaN) delta as neither gain nor loss
+            delta = 0.0
+
+        self.rsi_gain.push(delta if delta > 0 else 0.0)
+        self.rsi_loss.push(-delta if delta < 0 else 0.0)
+        self.sma_24.push(close)
+        self.sma_168.push(close)
+        self.ema_12.push(close)
+        self.ema_26.push(close)
+        self.closes.append(close)
+
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+
+    def update_many(self, df):
+        """Feed bars from a DataFrame with 'timestamp' and 'close' columns"""
+        for timestamp, close in zip(df['timestamp'], df['close']):
+            self.update(close, timestamp)
+
+    def rsi(self):
+        loss = self.rsi_loss.mean()
+        if loss == 0:
+            return np.nan if self.rsi_gain.mean() == 0 else 100.0
+        rs = self.rsi_gain.mean() / loss
+        return 100 - (100 / (1 + rs))
+
+    def features(self):
+        """Return the feature vector for the latest bar in FEATURE_COLUMNS order"""
+        if not self.is_ready:
+            return None
+
+        return np.array([
+            self.volatility.std(),
+            self.sma_24.mean(),
+            self.sma_168.mean(),
+            self.rsi(),
+            self.ema_12.value() - self.ema_26.value(),
+            self.closes[-2],
+            self.closes[-3],
+            self.closes[-4],
+        ])
@@ -5,15 +5,22 @@ import sys
 import time
 import logging
 import redis
+import io
+import csv
 import json
 import psycopg2
+from psycopg2.extras import execute_values
 from datetime import datetime
 from decouple import config
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error
+from trading_shared.codec import encode_message, get_codec
+from trading_shared.ids import create_id_generator
+from features import IncrementalFeatureState, parse_horizons
+from market_data import MarketData
+from model_backends import predict_rows
+from model_registry import ModelRegistry
+from retraining import RetrainingWorker
+from training import TrainingScheduler, fit_model
 
 # Configure logging
 logging.basicConfig(
@@ -23,8 +30,11 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-class ForecastEngine:
+class ForecastEngine(MarketData):
     def __init__(self):
+        # Bar store and model backends
+        super().__init__()
+        
         # Load configuration
         self.db_config = {
             'host': config('DB_HOST', default='postgres'),
@@ -45,16 +55,64 @@ class ForecastEngine:
             host=self.redis_config['host'],
             port=self.redis_config['port'],
             password=self.redis_config['password'],
-            decode_responses=True
+            # Messages are binary when a binary codec is configured
+            decode_responses=False
         )
         
+        # Message transport: 'pubsub' (fire-and-forget) or 'streams' (consumer groups with acks)
+        self.transport = config('MESSAGE_TRANSPORT', default='pubsub')
+        self.stream_maxlen = config('STREAM_MAXLEN', default=100000, cast=int)
+        self.codec = get_codec(config('MESSAGE_CODEC', default='json'))
+        
         # Connect to PostgreSQL
         self.db_conn = None
         self.connect_to_db()
         
-        # Initialize model
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.is_trained = False
+        # Per-asset/horizon models persisted on disk, lazily loaded into an LRU cache
+        self.registry = ModelRegistry(
+            config('MODEL_DIR', default='models'),
+            max_loaded=config('MODEL_CACHE_SIZE', default=64, cast=int)
+        )
+        
+        # Forecast horizons: one model per (asset, horizon), all fed by the same feature row.
+        # Downstream every horizon is a separate signal (approval, position and order), so
+        # only the trading horizon is forecast by default
+        self.horizons = config('FORECAST_HORIZONS', default='1h', cast=parse_horizons)
+        
+        # Background training across a process pool, evaluated on time-ordered folds
+        self.training_splits = config('TRAINING_SPLITS', default=3, cast=int)
+        self.trainer = TrainingScheduler(
+            self,
+            max_workers=config('TRAINING_WORKERS', default=0, cast=int) or None,
+            n_jobs=config('TRAINING_N_JOBS', default=0, cast=int) or None,
+            n_splits=self.training_splits
+        )
+        # Set by run(): the RetrainingWorker then owns training and forecasts skip
+        # assets without a model instead of training them inline a second time
+        self.background_training = False
+        
+        # Retraining on a cadence or when features/residuals drift (see RetrainingWorker)
+        self.retraining_config = {
+            'check_interval': config('DRIFT_CHECK_INTERVAL', default=900, cast=int),
+            'retrain_interval': config('RETRAIN_INTERVAL_HOURS', default=24, cast=float),
+            'window': config('DRIFT_WINDOW', default=48, cast=int),
+            'feature_threshold': config('DRIFT_FEATURE_THRESHOLD', default=2.0, cast=float),
+            'residual_threshold': config('DRIFT_RESIDUAL_THRESHOLD', default=1.5, cast=float),
+            'residual_min_bars': config('DRIFT_RESIDUAL_MIN_BARS', default=12, cast=int)
+        }
+        
+        # Incremental feature state per asset
+        self.feature_states = {}
+        
+        # Batched cycle: one predict, one multi-row insert and one Redis pipeline for all assets
+        self.batch_cycle = config('FORECAST_BATCH_CYCLE', default=True, cast=bool)
+        
+        # Forecast ids are assigned here, so trades and risk assessments can refer to them.
+        # Without ID_WORKER_ID the worker id is leased from Redis
+        self.ids = create_id_generator(
+            config('ID_WORKER_ID', default=None, cast=lambda v: int(v) if v else None),
+            self.redis_client
+        )
         
         logger.info("Forecast Engine initialized")
     
@@ -67,136 +125,163 @@ class ForecastEngine:
             logger.error(f"Failed to connect to database: {e}")
             raise
     
-    def load_historical_data(self, asset, days=30):
-        """Load historical market data for training"""
-        # This is a placeholder implementation
-        # In a real implementation, this would fetch actual market data
-        logger.info(f"Loading historical data for {asset} ({days} days)")
-        
-        # Generate synthetic data for demonstration
-        np.random.seed(42)
-        dates = pd.date_range(end=datetime.now(), periods=days*24, freq='H')
-        prices = 100 + np.cumsum(np.random.randn(len(dates)) * 0.1)
-        
-        df = pd.DataFrame({
-            'timestamp': dates,
-            'open': prices,
-            'high': prices * (1 + np.random.rand(len(prices)) * 0.01),
-            'low': prices * (1 - np.random.rand(len(prices)) * 0.01),
-            'close': prices * (1 + np.random.rand(len(prices)) * 0.001 - 0.0005),
-            'volume': np.random.randint(1000, 10000, len(prices))
-        })
-        
-        return df
+    def train_models(self, asset, horizons):
+        """Train the models of several horizons for an asset from one feature computation"""
+        mse = {}
+        for horizon, (X, y, version) in self.prepare_training_sets(asset, horizons).items():
+            logger.info(f"Training model for {asset} ({horizon})")
+            
+            # Skip training if a model for exactly this data is already stored
+            if self.registry.has(asset, horizon, version):
+                logger.info(f"Model for {asset} ({horizon}) is up to date (version {version})")
+                mse[horizon] = None
+                continue
+            
+            # Training on demand uses every core for this one model
+            model, metadata = fit_model(X, y, n_jobs=-1, n_splits=self.training_splits, backend=self.model_backend(asset))
+            logger.info(f"Model trained. MSE: {metadata['mse']:.6f}")
+            
+            self.registry.save(asset, horizon, model, version, metadata)
+            mse[horizon] = metadata['mse']
+        
+        return mse
     
-    def engineer_features(self, df):
-        """Engineer features for machine learning model"""
-        logger.info("Engineering features")
-        
-        # Calculate technical indicators
-        df['returns'] = df['close'].pct_change()
-        df['volatility'] = df['returns'].rolling(window=24).std()
-        df['sma_24'] = df['close'].rolling(window=24).mean()
-        df['sma_168'] = df['close'].rolling(window=168).mean()  # 1 week
-        df['rsi'] = self.calculate_rsi(df['close'])
-        df['ema_12'] = df['close'].ewm(span=12).mean()
-        df['ema_26'] = df['close'].ewm(span=26).mean()
-        df['macd'] = df['ema_12'] - df['ema_26']
-        
-        # Lag features
-        df['close_lag_1'] = df['close'].shift(1)
-        df['close_lag_2'] = df['close'].shift(2)
-        df['close_lag_3'] = df['close'].shift(3)
-        
-        # Target variable (next hour's return)
-        df['target'] = df['returns'].shift(-1)
-        
-        # Drop rows with NaN values
-        df = df.dropna()
-        
-        return df
+    def train_model(self, asset, horizon='1h'):
+        """Train the machine learning model for an asset and store it in the registry"""
+        return self.train_models(asset, [horizon])[horizon]
     
-    def calculate_rsi(self, prices, window=14):
-        """Calculate Relative Strength Index"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+    def get_models(self, asset, horizons):
+        """Return {horizon: model} for an asset, training the missing ones in one pass unless training runs in the background"""
+        models = {horizon: self.registry.get(asset, horizon) for horizon in horizons}
+        missing = [horizon for horizon, model in models.items() if model is None]
+        
+        for horizon in missing:
+            if self.trainer.is_pending(asset, horizon):
+                raise ValueError(f"Model for {asset} ({horizon}) is still training")
+            if self.background_training:
+                raise ValueError(f"No model for {asset} ({horizon}) yet; the retraining worker trains it")
+        if missing:
+            logger.warning(f"No model stored for {asset} ({', '.join(missing)}). Training now...")
+            self.train_models(asset, missing)
+            models.update({horizon: self.registry.get(asset, horizon) for horizon in missing})
+        return models
     
-    def train_model(self, asset):
-        """Train the machine learning model"""
-        logger.info(f"Training model for {asset}")
-        
-        # Load and prepare data
-        df = self.load_historical_data(asset)
-        df = self.engineer_features(df)
-        
-        # Select features for training
-        feature_columns = [
-            'volatility', 'sma_24', 'sma_168', 'rsi', 'macd',
-            'close_lag_1', 'close_lag_2', 'close_lag_3'
-        ]
-        
-        X = df[feature_columns]
-        y = df['target']
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
-        
-        # Train model
-        self.model.fit(X_train, y_train)
-        self.is_trained = True
-        
-        # Evaluate model
-        y_pred = self.model.predict(X_test)
-        mse = mean_squared_error(y_test, y_pred)
-        logger.info(f"Model trained. MSE: {mse:.6f}")
-        
-        return mse
+    def get_model(self, asset, horizon='1h'):
+        """Return the model for an asset, training one if none is stored yet"""
+        return self.get_models(asset, [horizon])[horizon]
     
-    def generate_forecast(self, asset, horizon='1h'):
-        """Generate a forecast for the given asset"""
-        if not self.is_trained:
-            logger.warning("Model is not trained yet. Training now...")
-            self.train_model(asset)
-        
-        logger.info(f"Generating forecast for {asset} ({horizon})")
-        
-        # Load recent data
-        df = self.load_historical_data(asset, days=7)
-        df = self.engineer_features(df)
+    def update_feature_state(self, asset):
+        """Feed new bars into the asset's incremental feature state and return the latest features"""
+        state = self.feature_states.get(asset)
+        
+        if state is None:
+            # Warm up the rolling windows from recent history once
+            state = IncrementalFeatureState()
+            bars = self.load_historical_data(asset, days=7)
+            self.feature_states[asset] = state
+        else:
+            # Only bars newer than the last one seen need to be processed
+            bars = self.load_historical_data(asset, days=7, since=state.last_timestamp)
+        
+        state.update_many(bars)
+        self.publish_bars(asset, bars)
+        
+        features = state.features()
+        if features is None:
+            raise ValueError(f"Not enough history to compute features for {asset}")
+        
+        return features
+    
+    def generate_asset_forecasts(self, asset, horizons=None):
+        """Generate forecasts for every horizon of the given asset from one feature row"""
+        horizons = horizons or self.horizons
+        models = self.get_models(asset, horizons)
         
-        # Select features
-        feature_columns = [
-            'volatility', 'sma_24', 'sma_168', 'rsi', 'macd',
-            'close_lag_1', 'close_lag_2', 'close_lag_3'
-        ]
+        logger.info(f"Generating forecasts for {asset} ({', '.join(horizons)})")
         
         # Use the latest data point
-        latest_features = df[feature_columns].iloc[-1].values.reshape(1, -1)
-        
-        # Generate prediction
-        prediction = self.model.predict(latest_features)[0]
+        latest_features = self.update_feature_state(asset).reshape(1, -1)
         
         # Calculate confidence (simplified)
         # In a real implementation, this would be more sophisticated
-        confidence = 0.7 + np.random.rand() * 0.3  # Random confidence between 0.7 and 1.0
+        confidences = 0.7 + np.random.rand(len(horizons)) * 0.3  # Random confidence between 0.7 and 1.0
+        
+        # Create forecast objects, one prediction per horizon model
+        timestamp = datetime.utcnow().isoformat() + 'Z'
+        forecasts = [
+            {
+                'id': self.ids.next_id(),
+                'asset': asset,
+                'horizon': horizon,
+                'prediction': float(models[horizon].predict(latest_features)[0]),
+                'confidence': float(confidence),
+                'timestamp': timestamp
+            }
+            for horizon, confidence in zip(horizons, confidences)
+        ]
         
-        # Create forecast object
-        forecast = {
-            'asset': asset,
-            'horizon': horizon,
-            'prediction': float(prediction),
-            'confidence': float(confidence),
-            'timestamp': datetime.utcnow().isoformat() + 'Z'
+        logger.info(f"Generated forecasts: {forecasts}")
+        return forecasts
+    
+    def generate_forecast(self, asset, horizon='1h'):
+        """Generate a forecast for the given asset"""
+        return self.generate_asset_forecasts(asset, [horizon])[0]
+    
+    def generate_forecasts(self, assets, horizons=None):
+        """Generate forecasts for several assets and all horizons from one feature matrix"""
+        horizons = horizons or self.horizons
+        logger.info(f"Generating forecasts for {len(assets)} assets ({', '.join(horizons)})")
+        
+        # Build one feature matrix, skipping assets without models or features
+        rows = []
+        models = []
+        ready_assets = []
+        for asset in assets:
+            try:
+                asset_models = self.get_models(asset, horizons)
+                row = self.update_feature_state(asset)
+            except Exception as e:
+                logger.error(f"Failed to prepare forecast for {asset}: {e}")
+                continue
+            # Appended together, so models, rows and assets stay aligned
+            models.append(asset_models)
+            rows.append(row)
+            ready_assets.append(asset)
+        
+        if not ready_assets:
+            return []
+        
+        # Each (asset, horizon) has its own model, so one predict call per horizon is only
+        # possible for linear models and shared models (see predict_rows); trees predict per asset
+        features = np.vstack(rows)
+        by_horizon = {
+            horizon: predict_rows([asset_models[horizon] for asset_models in models], features)
+            for horizon in horizons
         }
+        predictions = [
+            (asset, horizon, by_horizon[horizon][i])
+            for i, asset in enumerate(ready_assets)
+            for horizon in horizons
+        ]
         
-        logger.info(f"Generated forecast: {forecast}")
-        return forecast
+        # Calculate confidence (simplified, see generate_asset_forecasts)
+        confidences = 0.7 + np.random.rand(len(predictions)) * 0.3
+        
+        timestamp = datetime.utcnow().isoformat() + 'Z'
+        forecasts = [
+            {
+                'id': self.ids.next_id(),
+                'asset': asset,
+                'horizon': horizon,
+                'prediction': float(prediction),
+                'confidence': float(confidence),
+                'timestamp': timestamp
+            }
+            for (asset, horizon, prediction), confidence in zip(predictions, confidences)
+        ]
+        
+        logger.info(f"Generated {len(forecasts)} forecasts")
+        return forecasts
     
     def save_forecast_to_db(self, forecast):
         """Save forecast to PostgreSQL database"""
@@ -206,11 +291,12 @@ class ForecastEngine:
             cursor = self.db_conn.cursor()
             
             insert_query = """
-            INSERT INTO trading_forecast (asset, horizon, prediction, confidence, timestamp)
-            VALUES (%s, %s, %s, %s, %s)
+            INSERT INTO trading_forecast (id, asset, horizon, prediction, confidence, timestamp)
+            VALUES (%s, %s, %s, %s, %s, %s)
             """
             
             cursor.execute(insert_query, (
+                forecast['id'],
                 forecast['asset'],
                 forecast['horizon'],
                 forecast['prediction'],
@@ -227,31 +313,170 @@ class ForecastEngine:
             self.db_conn.rollback()
             raise
     
+    def save_forecasts_to_db(self, forecasts):
+        """Save several forecasts to PostgreSQL with one multi-row insert"""
+        logger.info(f"Saving {len(forecasts)} forecasts to database")
+        
+        try:
+            cursor = self.db_conn.cursor()
+            
+            insert_query = """
+            INSERT INTO trading_forecast (id, asset, horizon, prediction, confidence, timestamp)
+            VALUES %s
+            """
+            
+            execute_values(cursor, insert_query, [
+                (
+                    forecast['id'],
+                    forecast['asset'],
+                    forecast['horizon'],
+                    forecast['prediction'],
+                    forecast['confidence'],
+                    forecast['timestamp']
+                )
+                for forecast in forecasts
+            ], page_size=1000)
+            
+            self.db_conn.commit()
+            cursor.close()
+            
+            logger.info("Forecasts saved to database")
+        except Exception as e:
+            logger.error(f"Failed to save forecasts to database: {e}")
+            self.db_conn.rollback()
+            raise
+    
+    def copy_forecasts_to_db(self, forecasts, chunk_size=100000):
+        """Bulk insert an iterable of forecasts with COPY, all in one transaction"""
+        logger.info("Copying forecasts to database")
+        
+        # Ids come from the same Snowflake generator as live forecasts, never from the table's sequence
+        copy_query = """
+        COPY trading_forecast (id, asset, horizon, prediction, confidence, timestamp)
+        FROM STDIN WITH (FORMAT csv)
+        """
+        
+        try:
+            cursor = self.db_conn.cursor()
+            total = 0
+            
+            # Stream the rows in chunks so backfills never hold everything in memory
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for forecast in forecasts:
+                writer.writerow((
+                    forecast.get('id') or self.ids.next_id(),
+                    forecast['asset'],
+                    forecast['horizon'],
+                    forecast['prediction'],
+                    forecast['confidence'],
+                    forecast.get('timestamp') or datetime.utcnow().isoformat() + 'Z'
+                ))
+                total += 1
+                if total % chunk_size == 0:
+                    buffer.seek(0)
+                    cursor.copy_expert(copy_query, buffer)
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+            
+            if buffer.tell():
+                buffer.seek(0)
+                cursor.copy_expert(copy_query, buffer)
+            
+            self.db_conn.commit()
+            cursor.close()
+            
+            logger.info(f"Copied {total} forecasts to database")
+            return total
+        except Exception as e:
+            logger.error(f"Failed to copy forecasts to database: {e}")
+            self.db_conn.rollback()
+            raise
+    
+    def ingest_ndjson(self, path):
+        """Bulk load forecasts from a newline-delimited JSON file"""
+        with open(path) as f:
+            return self.copy_forecasts_to_db(
+                json.loads(line) for line in f if line.strip()
+            )
+    
+    def send_forecast(self, client, forecast):
+        """Send a forecast on the configured transport (client may be a pipeline)"""
+        payload = encode_message(forecast, self.codec)
+        if self.transport == 'streams':
+            client.xadd('forecast_updates', {'data': payload}, maxlen=self.stream_maxlen, approximate=True)
+        else:
+            client.publish('forecast_updates', payload)
+    
+    def publish_bars(self, asset, bars):
+        """Share new bars with the risk engine, which tracks volatility and drawdown from them"""
+        if bars.empty:
+            return
+        
+        message = {
+            'asset': asset,
+            'timestamps': (bars['timestamp'].astype('int64') // 10**9).tolist(),
+            'closes': bars['close'].astype(float).tolist()
+        }
+        try:
+            self.redis_client.publish('market_bars', encode_message(message, self.codec))
+        except Exception as e:
+            # Not fatal for forecasting; the risk engine falls back to its default volatility
+            logger.warning(f"Failed to publish bars for {asset}: {e}")
+    
     def publish_forecast_to_redis(self, forecast):
         """Publish forecast to Redis channel"""
         logger.info("Publishing forecast to Redis")
         
         try:
-            self.redis_client.publish('forecast_updates', json.dumps(forecast))
+            self.send_forecast(self.redis_client, forecast)
             logger.info("Forecast published to Redis")
         except Exception as e:
             logger.error(f"Failed to publish forecast to Redis: {e}")
             raise
     
+    def publish_forecasts_to_redis(self, forecasts):
+        """Publish several forecasts to Redis in one pipelined round-trip"""
+        logger.info(f"Publishing {len(forecasts)} forecasts to Redis")
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for forecast in forecasts:
+                self.send_forecast(pipe, forecast)
+            pipe.execute()
+            logger.info("Forecasts published to Redis")
+        except Exception as e:
+            logger.error(f"Failed to publish forecasts to Redis: {e}")
+            raise
+    
+    def run_batched_forecast_cycle(self, assets):
+        """Run a forecast cycle for all assets as one batch"""
+        logger.info(f"Starting batched forecast cycle for {len(assets)} assets")
+        
+        forecasts = self.generate_forecasts(assets)
+        if forecasts:
+            self.save_forecasts_to_db(forecasts)
+            self.publish_forecasts_to_redis(forecasts)
+        
+        logger.info("Batched forecast cycle completed")
+    
     def run_forecast_cycle(self, assets=['BTCUSD', 'ETHUSD', 'SOLUSD']):
         """Run a complete forecast cycle for all assets"""
+        if self.batch_cycle:
+            self.run_batched_forecast_cycle(assets)
+            return
+        
         logger.info("Starting forecast cycle")
         
         for asset in assets:
             try:
-                # Generate forecast
-                forecast = self.generate_forecast(asset)
-                
-                # Save to database
-                self.save_forecast_to_db(forecast)
-                
-                # Publish to Redis
-                self.publish_forecast_to_redis(forecast)
+                # Generate the forecasts of all horizons
+                for forecast in self.generate_asset_forecasts(asset):
+                    # Save to database
+                    self.save_forecast_to_db(forecast)
+                    
+                    # Publish to Redis
+                    self.publish_forecast_to_redis(forecast)
                 
             except Exception as e:
                 logger.error(f"Failed to process forecast for {asset}: {e}")
@@ -263,13 +488,12 @@ class ForecastEngine:
         """Run the forecast engine continuously"""
         logger.info(f"Starting forecast engine with {interval}s interval")
         
-        # Initial training
+        # Training runs in the background: first for assets without a model,
+        # then whenever a model is due or drifted. Assets join the cycle once
+        # their model is ready; a retrained model replaces the old one atomically
         assets = ['BTCUSD', 'ETHUSD', 'SOLUSD']
-        for asset in assets:
-            try:
-                self.train_model(asset)
-            except Exception as e:
-                logger.error(f"Failed to train model for {asset}: {e}")
+        self.background_training = True
+        retraining = RetrainingWorker(self, assets, self.horizons, **self.retraining_config).start()
         
         # Run forecast cycle
         while True:
@@ -279,6 +503,9 @@ class ForecastEngine:
                 time.sleep(interval)
             except KeyboardInterrupt:
                 logger.info("Received interrupt signal. Shutting down.")
+                retraining.stop()
+                self.trainer.shutdown(wait=False)
+                self.ids.close()
                 break
             except Exception as e:
                 logger.error(f"Error in forecast cycle: {e}")
@@ -292,6 +519,9 @@ def main():
     # Check if we should run once or continuously
     if len(sys.argv) > 1 and sys.argv[1] == '--once':
         engine.run_forecast_cycle()
+    elif len(sys.argv) > 2 and sys.argv[1] == '--ingest':
+        # Backfill forecasts from an NDJSON file
+        engine.ingest_ndjson(sys.argv[2])
     else:
         # Run continuously
         engine.run()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+import zlib
+import logging
+from datetime import datetime, timedelta
+from decouple import config
+import numpy as np
+import pandas as pd
+from bar_store import BarStore
+from features import FEATURE_COLUMNS, HORIZON_BARS, target_column
+from model_backends import DEFAULT_BACKEND, MODEL_BACKENDS, parse_asset_backends
+from model_registry import hash_training_data
+
+logger = logging.getLogger(__name__)
+
+
+class MarketData:
+    """
+    Historical bars, features and training sets of the forecast engine.
+
+    It only needs the bar store, no database, Redis or training pool.
+    ForecastEngine builds on it; offline tools such as the backtest use it
+    on its own.
+    """
+
+    def __init__(self):
+        # Historical OHLCV bars; synthetic bars are only used for assets without stored data
+        self.bar_store = BarStore(config('BAR_DATA_DIR', default='data/bars'))
+        self.synthetic_data = config('SYNTHETIC_MARKET_DATA', default=True, cast=bool)
+
+        # Model backend per asset: MODEL_BACKEND by default, MODEL_BACKENDS overrides single assets
+        self.default_backend = config('MODEL_BACKEND', default=DEFAULT_BACKEND)
+        if self.default_backend not in MODEL_BACKENDS:
+            raise ValueError(f"Unknown model backend: {self.default_backend}")
+        self.asset_backends = config('MODEL_BACKENDS', default='', cast=parse_asset_backends)
+
+    def load_historical_data(self, asset, days=30, since=None):
+        """Load historical market data for training (bars after `since` only, if given)"""
+        logger.info(f"Loading historical data for {asset} ({days} days)")
+
+        end = datetime.utcnow()
+        start = end - timedelta(days=days)
+        if since is not None:
+            start = max(start, since)
+
+        if self.bar_store.has_data(asset):
+            return self.bar_store.read_bars(asset, start=start, end=end)
+
+        if not self.synthetic_data:
+            raise ValueError(f"No market data stored for {asset}")
+
+        logger.warning(f"No market data stored for {asset}, using synthetic data")
+        df = self.generate_synthetic_data(asset, days)
+        return df[df['timestamp'] > start].reset_index(drop=True)
+
+    def generate_synthetic_data(self, asset, days):
+        """Generate a synthetic random-walk series for development (seeded per asset)"""
+        rng = np.random.default_rng(zlib.crc32(asset.encode()))
+        dates = pd.date_range(end=datetime.utcnow(), periods=days*24, freq='H')
+        prices = 100 + np.cumsum(rng.standard_normal(len(dates)) * 0.1)
+
+        df = pd.DataFrame({
+            'timestamp': dates,
+            'open': prices,
+            'high': prices * (1 + rng.random(len(prices)) * 0.01),
+            'low': prices * (1 - rng.random(len(prices)) * 0.01),
+            'close': prices * (1 + rng.random(len(prices)) * 0.001 - 0.0005),
+            'volume': rng.integers(1000, 10000, len(prices))
+        })
+
+        return df
+
+    def engineer_features(self, df):
+        """Engineer features for machine learning model"""
+        logger.info("Engineering features")
+
+        # Calculate technical indicators
+        df['returns'] = df['close'].pct_change()
+        df['volatility'] = df['returns'].rolling(window=24).std()
+        df['sma_24'] = df['close'].rolling(window=24).mean()
+        df['sma_168'] = df['close'].rolling(window=168).mean()  # 1 week
+        df['rsi'] = self.calculate_rsi(df['close'])
+        df['ema_12'] = df['close'].ewm(span=12).mean()
+        df['ema_26'] = df['close'].ewm(span=26).mean()
+        df['macd'] = df['ema_12'] - df['ema_26']
+
+        # Lag features
+        df['close_lag_1'] = df['close'].shift(1)
+        df['close_lag_2'] = df['close'].shift(2)
+        df['close_lag_3'] = df['close'].shift(3)
+
+        # Target variables (return over each horizon)
+        for horizon, bars in HORIZON_BARS.items():
+            df[target_column(horizon)] = df['close'].shift(-bars) / df['close'] - 1
+
+        # Drop rows without complete features; the latest bars have no target
+        # yet for the longer horizons, so each consumer drops those itself
+        df = df.dropna(subset=FEATURE_COLUMNS)
+
+        return df
+
+    def calculate_rsi(self, prices, window=14):
+        """Calculate Relative Strength Index"""
+        delta = prices.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+        rs = gain / loss
+        rsi = 100 - (100 / (1 + rs))
+        return rsi
+
+    def prepare_training_sets(self, asset, horizons):
+        """Load and engineer features once; returns {horizon: (features, target, data version)}"""
+        # Load and prepare data
+        df = self.engineer_features(self.load_historical_data(asset))
+
+        training_sets = {}
+        for horizon in horizons:
+            # Select the rows whose return over this horizon is known
+            rows = df[df[target_column(horizon)].notna()]
+            X = rows[FEATURE_COLUMNS]
+            y = rows[target_column(horizon)]
+
+            # The backend is part of the version, so switching it retrains the model
+            training_sets[horizon] = (X, y, hash_training_data(X, y, self.model_backend(asset), horizon))
+
+        return training_sets
+
+    def prepare_training_data(self, asset, horizon='1h'):
+        """Load and prepare training data, returning features, target and data version"""
+        return self.prepare_training_sets(asset, [horizon])[horizon]
+
+    def model_backend(self, asset):
+        """Model backend used for an asset"""
+        return self.asset_backends.get(asset, self.default_backend)
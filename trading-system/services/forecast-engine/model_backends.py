@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+DEFAULT_BACKEND = 'random_forest'
+
+
+def random_forest(n_jobs=1):
+    return RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=n_jobs)
+
+
+def lightgbm(n_jobs=1):
+    # Imported here so the other backends work without the native library
+    from lightgbm import LGBMRegressor
+    return LGBMRegressor(n_estimators=200, learning_rate=0.05, num_leaves=15,
+                         random_state=42, n_jobs=n_jobs, verbose=-1)
+
+
+def linear(n_jobs=1):
+    return make_pipeline(StandardScaler(), Ridge(alpha=1.0))
+
+
+# Every backend returns an unfitted scikit-learn compatible regressor
+MODEL_BACKENDS = {
+    'random_forest': random_forest,
+    'lightgbm': lightgbm,
+    'linear': linear,
+}
+
+
+def create_model(backend=DEFAULT_BACKEND, n_jobs=1):
+    """Create an unfitted model of the given backend"""
+    factory = MODEL_BACKENDS.get(backend)
+    if factory is None:
+        raise ValueError(f"Unknown model backend: {backend}")
+    return factory(n_jobs)
+
+
+def prepare_for_inference(model):
+    """Predictions are single rows, so avoid thread pool overhead at inference"""
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)
+    return model
+
+
+def is_linear(model):
+    """Check whether a fitted model is a `linear` backend pipeline (scaler + ridge)"""
+    return isinstance(model, Pipeline) and len(model.steps) == 2 \
+        and isinstance(model[0], StandardScaler) and isinstance(model[1], Ridge)
+
+
+def predict_rows(models, X):
+    """
+    Predict row i of X with models[i], batching where the models allow it.
+
+    Rows that share a model object are predicted in one call. Linear
+    models are evaluated together as one product of their stacked scaler
+    and ridge coefficients. Tree ensembles are fitted per asset, so each
+    of them still needs its own predict call.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    predictions = np.empty(len(X))
+
+    linear_rows = [i for i, model in enumerate(models) if is_linear(model)]
+    if linear_rows:
+        linear_models = [models[i] for i in linear_rows]
+        mean = np.vstack([model[0].mean_ for model in linear_models])
+        scale = np.vstack([model[0].scale_ for model in linear_models])
+        coef = np.vstack([model[1].coef_ for model in linear_models])
+        intercept = np.array([model[1].intercept_ for model in linear_models])
+        predictions[linear_rows] = np.einsum('ij,ij->i', (X[linear_rows] - mean) / scale, coef) + intercept
+
+    groups = {}
+    for i, model in enumerate(models):
+        if not is_linear(model):
+            groups.setdefault(id(model), (model, []))[1].append(i)
+    for model, rows in groups.values():
+        predictions[rows] = model.predict(X[rows])
+    return predictions
+
+
+def parse_asset_backends(value):
+    """Parse per-asset overrides like 'BTCUSD:lightgbm,ETHUSD:linear'"""
+    backends = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        asset, _, backend = item.partition(':')
+        if backend.strip() not in MODEL_BACKENDS:
+            raise ValueError(f"Unknown model backend for {asset.strip()}: {backend.strip()}")
+        backends[asset.strip()] = backend.strip()
+    return backends
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+import joblib
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def hash_training_data(X, y, *extra):
+    """Return a short, stable hash of the training features and target (and any extra strings)"""
+    digest = hashlib.sha256()
+    for value in extra:
+        digest.update(value.encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+class ModelRegistry:
+    """
+    Models keyed by (asset, horizon), persisted to disk with joblib.
+
+    Each model is stored under <model_dir>/<asset>/<horizon>/<version>.joblib,
+    where the version is the hash of the data it was trained on, next to a
+    latest.json manifest. Models are loaded lazily on first use and at most
+    `max_loaded` of them are kept in memory (least recently used are evicted).
+    A cached model is checked against the manifest's modification time, so a
+    model saved by another process (e.g. a training worker) replaces it.
+    """
+
+    def __init__(self, model_dir, max_loaded=64, keep_versions=3):
+        self.model_dir = model_dir
+        self.max_loaded = max_loaded
+        self.keep_versions = keep_versions
+        self._loaded = OrderedDict()
+        self._lock = threading.RLock()
+        os.makedirs(self.model_dir, exist_ok=True)
+
+    def _model_path(self, asset, horizon):
+        return os.path.join(self.model_dir, asset.replace('/', '_'), horizon)
+
+    def _manifest_file(self, asset, horizon):
+        return os.path.join(self._model_path(asset, horizon), 'latest.json')
+
+    def _manifest_mtime(self, asset, horizon):
+        try:
+            return os.stat(self._manifest_file(asset, horizon)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _read_manifest(self, asset, horizon):
+        manifest_path = self._manifest_file(asset, horizon)
+        try:
+            with open(manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def latest_version(self, asset, horizon):
+        """Return the version of the current model, or None if none is stored"""
+        manifest = self._read_manifest(asset, horizon)
+        return manifest['version'] if manifest else None
+
+    def has(self, asset, horizon, version=None):
+        """Check whether a model (optionally of a specific version) is stored"""
+        latest = self.latest_version(asset, horizon)
+        if latest is None:
+            return False
+        return version is None or latest == version
+
+    def save(self, asset, horizon, model, version, metadata=None):
+        """Persist a model and make it the current version for (asset, horizon)"""
+        path = self._model_path(asset, horizon)
+        os.makedirs(path, exist_ok=True)
+
+        # Write to temporary files first so readers never see partial files
+        model_file = os.path.join(path, f"{version}.joblib")
+        joblib.dump(model, model_file + '.tmp')
+        os.replace(model_file + '.tmp', model_file)
+
+        manifest = {
+            'version': version,
+            'trained_at': datetime.utcnow().isoformat() + 'Z',
+            **(metadata or {})
+        }
+        manifest_file = os.path.join(path, 'latest.json')
+        # Swap the model and its metadata in together; readers get either the old or the new one
+        with self._lock:
+            with open(manifest_file + '.tmp', 'w') as f:
+                json.dump(manifest, f)
+            os.replace(manifest_file + '.tmp', manifest_file)
+            mtime = os.stat(manifest_file).st_mtime_ns
+            self._cache_put((asset, horizon), (version, model, manifest, mtime))
+
+        self._prune_versions(path)
+        logger.info(f"Saved model for {asset} ({horizon}) version {version}")
+
+    def mark_checked(self, asset, horizon, version):
+        """
+        Record that the current model still matches the latest training data.
+
+        Sets `checked_at` in the manifest, which the retraining worker takes
+        as the model's age. Returns False if the current model is of another
+        version.
+        """
+        with self._lock:
+            manifest = self._read_manifest(asset, horizon)
+            if manifest is None or manifest['version'] != version:
+                return False
+            manifest['checked_at'] = datetime.utcnow().isoformat() + 'Z'
+            manifest_file = self._manifest_file(asset, horizon)
+            with open(manifest_file + '.tmp', 'w') as f:
+                json.dump(manifest, f)
+            os.replace(manifest_file + '.tmp', manifest_file)
+        return True
+
+    def get(self, asset, horizon):
+        """Return the current model for (asset, horizon), loading it lazily, or None"""
+        return self.get_with_metadata(asset, horizon)[0]
+
+    def get_with_metadata(self, asset, horizon):
+        """Return the current model and its manifest, or (None, None)"""
+        key = (asset, horizon)
+        mtime = self._manifest_mtime(asset, horizon)
+        with self._lock:
+            cached = self._loaded.get(key)
+            if cached is not None and cached[3] == mtime:
+                self._loaded.move_to_end(key)
+                return cached[1], cached[2]
+
+        manifest = self._read_manifest(asset, horizon)
+        if manifest is None:
+            return None, None
+
+        version = manifest['version']
+        if cached is not None and cached[0] == version:
+            # Manifest rewritten for the same model
+            with self._lock:
+                self._cache_put(key, (version, cached[1], manifest, mtime))
+            return cached[1], manifest
+
+        model_file = os.path.join(self._model_path(asset, horizon), f"{version}.joblib")
+        model = joblib.load(model_file)
+        logger.info(f"Loaded model for {asset} ({horizon}) version {version}")
+
+        with self._lock:
+            # A model saved by this process while this one was loading is newer; keep it
+            current = self._loaded.get(key)
+            if current is not None and current is not cached:
+                return current[1], current[2]
+            self._cache_put(key, (version, model, manifest, mtime))
+        return model, manifest
+
+    def _cache_put(self, key, entry):
+        self._loaded[key] = entry
+        self._loaded.move_to_end(key)
+        while len(self._loaded) > self.max_loaded:
+            evicted, _ = self._loaded.popitem(last=False)
+            logger.info(f"Evicted model {evicted} from memory")
+
+    def _prune_versions(self, path):
+        """Remove all but the most recent `keep_versions` model files"""
+        files = sorted(
+            (os.path.join(path, name) for name in os.listdir(path) if name.endswith('.joblib')),
+            key=os.path.getmtime,
+            reverse=True
+        )
+        for old_file in files[self.keep_versions:]:
+            os.remove(old_file)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+import logging
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+from features import FEATURE_COLUMNS, HORIZON_BARS, target_column
+
+logger = logging.getLogger(__name__)
+
+
+def feature_drift(metadata, X):
+    """Largest shift of a recent feature mean from the training mean, in training standard deviations"""
+    mean = np.asarray(metadata['feature_mean'])
+    std = np.asarray(metadata['feature_std'])
+    valid = std > 0
+    if not valid.any() or len(X) == 0:
+        return 0.0
+    shift = np.abs(np.asarray(X, dtype=np.float64).mean(axis=0) - mean) / np.where(valid, std, 1.0)
+    return float(shift[valid].max())
+
+
+def residual_drift(metadata, y_true, y_pred):
+    """Recent prediction RMSE relative to the walk-forward RMSE measured at training time"""
+    if len(y_true) == 0 or not metadata.get('mse'):
+        return 0.0
+    rmse = np.sqrt(np.mean((np.asarray(y_true) - np.asarray(y_pred)) ** 2))
+    return float(rmse / np.sqrt(metadata['mse']))
+
+
+class RetrainingWorker:
+    """
+    Background thread that keeps the models of the forecast engine current.
+
+    Every `check_interval` seconds it checks each asset and horizon. A model
+    is retrained through the TrainingScheduler when it is missing, when it is
+    older than `retrain_interval` hours, or when its inputs drifted. If the
+    training data did not change since, the scheduler keeps the model and
+    records the check in the manifest, which restarts its age. There
+    are two drift statistics. Feature drift is the largest feature mean
+    shift over the last `window` bars, in training standard deviations.
+    Residual drift is the RMSE relative to the walk-forward RMSE. It is
+    measured only on bars after the model was trained whose target is
+    known, since the model has seen every earlier bar. It is skipped until
+    `residual_min_bars` such bars exist (at most the last `window` are
+    used). The features of an asset are engineered once per
+    check and shared by all of its horizons. Training runs in the
+    scheduler's process pool, and the registry swaps the finished model in
+    under its lock. Forecasts keep using the previous model until then and
+    never wait for training.
+    """
+
+    def __init__(self, engine, assets, horizons=('1h',), check_interval=900, retrain_interval=24,
+                 window=48, feature_threshold=2.0, residual_threshold=1.5, residual_min_bars=12):
+        self.engine = engine
+        self.assets = list(assets)
+        self.horizons = list(horizons)
+        self.check_interval = check_interval
+        self.retrain_interval = timedelta(hours=retrain_interval)
+        self.window = window
+        self.feature_threshold = feature_threshold
+        self.residual_threshold = residual_threshold
+        self.residual_min_bars = residual_min_bars
+        self.status = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self.run, name='retraining-worker', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def retrain_reasons(self, asset, horizons=None):
+        """Why the models of an asset should be retrained now: {horizon: reason or None}"""
+        reasons = {}
+        drift_checks = []
+        for horizon in horizons or self.horizons:
+            model, metadata = self.engine.registry.get_with_metadata(asset, horizon)
+            if model is None:
+                reasons[horizon] = 'no model'
+                continue
+
+            trained_at = datetime.fromisoformat(metadata['trained_at'].rstrip('Z'))
+            # A model found up to date with its data by the scheduler counts as checked then
+            checked_at = datetime.fromisoformat(metadata.get('checked_at', metadata['trained_at']).rstrip('Z'))
+            if datetime.utcnow() - checked_at >= self.retrain_interval:
+                reasons[horizon] = f"model is older than {self.retrain_interval}"
+            elif 'feature_mean' not in metadata:
+                # Models stored before drift tracking carry no baseline
+                reasons[horizon] = None
+            else:
+                drift_checks.append((horizon, model, metadata, trained_at))
+
+        if not drift_checks:
+            return reasons
+
+        # The last `window` bars need a week of history before them, plus the bars
+        # of the longest horizon whose target is still open
+        days = 8 + (self.window + max(HORIZON_BARS[check[0]] for check in drift_checks)) // 24
+        df = self.engine.engineer_features(self.engine.load_historical_data(asset, days=days))
+        recent = df.tail(self.window)
+
+        for horizon, model, metadata, trained_at in drift_checks:
+            # Out-of-sample bars only: the model was fit on every bar up to trained_at
+            unseen = df[(df['timestamp'] > trained_at) & df[target_column(horizon)].notna()].tail(self.window)
+            residual = 0.0
+            if len(unseen) >= self.residual_min_bars:
+                residual = residual_drift(
+                    metadata, unseen[target_column(horizon)], model.predict(unseen[FEATURE_COLUMNS].to_numpy())
+                )
+            drift = {
+                'feature': feature_drift(metadata, recent[FEATURE_COLUMNS].to_numpy()),
+                'residual': residual,
+                'residual_bars': len(unseen)
+            }
+            self.status[(asset, horizon)] = drift
+
+            if drift['feature'] > self.feature_threshold:
+                reasons[horizon] = f"feature drift {drift['feature']:.2f} > {self.feature_threshold:.2f}"
+            elif drift['residual'] > self.residual_threshold:
+                reasons[horizon] = f"residual drift {drift['residual']:.2f} > {self.residual_threshold:.2f}"
+            else:
+                reasons[horizon] = None
+        return reasons
+
+    def check(self):
+        """Check every asset once and schedule the retraining that is due"""
+        for asset in self.assets:
+            horizons = [horizon for horizon in self.horizons if not self.engine.trainer.is_pending(asset, horizon)]
+            if not horizons:
+                continue
+            try:
+                due = []
+                for horizon, reason in self.retrain_reasons(asset, horizons).items():
+                    if reason is not None:
+                        logger.info(f"Retraining {asset} ({horizon}): {reason}")
+                        due.append(horizon)
+                if due:
+                    self.engine.trainer.submit_horizons(asset, due)
+            except Exception as e:
+                logger.error(f"Retraining check failed for {asset}: {e}")
+
+    def run(self):
+        while not self._stopped.is_set():
+            self.check()
+            self._stopped.wait(self.check_interval)
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Parallel parameter sweep over the StrategyConfig keys.
+
+    python sweep.py --grid risk_factor=0.5,1.0,1.5 confidence_threshold=0.6,0.7,0.8
+    python sweep.py --random 500 --range risk_factor=0.2:2.0 volatility_multiplier=0.5:3.0
+
+The backtest data is prepared once (see backtest.py). Its arrays are
+then copied into one shared memory block. Worker processes map that
+block instead of receiving a pickled copy, so each task only ships a
+small parameter dict. Every parameter set is simulated with
+backtest.simulate(), and the results are written as a table ranked by
+--metric. Like the backtest, the ranking ignores the portfolio VaR and
+drawdown gates and exposure booking of the live risk engine.
+"""
+
+import os
+import random
+import logging
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from backtest import DEFAULT_PARAMETERS, BacktestData, Backtester, simulate
+from features import HORIZON_BARS
+from market_data import MarketData
+
+logger = logging.getLogger(__name__)
+
+# BacktestData fields kept in shared memory (asset_names is a small list and is passed as is)
+SHARED_FIELDS = [field for field in BacktestData._fields if field != 'asset_names']
+
+# Metrics where lower is better
+ASCENDING_METRICS = {'max_drawdown'}
+
+# Per-process state of the sweep workers
+_worker = {}
+
+
+def share_data(data):
+    """Copy the arrays of BacktestData into one shared memory block; returns (block, layout)"""
+    arrays = [np.ascontiguousarray(getattr(data, field)) for field in SHARED_FIELDS]
+    block = shared_memory.SharedMemory(create=True, size=max(sum(a.nbytes for a in arrays), 1))
+
+    layout = []
+    offset = 0
+    for field, array in zip(SHARED_FIELDS, arrays):
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf, offset=offset)
+        view[:] = array
+        layout.append((field, array.dtype.str, array.shape, offset))
+        offset += array.nbytes
+    return block, layout
+
+
+def attach_data(name, layout, asset_names):
+    """Map a shared block written by share_data() as BacktestData (no copy)"""
+    block = shared_memory.SharedMemory(name=name)
+    arrays = {
+        field: np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf, offset=offset)
+        for field, dtype, shape, offset in layout
+    }
+    return block, BacktestData(asset_names=asset_names, **arrays)
+
+
+def _init_worker(name, layout, asset_names, capital, cost_bps, mode):
+    block, data = attach_data(name, layout, asset_names)
+    # Keep the block referenced for the lifetime of the worker
+    _worker.update(block=block, data=data, capital=capital, cost_bps=cost_bps, mode=mode)
+
+
+def _evaluate(params):
+    result = simulate(_worker['data'], params, _worker['capital'], _worker['cost_bps'], _worker['mode'])
+    return params, result['metrics']
+
+
+def parameter_grid(grid):
+    """Cartesian product of {key: [values]}"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def random_parameters(ranges, count, seed=42):
+    """`count` parameter sets drawn uniformly from {key: (low, high)}"""
+    rng = random.Random(seed)
+    return [
+        {key: rng.uniform(low, high) for key, (low, high) in ranges.items()}
+        for _ in range(count)
+    ]
+
+
+def run_sweep(data, candidates, capital=100000.0, cost_bps=0.0, mode='vectorized',
+              metric='sharpe', max_workers=None):
+    """Evaluate every parameter set across worker processes; returns a ranked DataFrame"""
+    max_workers = max_workers or os.cpu_count() or 1
+    block, layout = share_data(data)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(block.name, layout, data.asset_names, capital, cost_bps, mode)
+        ) as executor:
+            chunksize = max(1, len(candidates) // (max_workers * 4))
+            results = list(executor.map(_evaluate, candidates, chunksize=chunksize))
+    finally:
+        block.close()
+        block.unlink()
+
+    table = pd.DataFrame([
+        {**DEFAULT_PARAMETERS, **params, **metrics}
+        for params, metrics in results
+    ])
+    table = table.sort_values(metric, ascending=metric in ASCENDING_METRICS, kind='stable')
+    table.insert(0, 'rank', range(1, len(table) + 1))
+    return table.reset_index(drop=True)
+
+
+def parse_values(assignments):
+    """Parse KEY=V1,V2,... into {key: [values]}"""
+    grid = {}
+    for assignment in assignments:
+        key, _, values = assignment.partition('=')
+        if key not in DEFAULT_PARAMETERS:
+            raise ValueError(f"Unknown strategy parameter: {key}")
+        grid[key] = [float(value) for value in values.split(',')]
+    return grid
+
+
+def parse_ranges(assignments):
+    """Parse KEY=LOW:HIGH into {key: (low, high)}"""
+    ranges = {}
+    for assignment in assignments:
+        key, _, bounds = assignment.partition('=')
+        if key not in DEFAULT_PARAMETERS:
+            raise ValueError(f"Unknown strategy parameter: {key}")
+        low, _, high = bounds.partition(':')
+        ranges[key] = (float(low), float(high))
+    return ranges
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Sweep StrategyConfig parameters over a backtest")
+    parser.add_argument('--assets', nargs='+', default=['BTCUSD', 'ETHUSD', 'SOLUSD'])
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--train-days', type=int, default=30)
+    parser.add_argument('--horizon', default='1h', choices=sorted(HORIZON_BARS))
+    parser.add_argument('--mode', default='vectorized', choices=['vectorized', 'event'])
+    parser.add_argument('--capital', type=float, default=100000.0)
+    parser.add_argument('--cost-bps', type=float, default=0.0)
+    parser.add_argument('--grid', nargs='*', default=[], metavar='KEY=V1,V2,...')
+    parser.add_argument('--random', type=int, default=0, help="number of random parameter sets")
+    parser.add_argument('--range', nargs='*', default=[], metavar='KEY=LOW:HIGH')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--metric', default='sharpe')
+    parser.add_argument('--workers', type=int, default=0, help="worker processes (default: all cores)")
+    parser.add_argument('--output', default='sweep_results.csv')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    candidates = parameter_grid(parse_values(args.grid)) if args.grid else []
+    if args.random:
+        candidates += random_parameters(parse_ranges(args.range), args.random, args.seed)
+    if not candidates:
+        parser.error("give --grid and/or --random with --range")
+
+    backtester = Backtester(MarketData(), capital=args.capital, cost_bps=args.cost_bps)
+    data = backtester.prepare(args.assets, datetime.utcnow() - timedelta(days=args.days),
+                              horizon=args.horizon, train_days=args.train_days)
+
+    logger.info(f"Evaluating {len(candidates)} parameter sets")
+    table = run_sweep(data, candidates, args.capital, args.cost_bps, args.mode, args.metric,
+                      args.workers or None)
+    table.to_csv(args.output, index=False)
+    logger.info(f"Wrote {len(table)} results to {args.output}")
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(table.head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
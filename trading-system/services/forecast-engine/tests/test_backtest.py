@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+import pytest
+from backtest import Backtester
+from market_data import MarketData
+from sweep import parameter_grid, run_sweep
+
+
+@pytest.fixture
+def market_data(tmp_path, monkeypatch):
+    """Synthetic bars only: an empty bar store and no database or Redis"""
+    monkeypatch.setenv('BAR_DATA_DIR', str(tmp_path))
+    monkeypatch.setenv('SYNTHETIC_MARKET_DATA', 'True')
+    return MarketData()
+
+
+def test_backtest_runs_on_market_data_alone(market_data):
+    backtester = Backtester(market_data, backend='linear')
+    backtester.prepare(['BTCUSD'], datetime.utcnow() - timedelta(days=20), train_days=20)
+
+    vectorized = backtester.run({'risk_factor': 1.0, 'confidence_threshold': 0.7})
+    event = backtester.run({'risk_factor': 1.0, 'confidence_threshold': 0.7}, mode='event')
+
+    assert vectorized.metrics['trades'] > 0
+    # The event mode can only drop trades, through the drawdown limit
+    assert event.metrics['trades'] <= vectorized.metrics['trades']
+
+
+def test_stricter_confidence_never_adds_trades(market_data):
+    backtester = Backtester(market_data, backend='linear')
+    backtester.prepare(['BTCUSD'], datetime.utcnow() - timedelta(days=20), train_days=20)
+
+    loose = backtester.run({'confidence_threshold': 0.7})
+    strict = backtester.run({'confidence_threshold': 0.95})
+    assert strict.metrics['trades'] <= loose.metrics['trades']
+
+
+def test_sweep_ranks_every_parameter_set(market_data):
+    backtester = Backtester(market_data, backend='linear')
+    data = backtester.prepare(['BTCUSD'], datetime.utcnow() - timedelta(days=20), train_days=20)
+    candidates = parameter_grid({'risk_factor': [0.5, 1.0], 'confidence_threshold': [0.7, 0.9]})
+
+    table = run_sweep(data, candidates, metric='total_return', max_workers=2)
+
+    assert len(table) == 4
+    assert table['rank'].tolist() == [1, 2, 3, 4]
+    assert table['total_return'].is_monotonic_decreasing
@@ -0,0 +1,67 @@
+import os
+import numpy as np
+import pandas as pd
+from bar_store import BarStore
+
+
+def bars(start, periods, close=100.0):
+    timestamps = pd.date_range(start, periods=periods, freq='h')
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'open': close, 'high': close, 'low': close, 'close': close,
+        'volume': 1.0,
+    })
+
+
+def test_round_trip_and_range(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write_bars('BTCUSD', bars('2026-10-17 00:00', 48))
+
+    assert store.days('BTCUSD') == ['2026-10-17', '2026-10-18']
+    df = store.read_bars('BTCUSD', start='2026-10-17 22:00', end='2026-10-18 02:00')
+    assert list(df['timestamp'].dt.hour) == [23, 0, 1, 2]
+
+
+def test_merge_keeps_latest_bar(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write_bars('BTCUSD', bars('2026-10-18 00:00', 4, close=1.0))
+    store.write_bars('BTCUSD', bars('2026-10-18 02:00', 4, close=2.0))
+
+    df = store.read_bars('BTCUSD')
+    assert len(df) == 6
+    np.testing.assert_array_equal(df['close'], [1, 1, 2, 2, 2, 2])
+
+
+def test_hidden_and_stray_entries_are_not_days(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write_bars('BTCUSD', bars('2026-10-18 00:00', 4))
+    store.write_bars('BTCUSD', bars('2026-10-18 04:00', 4))
+    os.makedirs(tmp_path / 'BTCUSD' / '2026-10-18.tmp')
+
+    assert store.days('BTCUSD') == ['2026-10-18']
+    assert len(store.read_bars('BTCUSD')) == 8
+
+
+def test_reader_of_replaced_version_survives_next_write(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.write_bars('BTCUSD', bars('2026-10-18 00:00', 4, close=1.0))
+    resolved = os.path.realpath(tmp_path / 'BTCUSD' / '2026-10-18')
+
+    store.write_bars('BTCUSD', bars('2026-10-18 04:00', 4, close=2.0))
+
+    # A reader that resolved the day before the swap still finds its files
+    assert len(np.load(os.path.join(resolved, 'close.npy'))) == 4
+    assert len(store.read_bars('BTCUSD')) == 8
+
+
+def test_legacy_directory_partition_is_replaced(tmp_path):
+    store = BarStore(str(tmp_path))
+    legacy = tmp_path / 'BTCUSD' / '2026-10-18'
+    os.makedirs(legacy)
+    for column, values in bars('2026-10-18 00:00', 2).items():
+        np.save(legacy / f"{column}.npy", values.to_numpy())
+
+    store.write_bars('BTCUSD', bars('2026-10-18 02:00', 2))
+
+    assert os.path.islink(legacy)
+    assert len(store.read_bars('BTCUSD')) == 4
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from features import FEATURE_COLUMNS, IncrementalFeatureState, RollingWindow, parse_horizons
+from market_data import MarketData
+
+
+@pytest.fixture
+def market_data(tmp_path, monkeypatch):
+    monkeypatch.setenv('BAR_DATA_DIR', str(tmp_path))
+    return MarketData()
+
+
+def bars(n=400, seed=11):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='h'),
+        'close': 100 * np.cumprod(1 + rng.normal(0, 0.01, n)),
+    })
+
+
+def test_incremental_features_match_pandas(market_data):
+    df = bars()
+    expected = market_data.engineer_features(df.copy()).set_index('timestamp')[FEATURE_COLUMNS]
+
+    state = IncrementalFeatureState()
+    matched = 0
+    for timestamp, close in zip(df['timestamp'], df['close']):
+        state.update(close, timestamp)
+        if timestamp in expected.index:
+            np.testing.assert_allclose(state.features(), expected.loc[timestamp].values, rtol=1e-9)
+            matched += 1
+        else:
+            assert state.features() is None
+    assert matched == len(expected) > 0
+
+
+def test_rsi_of_a_flat_then_rising_series_matches_pandas(market_data):
+    # Windows without losses (RSI 100) must agree too
+    closes = np.concatenate([np.full(180, 100.0), 100.0 + np.arange(1, 21)])
+    df = pd.DataFrame({'timestamp': np.arange(200), 'close': closes})
+    expected = market_data.calculate_rsi(df['close'])
+
+    state = IncrementalFeatureState()
+    state.update_many(df)
+    assert state.rsi() == expected.iloc[-1] == 100.0
+
+
+def test_rolling_window_does_not_drift():
+    # Prices go through mean() only, returns through std()
+    prices = 1e6 + np.random.default_rng(2).normal(0, 1, 10000)
+    returns = np.random.default_rng(3).normal(0, 0.01, 10000)
+    price_window, return_window = RollingWindow(24), RollingWindow(24)
+    for price, ret in zip(prices, returns):
+        price_window.push(price)
+        return_window.push(ret)
+
+    assert np.isclose(price_window.mean(), prices[-24:].mean(), rtol=1e-12)
+    assert np.isclose(return_window.std(), returns[-24:].std(ddof=1), rtol=1e-9)
+
+
+def test_parse_horizons():
+    assert parse_horizons(' 1h, 4h,1d ') == ['1h', '4h', '1d']
+    with pytest.raises(ValueError):
+        parse_horizons('1h,2h')
+    with pytest.raises(ValueError):
+        parse_horizons(' , ')
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from trading_shared.ids import SnowflakeGenerator
+from main import ForecastEngine
+
+
+class ConstantModel:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return np.full(len(X), self.value)
+
+
+@pytest.fixture
+def engine():
+    """ForecastEngine without database, Redis or trained models"""
+    engine = object.__new__(ForecastEngine)
+    engine.horizons = ['1h', '4h']
+    engine.ids = SnowflakeGenerator(1)
+    engine.models = {
+        asset: {horizon: ConstantModel(i * 10 + j) for j, horizon in enumerate(engine.horizons)}
+        for i, asset in enumerate(['AAA', 'BBB', 'CCC'])
+    }
+    engine.get_models = lambda asset, horizons: {h: engine.models[asset][h] for h in horizons}
+
+    def update_feature_state(asset):
+        if asset == 'BBB':
+            raise ValueError(f"Not enough history to compute features for {asset}")
+        return np.zeros(4)
+
+    engine.update_feature_state = update_feature_state
+    return engine
+
+
+def test_failing_asset_does_not_shift_models(engine):
+    forecasts = engine.generate_forecasts(['AAA', 'BBB', 'CCC'])
+
+    predictions = {(f['asset'], f['horizon']): f['prediction'] for f in forecasts}
+    assert predictions == {('AAA', '1h'): 0, ('AAA', '4h'): 1, ('CCC', '1h'): 20, ('CCC', '4h'): 21}
+
+
+def test_forecast_ids_are_unique(engine):
+    forecasts = engine.generate_forecasts(['AAA', 'CCC'])
+
+    assert len({f['id'] for f in forecasts}) == len(forecasts) == 4
@@ -0,0 +1,59 @@
+import numpy as np
+from benchmark_models import benchmark_backend
+from market_data import MarketData
+from model_backends import create_model, predict_rows
+
+
+class CountingModel:
+    def __init__(self, offset):
+        self.offset = offset
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return X[:, 0] + self.offset
+
+
+def fitted(backend, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, 5))
+    y = X @ rng.normal(size=5) + rng.normal(scale=0.1, size=200)
+    return create_model(backend).fit(X, y)
+
+
+def test_linear_models_match_their_own_predict():
+    models = [fitted('linear', seed) for seed in range(4)]
+    X = np.random.default_rng(9).normal(size=(4, 5))
+
+    expected = [model.predict(X[i:i + 1])[0] for i, model in enumerate(models)]
+    np.testing.assert_allclose(predict_rows(models, X), expected)
+
+
+def test_shared_models_predict_once():
+    shared = CountingModel(100)
+    other = CountingModel(0)
+    X = np.arange(8, dtype=float).reshape(4, 2)
+
+    predictions = predict_rows([shared, other, shared, shared], X)
+
+    np.testing.assert_allclose(predictions, [100, 2, 104, 106])
+    assert shared.calls == 1 and other.calls == 1
+
+
+def test_mixed_backends_keep_row_order():
+    linear = fitted('linear', 1)
+    forest = fitted('random_forest', 2)
+    X = np.random.default_rng(3).normal(size=(3, 5))
+
+    predictions = predict_rows([forest, linear, forest], X)
+
+    np.testing.assert_allclose(predictions[[0, 2]], forest.predict(X[[0, 2]]))
+    np.testing.assert_allclose(predictions[1], linear.predict(X[1:2])[0])
+
+
+def test_benchmark_runs_on_market_data_alone(tmp_path, monkeypatch):
+    monkeypatch.setenv('BAR_DATA_DIR', str(tmp_path))
+    X, y, _ = MarketData().prepare_training_data('BTCUSD', '1h')
+
+    result = benchmark_backend(X, y, 'linear', n_jobs=1, repeat=5)
+    assert result['rows'] == len(X) and result['mse'] > 0
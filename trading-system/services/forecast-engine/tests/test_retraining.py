@@ -0,0 +1,87 @@
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+from model_registry import ModelRegistry
+from retraining import RetrainingWorker
+from training import TrainingScheduler, walk_forward_splits
+
+
+def fitted_model(weight=1.0):
+    return Ridge().fit(np.eye(3), np.full(3, weight))
+
+
+def age_manifest(registry, asset, horizon, hours):
+    """Pretend the model was trained (and last checked) `hours` ago"""
+    path = registry._manifest_file(asset, horizon)
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest['trained_at'] = (datetime.utcnow() - timedelta(hours=hours)).isoformat() + 'Z'
+    manifest.pop('checked_at', None)
+    with open(path, 'w') as f:
+        json.dump(manifest, f)
+
+
+def test_walk_forward_splits_never_train_on_later_rows():
+    splits = walk_forward_splits(100, n_splits=3)
+
+    assert len(splits) == 3
+    assert splits[0][1][0] == 50 and splits[-1][1][-1] == 99
+    for train, test in splits:
+        assert train.max() < test.min()
+        assert len(train) == test.min()
+    assert np.array_equal(np.concatenate([test for _, test in splits]), np.arange(50, 100))
+
+
+def test_registry_reloads_a_model_saved_by_another_process(tmp_path):
+    reader = ModelRegistry(str(tmp_path))
+    writer = ModelRegistry(str(tmp_path))
+    writer.save('BTCUSD', '1h', fitted_model(1.0), 'v1')
+    assert reader.get('BTCUSD', '1h').predict(np.eye(3)[:1])[0] > 0
+
+    writer.save('BTCUSD', '1h', fitted_model(-1.0), 'v2')
+    # Make sure the manifest's mtime differs even on filesystems with coarse timestamps
+    manifest = writer._manifest_file('BTCUSD', '1h')
+    os.utime(manifest, ns=(os.stat(manifest).st_atime_ns, os.stat(manifest).st_mtime_ns + 10 ** 9))
+
+    model, metadata = reader.get_with_metadata('BTCUSD', '1h')
+    assert metadata['version'] == 'v2'
+    assert model.predict(np.eye(3)[:1])[0] < 0
+
+
+def test_registry_keeps_only_recent_versions(tmp_path):
+    registry = ModelRegistry(str(tmp_path), keep_versions=2)
+    for version in ['v1', 'v2', 'v3']:
+        registry.save('BTCUSD', '1h', fitted_model(), version)
+
+    files = sorted(os.listdir(registry._model_path('BTCUSD', '1h')))
+    assert files == ['latest.json', 'v2.joblib', 'v3.joblib']
+
+
+def test_stale_model_with_unchanged_data_is_not_retrained_again(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.save('BTCUSD', '1h', fitted_model(), 'v1', {'mse': 1.0})
+    age_manifest(registry, 'BTCUSD', '1h', hours=30)
+
+    X = pd.DataFrame(np.eye(3))
+    engine = SimpleNamespace(
+        registry=registry,
+        model_backend=lambda asset: 'linear',
+        prepare_training_sets=lambda asset, horizons: {h: (X, X[0], 'v1') for h in horizons},
+    )
+    worker = RetrainingWorker(engine, ['BTCUSD'], retrain_interval=24)
+    assert worker.retrain_reasons('BTCUSD')['1h'] == 'model is older than 1 day, 0:00:00'
+
+    scheduler = object.__new__(TrainingScheduler)
+    scheduler.engine = engine
+    scheduler._pending = {}
+    scheduler._lock = threading.Lock()
+    assert scheduler.submit('BTCUSD', '1h') is None
+
+    # The data version matched, so the check restarted the model's age
+    assert registry.get_with_metadata('BTCUSD', '1h')[1]['checked_at']
+    assert worker.retrain_reasons('BTCUSD') == {'1h': None}
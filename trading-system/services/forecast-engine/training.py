@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+import numpy as np
+from model_backends import DEFAULT_BACKEND, create_model, prepare_for_inference
+
+logger = logging.getLogger(__name__)
+
+
+def walk_forward_splits(n_samples, n_splits=3, min_train_fraction=0.5):
+    """
+    Time-ordered (train, test) index ranges: each fold trains on every row
+    before its test block, so no future data reaches the model
+    """
+    start = int(n_samples * min_train_fraction)
+    bounds = np.linspace(start, n_samples, n_splits + 1).astype(int)
+    return [
+        (np.arange(0, test_start), np.arange(test_start, test_end))
+        for test_start, test_end in zip(bounds[:-1], bounds[1:])
+        if test_end > test_start
+    ]
+
+
+def fit_model(X, y, n_jobs=1, n_splits=3, backend=DEFAULT_BACKEND):
+    """
+    Fit and evaluate a model of `backend` on prepared training data (runs in worker processes).
+
+    The MSE is measured walk-forward over `n_splits` time-ordered folds. The
+    returned model is then fit on all rows, so it includes the latest bars.
+    The metadata also holds the feature distribution of the training data,
+    which the drift monitor compares recent bars against.
+    """
+    # Models are fit on plain arrays, like the feature rows they predict at inference.
+    # Copies, because arrays unpickled in a worker process are read-only
+    features = np.array(X, dtype=np.float64, order='C')
+    target = np.array(y, dtype=np.float64)
+
+    # Walk-forward evaluation
+    squared_errors = []
+    for train_index, test_index in walk_forward_splits(len(features), n_splits):
+        model = create_model(backend, n_jobs)
+        model.fit(features[train_index], target[train_index])
+        y_pred = model.predict(features[test_index])
+        squared_errors.append((target[test_index] - y_pred) ** 2)
+    mse = float(np.mean(np.concatenate(squared_errors)))
+
+    # Train model
+    model = create_model(backend, n_jobs)
+    model.fit(features, target)
+    prepare_for_inference(model)
+
+    return model, {
+        'backend': backend,
+        'mse': mse,
+        'feature_mean': X.mean().tolist(),
+        'feature_std': X.std().tolist()
+    }
+
+
+class TrainingScheduler:
+    """
+    Fans model training out across a process pool.
+
+    Training data is prepared in the calling process (so the engine's DB and
+    Redis connections never cross process boundaries) and only the feature
+    matrix is shipped to a worker. Finished models are saved to the registry
+    from a completion callback, so callers never wait on training.
+    """
+
+    def __init__(self, engine, max_workers=None, n_jobs=None, n_splits=3):
+        cpu_count = os.cpu_count() or 1
+        self.engine = engine
+        self.n_splits = n_splits
+        self.max_workers = max_workers or cpu_count
+        # Spread the cores not used by separate workers over each model's trees
+        self.n_jobs = n_jobs or max(1, cpu_count // self.max_workers)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def is_pending(self, asset, horizon='1h'):
+        """Check whether a model for (asset, horizon) is currently being trained"""
+        with self._lock:
+            return (asset, horizon) in self._pending
+
+    def submit_horizons(self, asset, horizons):
+        """
+        Schedule training for several horizons of an asset; returns {horizon: future}.
+
+        The bars are loaded and the features engineered once for all horizons.
+        Horizons already being trained return their pending future, and
+        horizons whose model is up to date are left out. A horizon is reserved
+        under the lock before its data is prepared, so concurrent callers
+        never schedule the same model twice. The returned futures resolve to
+        (model, metadata) once the model is saved to the registry.
+        """
+        futures = {}
+        reserved = {}
+        with self._lock:
+            for horizon in horizons:
+                if (asset, horizon) in self._pending:
+                    futures[horizon] = self._pending[(asset, horizon)]
+                else:
+                    reserved[horizon] = self._pending[(asset, horizon)] = Future()
+        if not reserved:
+            return futures
+
+        try:
+            backend = self.engine.model_backend(asset)
+            for horizon, (X, y, version) in self.engine.prepare_training_sets(asset, list(reserved)).items():
+                if self.engine.registry.has(asset, horizon, version):
+                    logger.info(f"Model for {asset} ({horizon}) is up to date (version {version})")
+                    # Retraining on the same data gives the same model; restart its age instead
+                    self.engine.registry.mark_checked(asset, horizon, version)
+                    continue
+
+                logger.info(f"Scheduling {backend} training for {asset} ({horizon})")
+                future = self.executor.submit(fit_model, X, y, self.n_jobs, self.n_splits, backend)
+                reservation = reserved.pop(horizon)
+                future.add_done_callback(
+                    lambda f, horizon=horizon, version=version, reservation=reservation:
+                        self._on_trained(asset, horizon, version, f, reservation)
+                )
+                futures[horizon] = reservation
+        except Exception as e:
+            for reservation in reserved.values():
+                reservation.set_exception(e)
+            raise
+        finally:
+            # Release the horizons that were not scheduled
+            with self._lock:
+                for horizon in reserved:
+                    self._pending.pop((asset, horizon), None)
+            for reservation in reserved.values():
+                if not reservation.done():
+                    reservation.set_result(None)
+        return futures
+
+    def submit(self, asset, horizon='1h'):
+        """Schedule training for an asset; returns the future, or None if nothing to do"""
+        return self.submit_horizons(asset, [horizon]).get(horizon)
+
+    def submit_many(self, assets, horizons=('1h',)):
+        """Schedule training for several assets and horizons; failures are logged per asset"""
+        futures = []
+        for asset in assets:
+            try:
+                futures.extend(self.submit_horizons(asset, horizons).values())
+            except Exception as e:
+                logger.error(f"Failed to schedule training for {asset}: {e}")
+        return futures
+
+    def _on_trained(self, asset, horizon, version, future, reservation):
+        """Store a finished model in the registry and resolve its reservation (runs in the executor's callback thread)"""
+        try:
+            model, metadata = future.result()
+            self.engine.registry.save(asset, horizon, model, version, metadata)
+            logger.info(f"Model trained for {asset} ({horizon}). MSE: {metadata['mse']:.6f}")
+        except Exception as e:
+            logger.error(f"Failed to train model for {asset} ({horizon}): {e}")
+            with self._lock:
+                self._pending.pop((asset, horizon), None)
+            reservation.set_exception(e)
+        else:
+            with self._lock:
+                self._pending.pop((asset, horizon), None)
+            reservation.set_result((model, metadata))
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -1,5 +1,5 @@
 import axios from 'axios'
-import { Forecast, StrategyConfig } from '../types'
+import { Forecast, PaginatedResponse, StrategyConfig } from '../types'
 
 // Create axios instance with base URL
 const API_BASE_URL = 'http://localhost:8000/api'
@@ -15,8 +15,9 @@ const apiClient = axios.create({
 // Forecast API functions
 export const fetchForecasts = async (): Promise<Forecast[]> => {
   try {
-    const response = await apiClient.get<Forecast[]>('/forecasts/')
-    return response.data
+    // Only the newest page is needed; older forecasts are reachable via `next`
+    const response = await apiClient.get<PaginatedResponse<Forecast>>('/forecasts/')
+    return response.data.results
   } catch (error) {
     console.error('Error fetching forecasts:', error)
     throw error
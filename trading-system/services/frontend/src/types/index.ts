@@ -1,5 +1,5 @@
 export interface Forecast {
-  id: number;
+  id: string;  // 64-bit Snowflake id, sent as a string
   asset: string;
   horizon: string;
   prediction: number;
@@ -13,6 +13,11 @@ export interface StrategyConfig {
   value: string;
 }
 
+export interface PaginatedResponse<T> {
+  next: string | null;
+  results: T[];
+}
+
 export interface ApiResponse<T> {
   data: T;
   status: string;
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import asyncio
+import random
+import aiohttp
+from matching_engine import BUY, LiquidityProvider, MatchingEngine
+from order_router import FILLED, PARTIALLY_FILLED, REJECTED
+
+
+class Broker:
+    """
+    Interface used by the OrderRouter.
+
+    submit_order() receives an order dict (trade_id, asset, side, size,
+    optionally limit_price). It returns a dict with status, filled_size,
+    ordered_price and average_fill_price, or raises if the broker gave no
+    usable answer.
+    """
+
+    async def submit_order(self, order):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class SimulatedBroker(Broker):
+    """In-process stand-in for a broker: random latency, fill rate (90-100%) and slippage (±1%)"""
+
+    def __init__(self, min_latency=0.1, max_latency=0.5):
+        self.min_latency = min_latency
+        self.max_latency = max_latency
+
+    async def submit_order(self, order):
+        await asyncio.sleep(random.uniform(self.min_latency, self.max_latency))
+        return {
+            'status': FILLED,
+            'filled_size': order['size'] * random.uniform(0.9, 1.0),
+            'ordered_price': 100.0,  # Placeholder price
+            'average_fill_price': 100.0 * random.uniform(0.99, 1.01)
+        }
+
+
+class HTTPBroker(Broker):
+    """
+    Broker REST client: POST {base_url}/orders with the order as JSON.
+
+    All orders share one aiohttp session, so connections are pooled and
+    reused. The response must contain status, filled_size, ordered_price
+    and average_fill_price. See mock_broker.py for a local implementation.
+    """
+
+    def __init__(self, base_url, api_key, api_secret, max_connections=100, timeout=10.0):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {'X-API-KEY': api_key, 'X-API-SECRET': api_secret}
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.session = None
+
+    async def submit_order(self, order):
+        # The session has to be created inside the running event loop
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+        payload = {
+            'client_order_id': str(order['trade_id']),
+            'asset': order['asset'],
+            'side': order['side'],
+            'size': order['size'],
+            'type': 'market'
+        }
+        if order.get('limit_price') is not None:
+            payload.update(type='limit', price=order['limit_price'])
+        async with self.session.post(f"{self.base_url}/orders", json=payload) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+
+class MatchingEngineBroker(Broker):
+    """
+    Local exchange: orders are matched in an in-process MatchingEngine.
+
+    Before each order, a LiquidityProvider tops up the book of its asset.
+    Fills then depend only on the order flow and not on random draws, so
+    load tests are repeatable. `latency` adds a fixed exchange round trip.
+    The router expects exactly one answer per order. So a limit order
+    (limit_price set) is immediate-or-cancel here, like a market order:
+    any unfilled remainder is cancelled instead of left resting.
+    """
+
+    def __init__(self, engine=None, liquidity=None, latency=0.0):
+        self.engine = engine or MatchingEngine()
+        self.liquidity = liquidity if liquidity is not None else LiquidityProvider(self.engine)
+        self.latency = latency
+
+    async def submit_order(self, order):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        asset = order['asset']
+        if self.liquidity:
+            self.liquidity.replenish(asset)
+
+        book = self.engine.book(asset)
+        best = book.best_ask() if order['side'] == BUY else book.best_bid()
+        limit_price = order.get('limit_price')
+
+        taker, fills = self.engine.submit(asset, order['side'], order['size'], limit_price, owner=order['trade_id'])
+        if taker.remaining > 0 and limit_price is not None:
+            self.engine.cancel(asset, taker.order_id)
+        if self.liquidity:
+            self.liquidity.on_fills(asset, fills)
+
+        filled = taker.filled
+        if filled <= 0:
+            status = REJECTED
+        elif taker.remaining > 0:
+            status = PARTIALLY_FILLED
+        else:
+            status = FILLED
+
+        # Market orders are priced at the best opposite quote on arrival
+        ordered_price = limit_price
+        if ordered_price is None and best is not None:
+            ordered_price = self.engine.to_price(best)
+        average_fill_price = None
+        if filled > 0:
+            average_fill_price = self.engine.to_price(sum(f.price * f.quantity for f in fills) / filled)
+
+        return {
+            'status': status,
+            'filled_size': filled,
+            'ordered_price': ordered_price,
+            'average_fill_price': average_fill_price,
+            'fills': len(fills)
+        }
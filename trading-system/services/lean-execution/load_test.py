@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Offline load test of the execution path against the local matching engine.
+
+    python load_test.py --orders 20000 --rate 2000 --assets 50
+
+Generates approved trade signals from a seeded RNG and sends them through
+LeanExecutionEngine.execute_trade() and the OrderRouter to a
+MatchingEngineBroker. No Redis, broker or database is involved. It
+reports throughput, order states and submit-to-fill latency percentiles.
+Apart from the timings, a run with the same arguments gives the same fills.
+"""
+
+import os
+import time
+import random
+import logging
+import asyncio
+import argparse
+import statistics
+from brokers import MatchingEngineBroker
+from main import LeanExecutionEngine
+from matching_engine import LiquidityProvider, MatchingEngine
+from netting import OrderNetter
+from order_router import OrderRouter
+
+
+def generate_signals(count, assets, seed=42):
+    rng = random.Random(seed)
+    names = [f"ASSET{i:03d}" for i in range(assets)]
+    for i in range(count):
+        yield {
+            'forecast_id': i,
+            'asset': rng.choice(names),
+            'horizon': '1h',
+            'prediction': rng.choice((-1, 1)) * rng.uniform(0.001, 0.05),
+            'confidence': rng.uniform(0.6, 0.95),
+            'position_size': rng.uniform(0.001, 0.05)
+        }
+
+
+async def run_load_test(engine, broker, orders, rate, assets, seed, netting_window_ms=0):
+    latencies = []
+    slippage = []
+
+    def record(order):
+        latencies.append(time.perf_counter() - order['submitted_at'])
+        if order.get('average_fill_price') and order.get('ordered_price'):
+            slippage.append(order['average_fill_price'] / order['ordered_price'] - 1)
+
+    engine.router = OrderRouter(
+        broker,
+        max_in_flight=engine.max_in_flight,
+        max_in_flight_per_asset=engine.max_in_flight_per_asset,
+        on_complete=record
+    )
+    if netting_window_ms > 0:
+        engine.router.on_complete = None
+        engine.router = OrderNetter(engine.router, engine.ids.next_id, window_ms=netting_window_ms, on_complete=record)
+
+    # Stamp every order when it is accepted
+    submit = engine.router.submit
+
+    async def timed_submit(order, on_complete=None):
+        order['submitted_at'] = time.perf_counter()
+        return await submit(order, on_complete)
+
+    engine.router.submit = timed_submit
+
+    start = time.perf_counter()
+    for i, signal in enumerate(generate_signals(orders, assets, seed)):
+        if rate:
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await engine.execute_trade(signal)
+    await engine.router.drain()
+    elapsed = time.perf_counter() - start
+
+    await engine.router.close()
+    await engine.redis_client.aclose()
+    return elapsed, latencies, slippage
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the execution engine against local order books")
+    parser.add_argument('--orders', type=int, default=10000)
+    parser.add_argument('--rate', type=float, default=0, help="orders per second (0 = as fast as possible)")
+    parser.add_argument('--assets', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="fixed exchange round trip")
+    parser.add_argument('--netting-window-ms', type=float, default=0.0, help="net orders per asset over this window")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    # Measure the execution path, not the per-order log lines
+    logging.getLogger().setLevel(logging.WARNING)
+
+    # A fixed worker id, since no Redis is available to lease one from
+    os.environ.setdefault('ID_WORKER_ID', '0')
+    engine = LeanExecutionEngine()
+    matching = MatchingEngine(engine.matching_config['tick_size'])
+    liquidity = LiquidityProvider(
+        matching,
+        reference_price=engine.matching_config['reference_price'],
+        levels=engine.matching_config['levels'],
+        size=engine.matching_config['level_size']
+    )
+    broker = MatchingEngineBroker(matching, liquidity, latency=args.latency_ms / 1000)
+
+    try:
+        elapsed, latencies, slippage = asyncio.run(
+            run_load_test(engine, broker, args.orders, args.rate, args.assets, args.seed, args.netting_window_ms)
+        )
+    finally:
+        engine.trade_writer.close()
+
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    print(f"Orders:     {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s)")
+    print(f"States:     {dict(engine.router.completed)}")
+    if isinstance(engine.router, OrderNetter):
+        print(f"Broker:     {engine.router.child_orders} child orders")
+    print(f"Latency:    p50 {percentiles[49] * 1000:.3f} ms, p95 {percentiles[94] * 1000:.3f} ms, "
+          f"p99 {percentiles[98] * 1000:.3f} ms, max {max(latencies) * 1000:.3f} ms")
+    if slippage:
+        print(f"Slippage:   mean {statistics.fmean(slippage) * 1e4:.2f} bp, max {max(slippage, key=abs) * 1e4:.2f} bp")
+
+
+if __name__ == "__main__":
+    main()
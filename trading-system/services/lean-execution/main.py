@@ -2,13 +2,21 @@
 
 import os
 import sys
-import time
 import logging
+import socket
+import asyncio
 import redis
-import json
+import redis.asyncio as aioredis
 from datetime import datetime
 from decouple import config
-import requests
+from trading_shared.batch_writer import BatchWriter
+from trading_shared.codec import decode_message, encode_message, get_codec
+from trading_shared.ids import create_id_generator
+from trading_shared.streams import AsyncStreamConsumer
+from brokers import HTTPBroker, MatchingEngineBroker, SimulatedBroker
+from matching_engine import LiquidityProvider, MatchingEngine
+from netting import OrderNetter
+from order_router import FAILED, OrderRouter
 
 # Configure logging
 logging.basicConfig(
@@ -17,10 +25,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+INSERT_TRADE = """
+INSERT INTO trading_trade (
+    id, forecast_id, asset, horizon, side, ordered_size, filled_size,
+    ordered_price, average_fill_price, status, timestamp
+)
+VALUES %s
+"""
+
 
 class LeanExecutionEngine:
     def __init__(self):
         # Load configuration
+        self.db_config = {
+            'host': config('DB_HOST', default='postgres'),
+            'database': config('DB_NAME', default='tradingdb'),
+            'user': config('DB_USER', default='trader'),
+            'password': config('DB_PASS', default='secure_password_change_me'),
+            'port': config('DB_PORT', default='5432', cast=int)
+        }
+        
         self.redis_config = {
             'host': config('REDIS_HOST', default='redis'),
             'port': config('REDIS_PORT', default='63379', cast=int),
@@ -33,31 +57,79 @@ class LeanExecutionEngine:
             'api_secret': config('BROKER_API_SECRET', default='your-broker-api-secret'),
             'base_url': config('BROKER_API_URL', default='https://api.broker.com')
         }
+        self.broker_mode = config('BROKER_MODE', default='simulated')
+        
+        # Local exchange for BROKER_MODE=matching: book tick size and the liquidity quoted per asset
+        self.matching_config = {
+            'tick_size': config('MATCHING_TICK_SIZE', default=0.01, cast=float),
+            'reference_price': config('MATCHING_REFERENCE_PRICE', default=100.0, cast=float),
+            'levels': config('MATCHING_DEPTH_LEVELS', default=20, cast=int),
+            'level_size': config('MATCHING_LEVEL_SIZE', default=10.0, cast=float),
+            'latency_ms': config('MATCHING_LATENCY_MS', default=0.0, cast=float)
+        }
+        
+        # Orders at the broker at the same time, in total and per asset
+        self.max_in_flight = config('EXECUTION_MAX_IN_FLIGHT', default=100, cast=int)
+        self.max_in_flight_per_asset = config('EXECUTION_MAX_IN_FLIGHT_PER_ASSET', default=10, cast=int)
+        self.router = None
+        
+        # Optional netting of orders per asset over a short window, and slicing of large net orders
+        self.netting_window_ms = config('EXECUTION_NETTING_WINDOW_MS', default=0, cast=float)
+        self.slice_size = config('EXECUTION_SLICE_SIZE', default=0, cast=float)
+        self.slice_interval_ms = config('EXECUTION_SLICE_INTERVAL_MS', default=1000, cast=float)
+        # Relative volume per time bucket for VWAP slices (empty: equal TWAP slices)
+        self.volume_profile = config(
+            'EXECUTION_VWAP_PROFILE', default='',
+            cast=lambda v: [float(w) for w in v.split(',') if w.strip()]
+        )
+        
+        # Message transport: 'pubsub' (fire-and-forget) or 'streams' (consumer groups with acks)
+        self.transport = config('MESSAGE_TRANSPORT', default='pubsub')
+        self.consumer_name = config('STREAM_CONSUMER', default=socket.gethostname())
+        self.codec = get_codec(config('MESSAGE_CODEC', default='json'))
         
         # Connect to Redis
-        self.redis_client = redis.Redis(
+        self.redis_client = aioredis.Redis(
             host=self.redis_config['host'],
             port=self.redis_config['port'],
             password=self.redis_config['password'],
-            decode_responses=True
+            # Messages are binary when a binary codec is configured
+            decode_responses=False
         )
         
+        # Collision-free, time-ordered ids for netted child orders and signals without a forecast id.
+        # Without ID_WORKER_ID the worker id is leased from Redis (the lease is renewed from a thread)
+        self.ids = create_id_generator(
+            config('ID_WORKER_ID', default=None, cast=lambda v: int(v) if v else None),
+            redis.Redis(**self.redis_config)
+        )
+        
+        # Executions are written in batches by a background thread
+        self.trade_writer = BatchWriter(
+            self.db_config,
+            INSERT_TRADE,
+            batch_size=config('TRADE_WRITER_BATCH_SIZE', default=500, cast=int),
+            flush_ms=config('TRADE_WRITER_FLUSH_MS', default=200, cast=int),
+            queue_size=config('TRADE_WRITER_QUEUE_SIZE', default=10000, cast=int),
+            name='trade-writer'
+        ).start()
+        
         logger.info("Lean Execution Engine initialized")
     
-    def listen_for_trades(self):
+    async def listen_for_trades(self):
         """Listen for approved trades from Redis"""
         logger.info("Starting to listen for approved trades")
         
         pubsub = self.redis_client.pubsub()
-        pubsub.subscribe('approved_trades')
+        await pubsub.subscribe('approved_trades')
         
         try:
-            for message in pubsub.listen():
+            async for message in pubsub.listen():
                 if message['type'] == 'message':
                     try:
-                        trade_data = json.loads(message['data'])
-                        self.execute_trade(trade_data)
-                    except json.JSONDecodeError as e:
+                        trade_data = decode_message(message['data'])
+                        await self.execute_trade(trade_data)
+                    except ValueError as e:
                         logger.error(f"Failed to decode trade data: {e}")
                     except Exception as e:
                         logger.error(f"Error executing trade: {e}")
@@ -66,106 +138,204 @@ class LeanExecutionEngine:
             logger.error(f"Error in trade listener: {e}")
             raise
         finally:
-            pubsub.close()
+            await pubsub.aclose()
     
-    def execute_trade(self, trade_signal):
-        """Execute a trade based on the approved signal"""
-        logger.info(f"Executing trade for {trade_signal['asset']}")
+    async def consume_trade_stream(self):
+        """Consume approved trades from the Redis Stream as part of the lean-execution group"""
+        logger.info("Starting to consume approved trade stream")
         
-        try:
-            # Extract trade parameters
-            asset = trade_signal['asset']
-            prediction = trade_signal['prediction']
-            position_size = trade_signal['position_size']
-            confidence = trade_signal['confidence']
-            
-            # Determine trade direction
-            if prediction > 0:
-                side = 'BUY'
-            elif prediction < 0:
-                side = 'SELL'
-            else:
-                logger.info("No trade executed - neutral prediction")
-                return
-            
-            # Calculate order size (simplified)
-            # In a real implementation, this would consider:
-            # - Current portfolio value
-            # - Asset price
-            # - Position limits
-            # - Risk management rules
-            order_size = position_size * 1000  # Simplified calculation
-            
-            # Log trade details
-            trade_details = {
-                'asset': asset,
-                'side': side,
-                'size': order_size,
-                'prediction': prediction,
-                'confidence': confidence,
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            }
-            
-            logger.info(f"Trade details: {trade_details}")
-            
-            # In a real implementation, this would call the broker API
-            # For now, we'll just simulate the execution
-            execution_result = self.simulate_trade_execution(trade_details)
-            
-            # Log execution result
-            logger.info(f"Trade execution result: {execution_result}")
-            
-            # Save execution result (in a real implementation, this would go to a database)
-            self.save_execution_result(execution_result)
+        consumer = AsyncStreamConsumer(
+            self.redis_client,
+            stream='approved_trades',
+            group='lean-execution',
+            consumer=self.consumer_name,
+            handler=None
+        )
+        
+        async def handle_entry(entry_id, data):
+            async def on_complete(order):
+                # Orders without an answer from the broker stay pending and are retried
+                if order['status'] == FAILED:
+                    consumer.release(entry_id)
+                else:
+                    await consumer.ack(entry_id)
             
-        except Exception as e:
-            logger.error(f"Failed to execute trade for {asset}: {e}")
-            raise
+            if not await self.execute_trade(decode_message(data), on_complete):
+                await consumer.ack(entry_id)
+        
+        consumer.handler = handle_entry
+        await consumer.run()
     
-    def simulate_trade_execution(self, trade_details):
-        """Simulate trade execution (placeholder for real broker API)"""
-        logger.info("Simulating trade execution")
-        
-        # In a real implementation, this would:
-        # 1. Connect to broker API
-        # 2. Place the order
-        # 3. Wait for execution
-        # 4. Return execution details
-        
-        # Simulate execution with random fill price and status
-        import random
-        
-        execution_result = {
-            'trade_id': f"TRADE_{int(time.time())}",
-            'asset': trade_details['asset'],
-            'side': trade_details['side'],
-            'ordered_size': trade_details['size'],
-            'filled_size': trade_details['size'] * random.uniform(0.9, 1.0),  # 90-100% fill rate
-            'ordered_price': 100.0,  # Placeholder price
-            'average_fill_price': 100.0 * random.uniform(0.99, 1.01),  # ±1% slippage
-            'status': 'FILLED',
+    def build_order(self, trade_signal):
+        """Turn an approved trade signal into an order (None for a neutral prediction)"""
+        # Extract trade parameters
+        asset = trade_signal['asset']
+        prediction = trade_signal['prediction']
+        position_size = trade_signal['position_size']
+        confidence = trade_signal['confidence']
+        
+        # Determine trade direction
+        if prediction > 0:
+            side = 'BUY'
+        elif prediction < 0:
+            side = 'SELL'
+        else:
+            logger.info("No trade executed - neutral prediction")
+            return None
+        
+        # Calculate order size (simplified)
+        # In a real implementation, this would consider:
+        # - Current portfolio value
+        # - Asset price
+        # - Position limits
+        # - Risk management rules
+        order_size = position_size * 1000  # Simplified calculation
+        
+        # Every order gets its own trade id; several executions of one forecast (a retry,
+        # a redelivered signal, a top-up) are separate trades linked by forecast_id
+        return {
+            'trade_id': self.ids.next_id(),
+            'forecast_id': trade_signal.get('forecast_id'),
+            'asset': asset,
+            'horizon': trade_signal.get('horizon'),
+            'side': side,
+            'size': order_size,
+            'prediction': prediction,
+            'confidence': confidence,
             'timestamp': datetime.utcnow().isoformat() + 'Z'
         }
+    
+    async def execute_trade(self, trade_signal, on_complete=None):
+        """Hand an approved trade to the order router; returns False if no order was placed"""
+        logger.info(f"Executing trade for {trade_signal['asset']}")
+        
+        order = self.build_order(trade_signal)
+        if order is None:
+            return False
         
-        # Simulate execution time
-        time.sleep(random.uniform(0.1, 0.5))
+        logger.info(f"Trade details: {order}")
         
-        return execution_result
+        # Returns once the router has a free slot, the broker call continues in the background
+        await self.router.submit(order, on_complete)
+        return True
     
-    def save_execution_result(self, execution_result):
-        """Save execution result to database (simplified)"""
-        logger.info("Saving execution result")
+    async def handle_execution(self, order):
+        """Completion callback of the order router"""
+        logger.info(f"Trade execution result: {order['trade_id']} {order['asset']} {order['status']}")
+        
+        # The risk engine books its portfolio from these reports
+        await self.publish_execution_report(order)
         
-        # In a real implementation, this would save to a database
-        # For now, we'll just log it
-        logger.info(f"Execution result saved: {execution_result}")
+        if order.get('filled_size'):
+            await self.save_execution_result({
+                'trade_id': order['trade_id'],
+                'forecast_id': order['forecast_id'],
+                'asset': order['asset'],
+                'horizon': order['horizon'],
+                'side': order['side'],
+                'ordered_size': order['size'],
+                'filled_size': order['filled_size'],
+                'ordered_price': order['ordered_price'],
+                'average_fill_price': order['average_fill_price'],
+                'status': order['status'],
+                'timestamp': datetime.utcnow().isoformat() + 'Z'
+            })
+    
+    async def publish_execution_report(self, order):
+        """Announce the outcome of an order on the trade_executions channel"""
+        report = {
+            'trade_id': order['trade_id'],
+            'forecast_id': order['forecast_id'],
+            'asset': order['asset'],
+            'horizon': order['horizon'],
+            'side': order['side'],
+            'filled_size': order.get('filled_size') or 0.0,
+            'average_fill_price': order.get('average_fill_price'),
+            'status': order['status'],
+            'timestamp': datetime.utcnow().isoformat() + 'Z'
+        }
+        try:
+            await self.redis_client.publish('trade_executions', encode_message(report, self.codec))
+        except Exception as e:
+            logger.error(f"Failed to publish execution report for {order['trade_id']}: {e}")
+    
+    async def save_execution_result(self, execution_result):
+        """Queue an execution result for the batched write to trading_trade"""
+        # Runs on the event loop: a full queue must not stall reads, broker responses and acks
+        await self.trade_writer.submit_async((
+            execution_result['trade_id'],
+            execution_result['forecast_id'],
+            execution_result['asset'],
+            execution_result['horizon'],
+            execution_result['side'],
+            execution_result['ordered_size'],
+            execution_result['filled_size'],
+            execution_result['ordered_price'],
+            execution_result['average_fill_price'],
+            execution_result['status'],
+            execution_result['timestamp']
+        ))
+    
+    async def run_async(self):
+        self.router = OrderRouter(
+            self.create_broker(),
+            max_in_flight=self.max_in_flight,
+            max_in_flight_per_asset=self.max_in_flight_per_asset,
+            on_complete=self.handle_execution
+        )
+        if self.netting_window_ms > 0 or self.slice_size > 0:
+            # Executions are reported per approved trade by the netter, not per child order
+            self.router.on_complete = None
+            self.router = OrderNetter(
+                self.router,
+                self.ids.next_id,
+                window_ms=self.netting_window_ms,
+                slice_size=self.slice_size or None,
+                slice_interval_ms=self.slice_interval_ms,
+                volume_profile=self.volume_profile,
+                on_complete=self.handle_execution,
+                max_open=self.max_in_flight
+            )
+        try:
+            if self.transport == 'streams':
+                await self.consume_trade_stream()
+            else:
+                await self.listen_for_trades()
+        finally:
+            await self.router.close()
+            await self.redis_client.aclose()
+            self.ids.close()
+    
+    def create_broker(self):
+        """Broker selected by BROKER_MODE: 'simulated', 'matching' (local order books) or 'http' (broker REST API)"""
+        if self.broker_mode == 'http':
+            return HTTPBroker(
+                self.broker_config['base_url'],
+                self.broker_config['api_key'],
+                self.broker_config['api_secret'],
+                max_connections=self.max_in_flight
+            )
+        if self.broker_mode == 'matching':
+            engine = MatchingEngine(self.matching_config['tick_size'])
+            liquidity = LiquidityProvider(
+                engine,
+                reference_price=self.matching_config['reference_price'],
+                levels=self.matching_config['levels'],
+                size=self.matching_config['level_size']
+            )
+            return MatchingEngineBroker(engine, liquidity, latency=self.matching_config['latency_ms'] / 1000)
+        return SimulatedBroker()
     
     def run(self):
         """Run the execution engine"""
-        logger.info("Starting Lean execution engine")
+        logger.info(f"Starting Lean execution engine ({self.transport} transport, {self.broker_mode} broker)")
         
         # Start listening for trades
-        self.listen_for_trades()
+        try:
+            asyncio.run(self.run_async())
+        finally:
+            # Write the executions still queued
+            self.trade_writer.close()
 
 
 def main():
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+import itertools
+from bisect import bisect_left, insort
+from collections import deque
+
+BUY = 'BUY'
+SELL = 'SELL'
+
+
+class Order:
+    """An order in the book; prices are integer ticks (None for market orders)"""
+    __slots__ = ('order_id', 'side', 'price', 'quantity', 'remaining', 'sequence', 'owner')
+
+    def __init__(self, order_id, side, price, quantity, sequence, owner=None):
+        self.order_id = order_id
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.remaining = quantity
+        self.sequence = sequence
+        self.owner = owner
+
+    @property
+    def filled(self):
+        return self.quantity - self.remaining
+
+
+class Fill:
+    __slots__ = ('maker_id', 'taker_id', 'price', 'quantity', 'maker_owner')
+
+    def __init__(self, maker_id, taker_id, price, quantity, maker_owner):
+        self.maker_id = maker_id
+        self.taker_id = taker_id
+        self.price = price
+        self.quantity = quantity
+        self.maker_owner = maker_owner
+
+
+class OrderBook:
+    """
+    Price-time priority order book for one asset.
+
+    Each side maps a price level (integer ticks) to a deque of resting
+    orders in arrival order, next to a sorted list of its prices. The best
+    price is an O(1) lookup at the end of the list. Adding or removing a
+    level is a bisect plus a list shift. Matching pops makers from the
+    front of the best level's deque.
+    """
+
+    def __init__(self):
+        self.levels = {BUY: {}, SELL: {}}
+        self.prices = {BUY: [], SELL: []}  # both ascending
+        self.orders = {}
+
+    def best_bid(self):
+        prices = self.prices[BUY]
+        return prices[-1] if prices else None
+
+    def best_ask(self):
+        prices = self.prices[SELL]
+        return prices[0] if prices else None
+
+    def depth(self, side, price):
+        """Remaining quantity resting at a price level"""
+        queue = self.levels[side].get(price)
+        return sum(order.remaining for order in queue) if queue else 0
+
+    def _rest(self, order):
+        levels = self.levels[order.side]
+        queue = levels.get(order.price)
+        if queue is None:
+            queue = levels[order.price] = deque()
+            insort(self.prices[order.side], order.price)
+        queue.append(order)
+        self.orders[order.order_id] = order
+
+    def _remove_level(self, side, price):
+        del self.levels[side][price]
+        prices = self.prices[side]
+        del prices[bisect_left(prices, price)]
+
+    def match(self, order):
+        """Match an incoming order against the opposite side; returns the fills"""
+        fills = []
+        opposite = SELL if order.side == BUY else BUY
+        levels = self.levels[opposite]
+        prices = self.prices[opposite]
+
+        while order.remaining > 0 and prices:
+            best = prices[0] if opposite == SELL else prices[-1]
+            if order.price is not None:
+                if (order.side == BUY and best > order.price) or (order.side == SELL and best < order.price):
+                    break
+
+            queue = levels[best]
+            while order.remaining > 0 and queue:
+                maker = queue[0]
+                quantity = min(order.remaining, maker.remaining)
+                maker.remaining -= quantity
+                order.remaining -= quantity
+                fills.append(Fill(maker.order_id, order.order_id, best, quantity, maker.owner))
+                if maker.remaining == 0:
+                    queue.popleft()
+                    del self.orders[maker.order_id]
+
+            if not queue:
+                self._remove_level(opposite, best)
+
+        return fills
+
+    def add(self, order):
+        """Match an order and rest what is left of a limit order; returns the fills"""
+        fills = self.match(order)
+        if order.remaining > 0 and order.price is not None:
+            self._rest(order)
+        return fills
+
+    def cancel(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        queue = self.levels[order.side][order.price]
+        queue.remove(order)
+        if not queue:
+            self._remove_level(order.side, order.price)
+        return order
+
+
+class MatchingEngine:
+    """
+    In-process exchange: one OrderBook per asset.
+
+    Prices are given in currency and converted to integer ticks of
+    `tick_size`. Limit orders rest until they are filled or cancelled.
+    Market orders fill against the book and any remainder is cancelled
+    (immediate-or-cancel).
+    """
+
+    def __init__(self, tick_size=0.01):
+        self.tick_size = tick_size
+        self.books = {}
+        self._sequence = itertools.count(1)
+
+    def book(self, asset):
+        book = self.books.get(asset)
+        if book is None:
+            book = self.books[asset] = OrderBook()
+        return book
+
+    def to_ticks(self, price):
+        return int(round(price / self.tick_size))
+
+    def to_price(self, ticks):
+        return ticks * self.tick_size
+
+    def submit(self, asset, side, quantity, price=None, owner=None):
+        """Submit a limit (price given) or market order; returns (order, fills)"""
+        if side not in (BUY, SELL):
+            raise ValueError(f"Unknown side: {side}")
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive")
+
+        sequence = next(self._sequence)
+        ticks = None if price is None else self.to_ticks(price)
+        order = Order(sequence, side, ticks, quantity, sequence, owner)
+        return order, self.book(asset).add(order)
+
+    def cancel(self, asset, order_id):
+        return self.book(asset).cancel(order_id)
+
+    def mid_price(self, asset):
+        book = self.book(asset)
+        bid, ask = book.best_bid(), book.best_ask()
+        if bid is None or ask is None:
+            return None
+        return self.to_price(bid + ask) / 2
+
+
+class LiquidityProvider:
+    """
+    Deterministic market maker that keeps `levels` price levels of `size`
+    on both sides of the book. The quotes are centred on the last trade
+    price, `spread_ticks` apart.
+    """
+
+    owner = 'liquidity'
+
+    def __init__(self, engine, reference_price=100.0, levels=20, size=10.0, spread_ticks=2):
+        self.engine = engine
+        self.reference_price = reference_price
+        self.levels = levels
+        self.size = size
+        self.spread_ticks = spread_ticks
+        self.last_trade = {}
+
+    def on_fills(self, asset, fills):
+        if fills:
+            self.last_trade[asset] = fills[-1].price
+
+    def replenish(self, asset):
+        """Top up every quoted level to `size`"""
+        book = self.engine.book(asset)
+        mid = self.last_trade.get(asset, self.engine.to_ticks(self.reference_price))
+        half_spread = max(self.spread_ticks // 2, 1)
+
+        for i in range(self.levels):
+            for side, price in ((BUY, mid - half_spread - i), (SELL, mid + half_spread + i)):
+                missing = self.size - book.depth(side, price)
+                if missing > 1e-12:
+                    self.engine.submit(asset, side, missing, self.engine.to_price(price), owner=self.owner)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Local mock of the broker REST API used by HTTPBroker.
+
+    python mock_broker.py [port]
+
+then run the execution engine with BROKER_MODE=http and
+BROKER_API_URL=http://localhost:8081. Orders are filled after a random
+latency, like SimulatedBroker, so throughput can be measured over real
+HTTP connections.
+"""
+
+import sys
+import random
+import asyncio
+from aiohttp import web
+
+
+async def place_order(request):
+    order = await request.json()
+    await asyncio.sleep(random.uniform(request.app['min_latency'], request.app['max_latency']))
+    return web.json_response({
+        'client_order_id': order['client_order_id'],
+        'status': 'FILLED',
+        'filled_size': order['size'] * random.uniform(0.9, 1.0),
+        'ordered_price': 100.0,
+        'average_fill_price': 100.0 * random.uniform(0.99, 1.01)
+    })
+
+
+def create_app(min_latency=0.1, max_latency=0.5):
+    app = web.Application()
+    app['min_latency'] = min_latency
+    app['max_latency'] = max_latency
+    app.router.add_post('/orders', place_order)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(create_app(), port=int(sys.argv[1]) if len(sys.argv) > 1 else 8081)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+import math
+import asyncio
+import logging
+from collections import defaultdict
+from order_router import FAILED, FILLED, PARTIALLY_FILLED, REJECTED
+
+logger = logging.getLogger(__name__)
+
+# Parent orders with fully matching BUY and SELL sizes in the same window
+NETTED = 'NETTED'
+
+
+def slice_sizes(size, slice_size, profile=None):
+    """
+    Split `size` into ceil(size / slice_size) child sizes.
+
+    Without a profile the slices are equal (TWAP). With a volume profile
+    (relative volume per time bucket) each slice gets the weight of the
+    profile at its position (VWAP).
+    """
+    count = max(int(math.ceil(size / slice_size - 1e-9)), 1) if slice_size else 1
+    if not profile:
+        return [size / count] * count
+
+    weights = [profile[min(int(i * len(profile) / count), len(profile) - 1)] for i in range(count)]
+    total = sum(weights)
+    return [size * w / total for w in weights]
+
+
+class OrderNetter:
+    """
+    Nets orders per asset over a short window before they reach the router.
+
+    The first order for an asset opens a window of `window_ms`. When the
+    window closes, the BUY and SELL sizes of all orders in it are netted.
+    Only the difference goes to the router, as one child order. If that
+    child is larger than `slice_size`, it is sent as TWAP/VWAP slices
+    `slice_interval_ms` apart. The opposite side is crossed internally at
+    the child's price. Once the child completes, every parent order gets
+    its share of the fills. `on_complete` and the per-order callbacks then
+    run for the parents, exactly as they would behind an OrderRouter. The
+    child orders themselves are not reported.
+
+    If a window nets out completely, the orders are matched against each
+    other at the last price seen for the asset. If there is no such price
+    yet, they go to the router unchanged.
+
+    submit() waits while `max_open` parent orders are open (by default the
+    router's `max_in_flight`), so the netter pushes back on the message
+    reader like the router does. A parent is open until its completion.
+    """
+
+    def __init__(self, router, next_id, window_ms=50, slice_size=None, slice_interval_ms=1000,
+                 volume_profile=None, on_complete=None, max_open=None):
+        self.router = router
+        self.next_id = next_id
+        self.window = window_ms / 1000
+        self.slice_size = slice_size
+        self.slice_interval = slice_interval_ms / 1000
+        self.volume_profile = volume_profile
+        self.on_complete = on_complete
+        self.max_open = max_open or router.max_in_flight
+        self.buckets = {}
+        self.last_price = {}
+        self.completed = defaultdict(int)
+        self.child_orders = 0
+        self._slots = asyncio.Semaphore(self.max_open)
+        self._tasks = set()
+
+    @property
+    def in_flight(self):
+        return sum(len(bucket) for bucket in self.buckets.values()) + self.router.in_flight
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def submit(self, order, on_complete=None):
+        """Add an order to the open window of its asset (waits while max_open orders are open)"""
+        await self._slots.acquire()
+        bucket = self.buckets.get(order['asset'])
+        if bucket is None:
+            bucket = self.buckets[order['asset']] = []
+            self._spawn(self._close_window(order['asset']))
+        bucket.append((order, on_complete))
+
+    async def _close_window(self, asset):
+        await asyncio.sleep(self.window)
+        parents = self.buckets.pop(asset)
+
+        buy = sum(order['size'] for order, _ in parents if order['side'] == 'BUY')
+        sell = sum(order['size'] for order, _ in parents if order['side'] == 'SELL')
+        net = buy - sell
+
+        if abs(net) <= 1e-9 * max(buy, sell):
+            price = self.last_price.get(asset)
+            if price is None:
+                for order, on_complete in parents:
+                    await self.router.submit(order, self._parent_callback(on_complete))
+                return
+            for order, on_complete in parents:
+                order.update(status=NETTED, filled_size=order['size'], ordered_price=price, average_fill_price=price)
+                await self._complete(order, on_complete)
+            return
+
+        side = 'BUY' if net > 0 else 'SELL'
+        child = await self._execute_child(asset, side, abs(net))
+        await self._allocate(parents, side, child)
+
+    async def _execute_child(self, asset, side, size):
+        """Send the net order (sliced if large) and aggregate the results of its slices"""
+        slices = slice_sizes(size, self.slice_size, self.volume_profile)
+        done = []
+        for i, slice_size in enumerate(slices):
+            if i > 0:
+                await asyncio.sleep(self.slice_interval)
+            future = asyncio.get_running_loop().create_future()
+            self.child_orders += 1
+            await self.router.submit({
+                'trade_id': self.next_id(),
+                'forecast_id': None,
+                'asset': asset,
+                'horizon': None,
+                'side': side,
+                'size': slice_size
+            }, future.set_result)
+            done.append(future)
+
+        results = await asyncio.gather(*done)
+        filled = sum(r.get('filled_size') or 0 for r in results)
+        notional = sum((r.get('filled_size') or 0) * (r.get('average_fill_price') or 0) for r in results)
+        ordered = [r['ordered_price'] for r in results if r.get('ordered_price') is not None]
+        if all(r['status'] == FAILED for r in results):
+            status = FAILED
+        elif filled >= size * (1 - 1e-9):
+            status = FILLED
+        elif filled > 0:
+            status = PARTIALLY_FILLED
+        else:
+            status = REJECTED
+
+        return {
+            'status': status,
+            'size': size,
+            'filled_size': filled,
+            'ordered_price': ordered[0] if ordered else None,
+            'average_fill_price': notional / filled if filled > 0 else None
+        }
+
+    async def _allocate(self, parents, side, child):
+        """Give every parent its share of the internal cross and of the child's fills"""
+        if child['average_fill_price'] is not None:
+            self.last_price[parents[0][0]['asset']] = child['average_fill_price']
+        cross_price = child['average_fill_price'] or child['ordered_price'] or self.last_price.get(parents[0][0]['asset'])
+
+        same_side = sum(order['size'] for order, _ in parents if order['side'] == side)
+        crossed = same_side - child['size']
+        if child['status'] == FAILED or cross_price is None:
+            # Nothing was executed; the parents are retried like a failed order
+            crossed = 0.0
+
+        # Every order of the child's side gets the same fraction, filled at the blended price
+        fraction = (crossed + child['filled_size']) / same_side
+        blended = None
+        if crossed + child['filled_size'] > 0:
+            blended = (crossed * cross_price + child['filled_size'] * (child['average_fill_price'] or 0)) \
+                / (crossed + child['filled_size'])
+
+        for order, on_complete in parents:
+            if order['side'] != side and crossed > 0:
+                order.update(status=NETTED, filled_size=order['size'], average_fill_price=cross_price)
+            elif order['side'] != side or fraction <= 0:
+                order.update(status=child['status'], filled_size=0.0, average_fill_price=None)
+            else:
+                status = FILLED if fraction >= 1 - 1e-9 else PARTIALLY_FILLED
+                order.update(status=status, filled_size=order['size'] * fraction, average_fill_price=blended)
+            order['ordered_price'] = child['ordered_price'] or cross_price
+            await self._complete(order, on_complete)
+
+    def _parent_callback(self, on_complete):
+        async def callback(order):
+            await self._complete(order, on_complete)
+        return callback
+
+    async def _complete(self, order, on_complete):
+        self._slots.release()
+        self.completed[order['status']] += 1
+        for callback in (self.on_complete, on_complete):
+            if callback is None:
+                continue
+            try:
+                result = callback(order)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Completion callback failed for order {order['trade_id']}: {e}")
+
+    async def drain(self):
+        """Wait until every window has closed and every order has completed"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+        await self.router.drain()
+
+    async def close(self):
+        await self.drain()
+        await self.router.close()
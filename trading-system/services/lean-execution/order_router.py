@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import asyncio
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Order states
+PENDING = 'PENDING'      # accepted, its broker call is about to start
+SUBMITTED = 'SUBMITTED'  # sent to the broker
+FILLED = 'FILLED'
+PARTIALLY_FILLED = 'PARTIALLY_FILLED'
+REJECTED = 'REJECTED'
+FAILED = 'FAILED'        # no usable answer from the broker (network error, timeout)
+
+
+class OrderRouter:
+    """
+    Sends orders to a broker concurrently from one event loop.
+
+    submit() waits while `max_in_flight_per_asset` orders of the order's
+    asset, or `max_in_flight` orders in total, are open, which pushes back
+    on the message reader. Otherwise it returns right away, and the broker
+    call runs as a task. The asset slot is taken before the global one, so
+    orders waiting for a busy asset never hold global slots that orders
+    for other assets could use. Each order dict moves
+    through PENDING -> SUBMITTED -> FILLED / PARTIALLY_FILLED / REJECTED /
+    FAILED. When it finishes, the router-wide `on_complete` callback runs,
+    then the per-order one. Brokers are any object with the interface of
+    brokers.Broker.
+    """
+
+    def __init__(self, broker, max_in_flight=100, max_in_flight_per_asset=10, on_complete=None):
+        self.broker = broker
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_asset = max_in_flight_per_asset
+        self.on_complete = on_complete
+        self.orders = {}
+        self.completed = defaultdict(int)
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._asset_slots = defaultdict(lambda: asyncio.Semaphore(max_in_flight_per_asset))
+        self._tasks = set()
+
+    @property
+    def in_flight(self):
+        return len(self.orders)
+
+    async def submit(self, order, on_complete=None):
+        """Accept an order for execution (waits for a slot for its asset, then for a global one)"""
+        asset_slots = self._asset_slots[order['asset']]
+        await asset_slots.acquire()
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            asset_slots.release()
+            raise
+        order['status'] = PENDING
+        self.orders[order['trade_id']] = order
+
+        task = asyncio.create_task(self._execute(order, on_complete))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _execute(self, order, on_complete):
+        try:
+            order['status'] = SUBMITTED
+            order.update(await self.broker.submit_order(order))
+        except Exception as e:
+            logger.error(f"Order {order['trade_id']} for {order['asset']} failed: {e}")
+            order['status'] = FAILED
+            order['error'] = str(e)
+        finally:
+            self.orders.pop(order['trade_id'], None)
+            self._slots.release()
+            self._asset_slots[order['asset']].release()
+
+        self.completed[order['status']] += 1
+        for callback in (self.on_complete, on_complete):
+            if callback is None:
+                continue
+            try:
+                result = callback(order)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Completion callback failed for order {order['trade_id']}: {e}")
+
+    async def drain(self):
+        """Wait until every accepted order has completed"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+    async def close(self):
+        await self.drain()
+        await self.broker.close()
@@ -0,0 +1,55 @@
+import asyncio
+from brokers import MatchingEngineBroker
+from matching_engine import BUY, SELL, MatchingEngine
+from order_router import FILLED, PARTIALLY_FILLED, REJECTED
+
+
+def test_price_time_priority():
+    engine = MatchingEngine(tick_size=0.01)
+    first, _ = engine.submit('BTCUSD', SELL, 2.0, price=100.01, owner='first')
+    second, _ = engine.submit('BTCUSD', SELL, 2.0, price=100.01, owner='second')
+    better, _ = engine.submit('BTCUSD', SELL, 1.0, price=100.00, owner='better')
+
+    _, fills = engine.submit('BTCUSD', BUY, 4.0, price=100.01)
+
+    # Best price first, then arrival order within the level
+    assert [(f.maker_owner, f.quantity) for f in fills] == [('better', 1.0), ('first', 2.0), ('second', 1.0)]
+    assert [engine.to_price(f.price) for f in fills] == [100.00, 100.01, 100.01]
+    assert engine.book('BTCUSD').depth(SELL, engine.to_ticks(100.01)) == 1.0
+    assert second.remaining == 1.0
+
+
+def test_limit_order_rests_and_cancel_removes_the_level():
+    engine = MatchingEngine()
+    order, fills = engine.submit('BTCUSD', BUY, 1.0, price=99.5)
+    assert fills == []
+    assert engine.book('BTCUSD').best_bid() == engine.to_ticks(99.5)
+
+    engine.cancel('BTCUSD', order.order_id)
+    assert engine.book('BTCUSD').best_bid() is None
+
+
+def test_market_order_does_not_rest():
+    engine = MatchingEngine()
+    engine.submit('BTCUSD', SELL, 1.0, price=100.0)
+    taker, fills = engine.submit('BTCUSD', BUY, 3.0)
+
+    assert sum(f.quantity for f in fills) == 1.0
+    assert taker.remaining == 2.0
+    assert engine.book('BTCUSD').best_bid() is None
+
+
+def test_broker_reports_fills_without_liquidity_provider():
+    broker = MatchingEngineBroker(liquidity=False)
+    broker.engine.submit('BTCUSD', SELL, 1.0, price=100.0)
+
+    async def scenario():
+        full = await broker.submit_order({'trade_id': 1, 'asset': 'BTCUSD', 'side': BUY, 'size': 0.5})
+        partial = await broker.submit_order({'trade_id': 2, 'asset': 'BTCUSD', 'side': BUY, 'size': 1.0})
+        empty = await broker.submit_order({'trade_id': 3, 'asset': 'BTCUSD', 'side': BUY, 'size': 1.0})
+        return full, partial, empty
+
+    full, partial, empty = asyncio.run(scenario())
+    assert (full['status'], full['filled_size'], full['average_fill_price']) == (FILLED, 0.5, 100.0)
+    assert (partial['status'], partial['filled_size']) == (PARTIALLY_FILLED, 0.5)
+    assert empty['status'] == REJECTED
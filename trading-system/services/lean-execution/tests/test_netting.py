@@ -0,0 +1,67 @@
+import asyncio
+import itertools
+from brokers import MatchingEngineBroker
+from matching_engine import SELL
+from netting import NETTED, OrderNetter, slice_sizes
+from order_router import FILLED, OrderRouter
+
+
+class RecordingBroker(MatchingEngineBroker):
+    """Matching engine broker with one deep ask level that records the orders it receives"""
+
+    def __init__(self):
+        super().__init__(liquidity=False)
+        self.engine.submit('BTCUSD', SELL, 1000.0, price=100.0)
+        self.received = []
+
+    async def submit_order(self, order):
+        self.received.append((order['side'], order['size']))
+        return await super().submit_order(order)
+
+
+def make_netter(broker, **kwargs):
+    router = OrderRouter(broker, max_in_flight=10, max_in_flight_per_asset=10)
+    ids = itertools.count(1000)
+    return OrderNetter(router, lambda: next(ids), window_ms=10, **kwargs)
+
+
+def parent(trade_id, side, size):
+    return {'trade_id': trade_id, 'asset': 'BTCUSD', 'side': side, 'size': size}
+
+
+def test_only_the_net_size_reaches_the_broker():
+    async def scenario():
+        broker = RecordingBroker()
+        netter = make_netter(broker)
+        completed = {}
+        for order in [parent(1, 'BUY', 3.0), parent(2, 'SELL', 1.0), parent(3, 'BUY', 1.0)]:
+            await netter.submit(order, lambda o: completed.__setitem__(o['trade_id'], o))
+        await netter.drain()
+        return broker, completed
+
+    broker, completed = asyncio.run(scenario())
+    assert broker.received == [('BUY', 3.0)]
+    assert completed[2]['status'] == NETTED and completed[2]['filled_size'] == 1.0
+    # Both buys are filled in full: 1.0 crossed internally, 3.0 at the broker
+    assert [completed[i]['status'] for i in (1, 3)] == [FILLED, FILLED]
+    assert completed[1]['filled_size'] == 3.0 and completed[3]['filled_size'] == 1.0
+    assert completed[1]['average_fill_price'] == 100.0
+
+
+def test_large_net_orders_are_sliced():
+    async def scenario():
+        broker = RecordingBroker()
+        netter = make_netter(broker, slice_size=2.0, slice_interval_ms=1)
+        await netter.submit(parent(1, 'BUY', 5.0))
+        await netter.drain()
+        return broker, netter
+
+    broker, netter = asyncio.run(scenario())
+    assert [size for _, size in broker.received] == [5 / 3] * 3
+    assert netter.completed[FILLED] == 1
+
+
+def test_slice_sizes_follow_the_volume_profile():
+    assert slice_sizes(6.0, 2.0) == [2.0, 2.0, 2.0]
+    assert slice_sizes(6.0, 2.0, profile=[3, 2, 1]) == [3.0, 2.0, 1.0]
+    assert slice_sizes(1.0, None) == [1.0]
@@ -0,0 +1,70 @@
+import asyncio
+from order_router import FAILED, FILLED, OrderRouter
+
+
+class GatedBroker:
+    """Holds every order at the broker until its asset's gate is opened"""
+
+    def __init__(self):
+        self.gates = {}
+        self.at_broker = []
+
+    def gate(self, asset):
+        return self.gates.setdefault(asset, asyncio.Event())
+
+    async def submit_order(self, order):
+        self.at_broker.append(order['trade_id'])
+        await self.gate(order['asset']).wait()
+        if order['asset'] == 'BAD':
+            raise ConnectionError("broker unreachable")
+        return {'status': FILLED, 'filled_size': order['size']}
+
+    async def close(self):
+        pass
+
+
+def order(trade_id, asset):
+    return {'trade_id': trade_id, 'asset': asset, 'side': 'BUY', 'size': 1.0}
+
+
+def test_busy_asset_does_not_take_global_slots():
+    async def scenario():
+        broker = GatedBroker()
+        router = OrderRouter(broker, max_in_flight=3, max_in_flight_per_asset=2)
+
+        await router.submit(order(1, 'BTCUSD'))
+        await router.submit(order(2, 'BTCUSD'))
+        # A third BTCUSD order waits for its asset slot without holding a global one
+        waiting = asyncio.create_task(router.submit(order(3, 'BTCUSD')))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+
+        await asyncio.wait_for(router.submit(order(4, 'ETHUSD')), 1)
+        await asyncio.sleep(0)
+        assert sorted(broker.at_broker) == [1, 2, 4]
+
+        broker.gate('BTCUSD').set()
+        broker.gate('ETHUSD').set()
+        await asyncio.wait_for(waiting, 1)
+        await router.drain()
+        assert router.completed[FILLED] == 4
+        assert router.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_failed_order_releases_its_slots():
+    async def scenario():
+        broker = GatedBroker()
+        broker.gate('BAD').set()
+        completed = []
+        router = OrderRouter(broker, max_in_flight=1, max_in_flight_per_asset=1, on_complete=completed.append)
+
+        for trade_id in range(3):
+            await asyncio.wait_for(router.submit(order(trade_id, 'BAD')), 1)
+        await router.drain()
+
+        assert [o['status'] for o in completed] == [FAILED] * 3
+        assert completed[0]['error'] == 'broker unreachable'
+
+    asyncio.run(scenario())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+import asyncio
+import logging
+import zlib
+import asyncpg
+import numpy as np
+import redis.asyncio as aioredis
+from trading_shared.codec import decode_message, encode_message
+from trading_shared.streams import AsyncStreamConsumer
+from strategy_config import (
+    STRATEGY_CONFIG_CHANNEL, STRATEGY_CONFIG_VERSION_KEY, build_config_notification
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncForecastConsumer:
+    """
+    asyncio pipeline for forecast updates.
+
+    Messages are sharded by asset onto `workers` queues, and each queue is
+    drained by one worker task. Forecasts for the same asset are therefore
+    handled in arrival order, while different assets run concurrently.
+    Queues are bounded, so a slow shard applies back-pressure to the
+    reader instead of buffering without limit. Strategy adjustments run as
+    background tasks, so their DB round-trips never hold up approvals.
+
+    With streams, entries are read through an AsyncStreamConsumer. An entry
+    is acked once its forecast was handled. If handling fails, it is
+    released and retried after reclaim (up to max_deliveries). Malformed
+    entries go straight to the dead-letter stream.
+    """
+
+    def __init__(self, engine, workers=16, queue_size=1000):
+        self.engine = engine
+        self.workers = workers
+        self.queue_size = queue_size
+        self.redis = None
+        self.db_pool = None
+        self.queues = []
+        self.stream = None
+        self.adjust_lock = asyncio.Lock()
+        self.background_tasks = set()
+
+    async def connect(self):
+        """Open the async Redis client and the Postgres connection pool"""
+        redis_config = self.engine.redis_config
+        self.redis = aioredis.Redis(
+            host=redis_config['host'],
+            port=redis_config['port'],
+            password=redis_config['password'],
+            decode_responses=False
+        )
+
+        db_config = self.engine.db_config
+        self.db_pool = await asyncpg.create_pool(
+            host=db_config['host'],
+            port=db_config['port'],
+            user=db_config['user'],
+            password=db_config['password'],
+            database=db_config['database'],
+            min_size=1,
+            max_size=self.workers
+        )
+        logger.info(f"Async consumer connected ({self.workers} workers)")
+
+    async def close(self):
+        if self.redis is not None:
+            await self.redis.aclose()
+        if self.db_pool is not None:
+            await self.db_pool.close()
+
+    def shard(self, asset):
+        """Stable queue index for an asset"""
+        return zlib.crc32(asset.encode()) % self.workers
+
+    async def dispatch(self, data, entry_id=None):
+        """Decode a message and queue it on its asset's shard (waits while the shard is full)"""
+        try:
+            forecast = decode_message(data)
+            shard = self.shard(forecast['asset'])
+        except Exception as e:
+            # Not a forecast (undecodable, not an object or without an asset); retrying cannot help
+            logger.error(f"Discarding malformed forecast message: {e}")
+            if entry_id is not None:
+                await self.stream.dead_letter(entry_id)
+            return
+        await self.queues[shard].put((forecast, entry_id))
+
+    async def worker(self, queue):
+        while True:
+            forecast, entry_id = await queue.get()
+            try:
+                await self.handle_forecast_update(forecast)
+            except Exception as e:
+                logger.error(f"Error handling forecast update: {e}")
+                if entry_id is not None:
+                    self.stream.release(entry_id)
+            else:
+                if entry_id is not None:
+                    await self.stream.ack(entry_id)
+            finally:
+                queue.task_done()
+
+    async def handle_forecast_update(self, forecast_data):
+        """Async counterpart of RiskEngine.handle_forecast_update"""
+        engine = self.engine
+
+        # Risk evaluation is pure CPU work and stays synchronous
+        risk_assessment = engine.evaluate_forecast_risk(forecast_data)
+        # Waits off the event loop while the writer's queue is full
+        await engine.assessment_writer.submit_async(engine.assessment_row(risk_assessment))
+
+        if risk_assessment['approved']:
+            await self.publish_approved_trade(risk_assessment)
+
+        # Periodically adjust strategy parameters, off the approval path
+        if np.random.rand() < 0.1 and not self.adjust_lock.locked():
+            task = asyncio.create_task(self.adjust_strategy_parameters())
+            self.background_tasks.add(task)
+            task.add_done_callback(self.background_tasks.discard)
+
+    async def publish_approved_trade(self, risk_assessment):
+        engine = self.engine
+        trade_signal = engine.build_trade_signal(risk_assessment)
+        payload = encode_message(trade_signal, engine.codec)
+        if engine.transport == 'streams':
+            await self.redis.xadd(
+                'approved_trades', {'data': payload}, maxlen=engine.stream_maxlen, approximate=True
+            )
+        else:
+            await self.redis.publish('approved_trades', payload)
+        logger.info(f"Approved trade published for {trade_signal['asset']}")
+
+    async def adjust_strategy_parameters(self):
+        """Async counterpart of RiskEngine.adjust_strategy_parameters"""
+        async with self.adjust_lock:
+            try:
+                new_risk_factor = self.engine.propose_risk_factor()
+                if new_risk_factor is None:
+                    return
+
+                async with self.db_pool.acquire() as conn:
+                    await conn.execute(
+                        """
+                        INSERT INTO trading_strategyconfig (key, value)
+                        VALUES ($1, $2)
+                        ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value
+                        """,
+                        'risk_factor', str(new_risk_factor)
+                    )
+
+                # Apply locally and announce the change instead of reloading the table
+                changes = {'risk_factor': new_risk_factor}
+                version = await self.redis.incr(STRATEGY_CONFIG_VERSION_KEY)
+                self.engine.apply_strategy_config(changes.items(), version)
+                notification = build_config_notification(changes, version)
+                await self.redis.publish(
+                    STRATEGY_CONFIG_CHANNEL, encode_message(notification, self.engine.codec)
+                )
+                logger.info("Strategy parameters adjusted")
+            except Exception as e:
+                logger.error(f"Failed to adjust strategy parameters: {e}")
+
+    async def read_pubsub(self):
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe('forecast_updates')
+        try:
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    await self.dispatch(message['data'])
+        finally:
+            await pubsub.aclose()
+
+    async def read_stream(self):
+        self.stream = AsyncStreamConsumer(
+            self.redis,
+            stream='forecast_updates',
+            group='risk-engine',
+            consumer=self.engine.consumer_name,
+            handler=lambda entry_id, data: self.dispatch(data, entry_id)
+        )
+        await self.stream.run()
+
+    async def run(self):
+        await self.connect()
+        self.queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        workers = [asyncio.create_task(self.worker(queue)) for queue in self.queues]
+        try:
+            if self.engine.transport == 'streams':
+                await self.read_stream()
+            else:
+                await self.read_pubsub()
+        finally:
+            for task in workers:
+                task.cancel()
+            await self.close()
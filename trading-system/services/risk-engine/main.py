@@ -5,11 +5,25 @@ import sys
 import time
 import logging
 import redis
-import json
+import socket
+import asyncio
+import threading
 import psycopg2
-from datetime import datetime
+from datetime import datetime, timedelta
+from psycopg2.extras import Json
 from decouple import config
 import numpy as np
+from trading_shared.batch_writer import BatchWriter
+from trading_shared.codec import decode_message, encode_message, get_codec
+from trading_shared.risk_batch import HIGH_VOLATILITY, MAX_PREDICTION, MIN_RISK_SCORE, evaluate_risk_batch
+from trading_shared.streams import StreamConsumer, publish_to_stream
+from async_consumer import AsyncForecastConsumer
+from market_state import MARKET_BARS_CHANNEL, MarketStateTracker
+from portfolio_risk import ORDER_UNITS, TRADE_EXECUTIONS_CHANNEL, PortfolioRisk, horizon_seconds
+from strategy_config import (
+    DEFAULT_STRATEGY_CONFIG, STRATEGY_CONFIG_CHANNEL, STRATEGY_CONFIG_VERSION_KEY,
+    build_config_notification, merge_strategy_config
+)
 
 # Configure logging
 logging.basicConfig(
@@ -18,6 +32,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+INSERT_RISK_ASSESSMENT = """
+INSERT INTO trading_riskassessment (
+    forecast_id, asset, horizon, prediction, confidence, approved, risk_score, position_size,
+    portfolio_var, portfolio_cvar, marginal_var, reasons, timestamp
+)
+VALUES %s
+"""
+
 
 class RiskEngine:
     def __init__(self):
@@ -41,23 +63,72 @@ class RiskEngine:
             host=self.redis_config['host'],
             port=self.redis_config['port'],
             password=self.redis_config['password'],
-            decode_responses=True
+            # Messages are binary when a binary codec is configured
+            decode_responses=False
         )
         
+        # Message transport: 'pubsub' (fire-and-forget) or 'streams' (consumer groups with acks)
+        self.transport = config('MESSAGE_TRANSPORT', default='pubsub')
+        self.stream_maxlen = config('STREAM_MAXLEN', default=100000, cast=int)
+        self.codec = get_codec(config('MESSAGE_CODEC', default='json'))
+        self.consumer_name = config('STREAM_CONSUMER', default=socket.gethostname())
+        
+        # Asyncio consumer: concurrent across assets, ordered per asset
+        self.async_consumer = config('RISK_ASYNC_CONSUMER', default=False, cast=bool)
+        self.async_workers = config('RISK_ASYNC_WORKERS', default=16, cast=int)
+        self.async_queue_size = config('RISK_ASYNC_QUEUE_SIZE', default=1000, cast=int)
+        
         # Connect to PostgreSQL
         self.db_conn = None
         self.connect_to_db()
         
-        # Risk parameters (these would typically be loaded from the database)
-        self.risk_factor = 1.0
-        self.position_size_limit = 0.1
-        self.confidence_threshold = 0.7
-        self.max_drawdown_limit = 0.05
-        self.volatility_multiplier = 1.0
+        # Risk parameters: an immutable, versioned snapshot that is swapped as a whole
+        self.strategy = DEFAULT_STRATEGY_CONFIG
+        self.listener_thread = None
+        
+        # Notifications are fire-and-forget, so the full table is also reloaded periodically,
+        # and right away when a notification reveals that versions were missed
+        self.strategy_reload_interval = config('STRATEGY_CONFIG_RELOAD_INTERVAL', default=60, cast=float)
+        self._strategy_lock = threading.Lock()
+        self._strategy_reload = threading.Event()
+        
+        # Realized volatility and drawdown per asset, fed from the market_bars channel
+        self.market_state = MarketStateTracker(
+            decay=config('RISK_VOLATILITY_DECAY', default=0.94, cast=float),
+            min_periods=config('RISK_VOLATILITY_MIN_PERIODS', default=10, cast=int),
+            bar_seconds=config('RISK_BAR_SECONDS', default=3600, cast=int),
+            window=config('RISK_RETURN_WINDOW', default=256, cast=int)
+        )
+        # Used until an asset has enough bars for its own estimate
+        self.default_volatility = config('RISK_DEFAULT_VOLATILITY', default=0.025, cast=float)
+        
+        # Portfolio VaR limit (fraction of capital per bar) checked for every approval
+        self.portfolio = PortfolioRisk(
+            self.market_state,
+            confidence=config('RISK_VAR_CONFIDENCE', default=0.99, cast=float),
+            method=config('RISK_VAR_METHOD', default='parametric'),
+            default_volatility=self.default_volatility
+        )
+        self.max_portfolio_var = config('RISK_MAX_PORTFOLIO_VAR', default=0.02, cast=float)
+        # Filled units per position key and trade id, summed into the booked position
+        self.position_fills = {}
         
         # Load initial configuration
         self.load_strategy_config()
         
+        # Positions still open from executions before this start
+        self.load_open_positions()
+        
+        # Risk assessments are written in batches by a background thread
+        self.assessment_writer = BatchWriter(
+            self.db_config,
+            INSERT_RISK_ASSESSMENT,
+            batch_size=config('RISK_WRITER_BATCH_SIZE', default=500, cast=int),
+            flush_ms=config('RISK_WRITER_FLUSH_MS', default=200, cast=int),
+            queue_size=config('RISK_WRITER_QUEUE_SIZE', default=10000, cast=int),
+            name='risk-assessment-writer'
+        ).start()
+        
         logger.info("Risk Engine initialized")
     
     def connect_to_db(self):
@@ -69,12 +140,21 @@ class RiskEngine:
             logger.error(f"Failed to connect to database: {e}")
             raise
     
-    def load_strategy_config(self):
-        """Load strategy configuration from database"""
-        logger.info("Loading strategy configuration")
-        
+    # Read-only views of the current snapshot
+    risk_factor = property(lambda self: self.strategy.risk_factor)
+    position_size_limit = property(lambda self: self.strategy.position_size_limit)
+    confidence_threshold = property(lambda self: self.strategy.confidence_threshold)
+    max_drawdown_limit = property(lambda self: self.strategy.max_drawdown_limit)
+    volatility_multiplier = property(lambda self: self.strategy.volatility_multiplier)
+    
+    def load_strategy_config(self, conn=None):
+        """Load strategy configuration from database (through `conn` when called from another thread)"""
         try:
-            cursor = self.db_conn.cursor()
+            # Read the version first: any change committed after this read
+            # carries a higher version and will still be applied
+            version = int(self.redis_client.get(STRATEGY_CONFIG_VERSION_KEY) or 0)
+            
+            cursor = (conn or self.db_conn).cursor()
             
             # Query to get all strategy configuration
             query = "SELECT key, value FROM trading_strategyconfig"
@@ -82,30 +162,159 @@ class RiskEngine:
             
             configs = cursor.fetchall()
             
-            # Update risk parameters
-            for key, value in configs:
-                if key == 'risk_factor':
-                    self.risk_factor = float(value)
-                elif key == 'position_size_limit':
-                    self.position_size_limit = float(value)
-                elif key == 'confidence_threshold':
-                    self.confidence_threshold = float(value)
-                elif key == 'max_drawdown_limit':
-                    self.max_drawdown_limit = float(value)
-                elif key == 'volatility_multiplier':
-                    self.volatility_multiplier = float(value)
-            
             cursor.close()
             
-            logger.info("Strategy configuration loaded")
+            # Update risk parameters, unless a newer notification was applied meanwhile
+            with self._strategy_lock:
+                if version < self.strategy.version:
+                    return
+                strategy = merge_strategy_config(self.strategy, configs, version)
+                changed = strategy != self.strategy
+                self.strategy = strategy
+            
+            if changed:
+                logger.info(f"Strategy configuration loaded (version {version})")
         except Exception as e:
             logger.error(f"Failed to load strategy configuration: {e}")
             raise
     
+    def apply_strategy_config(self, configs, version):
+        """Swap in a new snapshot with (key, value) rows applied, unless it is outdated"""
+        with self._strategy_lock:
+            if version <= self.strategy.version:
+                return False
+            if version > self.strategy.version + 1:
+                # Notifications carry only the changed keys; the ones in between were missed
+                logger.warning(f"Strategy configuration jumped from version {self.strategy.version} to {version}, reloading")
+                self._strategy_reload.set()
+            self.strategy = merge_strategy_config(self.strategy, configs, version)
+        logger.info(f"Strategy configuration updated to version {version}")
+        return True
+    
+    def watch_strategy_config(self):
+        """Reload the strategy configuration periodically and whenever a version gap was seen"""
+        conn = None
+        while True:
+            self._strategy_reload.wait(self.strategy_reload_interval)
+            self._strategy_reload.clear()
+            try:
+                # Own connection: the main connection belongs to the forecast thread
+                if conn is None or conn.closed:
+                    conn = psycopg2.connect(**self.db_config)
+                    conn.autocommit = True
+                self.load_strategy_config(conn)
+            except Exception:
+                if conn is not None:
+                    conn.close()
+                conn = None
+    
+    def handle_config_notification(self, message):
+        """Apply a change published on the strategy_config channel"""
+        try:
+            notification = decode_message(message['data'])
+            self.apply_strategy_config(notification['config'].items(), int(notification['version']))
+        except Exception as e:
+            logger.error(f"Failed to apply strategy config notification: {e}")
+    
+    def load_open_positions(self, lookback_days=7):
+        """Rebuild the portfolio book from executions whose forecast horizon has not passed yet"""
+        logger.info("Loading open positions")
+        
+        try:
+            cursor = self.db_conn.cursor()
+            cursor.execute(
+                """
+                SELECT id, forecast_id, asset, horizon, side, filled_size, timestamp
+                FROM trading_trade
+                WHERE filled_size > 0 AND timestamp > %s
+                """,
+                (datetime.utcnow() - timedelta(days=lookback_days),)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+        except Exception as e:
+            logger.error(f"Failed to load open positions: {e}")
+            self.db_conn.rollback()
+            raise
+        
+        # Several executions of one forecast (retries, top-ups) form one position
+        positions = {}
+        now = time.time()
+        for trade_id, forecast_id, asset, horizon, side, filled_size, timestamp in rows:
+            expires_at = timestamp.timestamp() + horizon_seconds(horizon)
+            if expires_at <= now:
+                continue
+            key = forecast_id if forecast_id is not None else trade_id
+            positions[key] = (asset, expires_at)
+            self.position_fills.setdefault(key, {})[trade_id] = (1 if side == 'BUY' else -1) * filled_size / ORDER_UNITS
+        
+        for key, (asset, expires_at) in positions.items():
+            self.portfolio.book(key, asset, sum(self.position_fills[key].values()), expires_at)
+        self.portfolio.refresh()
+        logger.info(f"Loaded {len(positions)} open positions")
+    
+    def handle_execution_report(self, message):
+        """Replace the reservation of an approved trade with what lean-execution actually filled"""
+        try:
+            execution = decode_message(message['data'])
+            if execution['status'] == 'FAILED':
+                # No answer from the broker: the order may still execute or be retried,
+                # so the reservation stays until its horizon passes
+                return
+            key = execution['forecast_id'] if execution.get('forecast_id') is not None else execution['trade_id']
+            
+            # The position of a forecast is the sum of its executions; a repeated report
+            # of the same trade counts once. Fills of expired positions are dropped
+            for stale in [k for k in self.position_fills if k != key and k not in self.portfolio.positions]:
+                del self.position_fills[stale]
+            fills = self.position_fills.setdefault(key, {})
+            fills[execution['trade_id']] = \
+                (1 if execution['side'] == 'BUY' else -1) * (execution.get('filled_size') or 0.0) / ORDER_UNITS
+            
+            self.portfolio.book(
+                key,
+                execution['asset'],
+                sum(fills.values()),
+                time.time() + horizon_seconds(execution.get('horizon'))
+            )
+        except Exception as e:
+            logger.error(f"Failed to apply execution report: {e}")
+    
+    def handle_market_bars(self, message):
+        """Feed bars published on the market_bars channel into the market state"""
+        try:
+            bars = decode_message(message['data'])
+            if self.market_state.update_many(bars['asset'], bars['timestamps'], bars['closes']):
+                self.portfolio.refresh()
+        except Exception as e:
+            logger.error(f"Failed to apply market bars: {e}")
+    
+    def start_listeners(self):
+        """Receive config changes, market bars and execution reports in a background thread"""
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{
+            STRATEGY_CONFIG_CHANNEL: self.handle_config_notification,
+            MARKET_BARS_CHANNEL: self.handle_market_bars,
+            TRADE_EXECUTIONS_CHANNEL: self.handle_execution_report
+        })
+        self.listener_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        threading.Thread(target=self.watch_strategy_config, name='strategy-config-watcher', daemon=True).start()
+        logger.info("Listening for strategy config changes, market bars and execution reports")
+    
+    def publish_strategy_config(self, changes):
+        """Apply config changes locally and announce them to other services"""
+        version = self.redis_client.incr(STRATEGY_CONFIG_VERSION_KEY)
+        self.apply_strategy_config(changes.items(), version)
+        notification = build_config_notification(changes, version)
+        self.redis_client.publish(STRATEGY_CONFIG_CHANNEL, encode_message(notification, self.codec))
+    
     def evaluate_forecast_risk(self, forecast):
         """Evaluate the risk of a forecast and determine if it should be executed"""
         logger.info(f"Evaluating risk for forecast: {forecast['asset']} ({forecast['horizon']})")
         
+        # Use one snapshot for the whole evaluation
+        params = self.strategy
+        
         # Extract forecast data
         asset = forecast['asset']
         prediction = forecast['prediction']
@@ -113,62 +322,92 @@ class RiskEngine:
         
         # Risk assessment criteria
         risk_assessment = {
+            'forecast_id': forecast.get('id'),
             'asset': asset,
             'horizon': forecast['horizon'],
             'prediction': prediction,
             'confidence': confidence,
             'approved': False,
             'risk_score': 0.0,
-            'reasons': []
+            'reasons': [],
+            'timestamp': datetime.utcnow().isoformat() + 'Z'
         }
         
         # Calculate risk score based on various factors
         risk_score = 0.0
         
         # 1. Confidence check
-        if confidence < self.confidence_threshold:
-            risk_assessment['reasons'].append(f"Low confidence ({confidence:.2f} < {self.confidence_threshold:.2f})")
+        if confidence < params.confidence_threshold:
+            risk_assessment['reasons'].append(f"Low confidence ({confidence:.2f} < {params.confidence_threshold:.2f})")
         else:
             risk_score += confidence * 0.3
         
         # 2. Prediction magnitude check
         abs_prediction = abs(prediction)
-        if abs_prediction > 0.1:  # More than 10% prediction
+        if abs_prediction > MAX_PREDICTION:  # More than 10% prediction
             risk_assessment['reasons'].append(f"Large prediction magnitude ({abs_prediction:.2f})")
         else:
             risk_score += (1 - abs_prediction) * 0.2
         
         # 3. Position size check (simplified)
-        position_size = min(abs_prediction * self.risk_factor, self.position_size_limit)
-        if position_size > self.position_size_limit:
-            risk_assessment['reasons'].append(f"Position size exceeds limit ({position_size:.2f} > {self.position_size_limit:.2f})")
+        position_size = min(abs_prediction * params.risk_factor, params.position_size_limit)
+        if position_size > params.position_size_limit:
+            risk_assessment['reasons'].append(f"Position size exceeds limit ({position_size:.2f} > {params.position_size_limit:.2f})")
         else:
-            risk_score += (1 - position_size / self.position_size_limit) * 0.3
+            risk_score += (1 - position_size / params.position_size_limit) * 0.3
         
-        # 4. Volatility adjustment (simplified)
-        # In a real implementation, this would fetch actual volatility data
-        volatility = np.random.rand() * 0.05  # Random volatility between 0 and 5%
-        adjusted_position_size = position_size * (1 - volatility * self.volatility_multiplier)
+        # 4. Volatility adjustment (realized volatility of recent bars)
+        volatility = self.market_state.volatility(asset, default=self.default_volatility)
+        adjusted_position_size = position_size * (1 - volatility * params.volatility_multiplier)
         
-        if volatility > 0.03:  # High volatility (3%+)
+        if volatility > HIGH_VOLATILITY:  # High volatility (3%+)
             risk_assessment['reasons'].append(f"High volatility ({volatility:.2f})")
         else:
-            risk_score += (1 - volatility / 0.03) * 0.2
+            risk_score += (1 - volatility / HIGH_VOLATILITY) * 0.2
         
         # Set final risk score
         risk_assessment['risk_score'] = min(risk_score, 1.0)
         risk_assessment['position_size'] = max(0, adjusted_position_size)
         
+        # 5. Portfolio check (trades that reduce portfolio risk always pass)
+        trade = float(np.sign(prediction)) * risk_assessment['position_size']
+        portfolio = self.portfolio.check_trade(asset, trade)
+        risk_assessment['portfolio_var'] = portfolio['var']
+        risk_assessment['portfolio_cvar'] = portfolio['cvar']
+        risk_assessment['marginal_var'] = portfolio['marginal_var']
+        
+        reduces_risk = portfolio['marginal_var'] <= 0
+        within_var = portfolio['var'] <= self.max_portfolio_var or reduces_risk
+        if not within_var:
+            risk_assessment['reasons'].append(f"Portfolio VaR exceeds limit ({portfolio['var']:.2%} > {self.max_portfolio_var:.2%})")
+        
+        drawdown = self.portfolio.drawdown
+        within_drawdown = drawdown <= params.max_drawdown_limit or reduces_risk
+        if not within_drawdown:
+            risk_assessment['reasons'].append(f"Drawdown exceeds limit ({drawdown:.2%} > {params.max_drawdown_limit:.2%})")
+        
         # Approval decision
         # A forecast is approved if:
         # 1. Confidence is above threshold
         # 2. Position size is within limits
         # 3. Risk score is above a minimum threshold (0.5)
-        if (confidence >= self.confidence_threshold and 
-            adjusted_position_size <= self.position_size_limit and
-            risk_score >= 0.5):
+        # 4. Portfolio VaR and drawdown stay within their limits
+        if (confidence >= params.confidence_threshold and 
+            adjusted_position_size <= params.position_size_limit and
+            risk_score >= MIN_RISK_SCORE and
+            within_var and within_drawdown):
             risk_assessment['approved'] = True
             risk_assessment['reasons'].append("Risk assessment passed")
+            
+            # Reserve the trade right away so the next evaluation sees it. The execution
+            # report replaces it with the filled size; it is closed once the horizon passes.
+            # Forecasts without an id cannot be matched to a report and keep the reservation
+            self.portfolio.book(
+                forecast.get('id') if forecast.get('id') is not None else object(),
+                asset,
+                trade,
+                time.time() + horizon_seconds(forecast['horizon'])
+            )
         else:
             risk_assessment['reasons'].append("Risk assessment failed")
         
@@ -176,51 +415,67 @@ class RiskEngine:
         
         return risk_assessment
     
+    def evaluate_batch(self, predictions, confidences, volatilities):
+        """Evaluate many forecasts at once with the current risk parameters, without the portfolio gates (see evaluate_risk_batch)"""
+        params = self.strategy
+        return evaluate_risk_batch(
+            predictions, confidences, volatilities,
+            risk_factor=params.risk_factor,
+            position_size_limit=params.position_size_limit,
+            confidence_threshold=params.confidence_threshold,
+            volatility_multiplier=params.volatility_multiplier
+        )
+    
+    def propose_risk_factor(self):
+        """Decide on a new risk factor from drawdown and volatility (None to keep the current one)"""
+        params = self.strategy
+        drawdown = self.market_state.max_drawdown()
+        volatility = self.market_state.mean_volatility()
+        
+        # No market data yet, keep the current parameters
+        if drawdown is None or volatility is None:
+            return None
+        
+        # Drawdown beyond the limit or a volatile market: reduce risk
+        if drawdown > params.max_drawdown_limit or volatility > HIGH_VOLATILITY:
+            new_risk_factor = max(0.1, params.risk_factor * 0.9)
+            if new_risk_factor == params.risk_factor:
+                return None
+            logger.info(f"Reducing risk factor to {new_risk_factor:.2f} (drawdown {drawdown:.2%}, volatility {volatility:.2%})")
+            return new_risk_factor
+        
+        # Shallow drawdown in a calm market: allow more risk
+        if drawdown < params.max_drawdown_limit / 2 and volatility < HIGH_VOLATILITY / 2:
+            new_risk_factor = min(2.0, params.risk_factor * 1.1)
+            if new_risk_factor == params.risk_factor:
+                return None
+            logger.info(f"Increasing risk factor to {new_risk_factor:.2f} (drawdown {drawdown:.2%}, volatility {volatility:.2%})")
+            return new_risk_factor
+        
+        return None
+    
     def adjust_strategy_parameters(self):
         """Dynamically adjust strategy parameters based on market conditions"""
         logger.info("Adjusting strategy parameters")
         
         try:
-            # In a real implementation, this would analyze:
-            # 1. Recent trade performance
-            # 2. Market volatility
-            # 3. Drawdown levels
-            # 4. Portfolio performance
-            
-            # For demonstration, we'll randomly adjust parameters
-            # This is just a placeholder - in reality, this would be based on real analytics
-            
             cursor = self.db_conn.cursor()
             
-            # Example: Adjust risk factor based on recent performance
-            # (In reality, this would be based on actual performance data)
-            performance_indicator = np.random.rand()  # Random for demo
-            
-            if performance_indicator < 0.3:  # Poor performance
-                new_risk_factor = max(0.1, self.risk_factor * 0.9)
-                update_query = """
-                INSERT INTO trading_strategyconfig (key, value)
-                VALUES (%s, %s)
-                ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value
-                """
-                cursor.execute(update_query, ('risk_factor', str(new_risk_factor)))
-                self.risk_factor = new_risk_factor
-                logger.info(f"Reduced risk factor to {new_risk_factor:.2f} due to poor performance")
-            
-            elif performance_indicator > 0.7:  # Good performance
-                new_risk_factor = min(2.0, self.risk_factor * 1.1)
+            new_risk_factor = self.propose_risk_factor()
+            if new_risk_factor is not None:
                 update_query = """
                 INSERT INTO trading_strategyconfig (key, value)
                 VALUES (%s, %s)
                 ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value
                 """
                 cursor.execute(update_query, ('risk_factor', str(new_risk_factor)))
-                self.risk_factor = new_risk_factor
-                logger.info(f"Increased risk factor to {new_risk_factor:.2f} due to good performance")
             
             self.db_conn.commit()
             cursor.close()
             
+            if new_risk_factor is not None:
+                self.publish_strategy_config({'risk_factor': new_risk_factor})
+            
             logger.info("Strategy parameters adjusted")
         
         except Exception as e:
@@ -247,19 +502,45 @@ class RiskEngine:
             # In a real implementation, this would be based on a timer or specific conditions
             if np.random.rand() < 0.1:  # 10% chance per forecast
                 self.adjust_strategy_parameters()
-                self.load_strategy_config()  # Reload updated config
         
         except Exception as e:
             logger.error(f"Failed to handle forecast update: {e}")
             raise
     
     def save_risk_assessment(self, risk_assessment):
-        """Save risk assessment to database (simplified)"""
-        logger.info("Saving risk assessment to database")
-        
-        # In a real implementation, this would save to a dedicated risk assessment table
-        # For now, we'll just log it
-        logger.info(f"Risk assessment saved: {risk_assessment}")
+        """Queue a risk assessment for the batched write to trading_riskassessment"""
+        self.assessment_writer.submit(self.assessment_row(risk_assessment))
+    
+    def assessment_row(self, risk_assessment):
+        """Row of trading_riskassessment for a risk assessment"""
+        return (
+            risk_assessment['forecast_id'],
+            risk_assessment['asset'],
+            risk_assessment['horizon'],
+            risk_assessment['prediction'],
+            risk_assessment['confidence'],
+            risk_assessment['approved'],
+            risk_assessment['risk_score'],
+            risk_assessment['position_size'],
+            risk_assessment.get('portfolio_var'),
+            risk_assessment.get('portfolio_cvar'),
+            risk_assessment.get('marginal_var'),
+            Json(risk_assessment['reasons']),
+            risk_assessment['timestamp']
+        )
+    
+    def build_trade_signal(self, risk_assessment):
+        """Create the trade signal sent to the execution engine for an approved assessment"""
+        return {
+            'forecast_id': risk_assessment['forecast_id'],
+            'asset': risk_assessment['asset'],
+            'horizon': risk_assessment['horizon'],
+            'prediction': risk_assessment['prediction'],
+            'position_size': risk_assessment['position_size'],
+            'confidence': risk_assessment['confidence'],
+            'risk_score': risk_assessment['risk_score'],
+            'timestamp': datetime.utcnow().isoformat() + 'Z'
+        }
     
     def publish_approved_trade(self, risk_assessment):
         """Publish approved trade to Redis for execution"""
@@ -267,18 +548,14 @@ class RiskEngine:
         
         try:
             # Create trade signal
-            trade_signal = {
-                'asset': risk_assessment['asset'],
-                'horizon': risk_assessment['horizon'],
-                'prediction': risk_assessment['prediction'],
-                'position_size': risk_assessment['position_size'],
-                'confidence': risk_assessment['confidence'],
-                'risk_score': risk_assessment['risk_score'],
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            }
+            trade_signal = self.build_trade_signal(risk_assessment)
             
             # Publish to execution channel
-            self.redis_client.publish('approved_trades', json.dumps(trade_signal))
+            payload = encode_message(trade_signal, self.codec)
+            if self.transport == 'streams':
+                publish_to_stream(self.redis_client, 'approved_trades', payload, self.stream_maxlen)
+            else:
+                self.redis_client.publish('approved_trades', payload)
             logger.info(f"Approved trade published for {trade_signal['asset']}")
         
         except Exception as e:
@@ -296,10 +573,12 @@ class RiskEngine:
             for message in pubsub.listen():
                 if message['type'] == 'message':
                     try:
-                        forecast_data = json.loads(message['data'])
-                        self.handle_forecast_update(forecast_data)
-                    except json.JSONDecodeError as e:
+                        forecast_data = decode_message(message['data'])
+                    except ValueError as e:
                         logger.error(f"Failed to decode forecast data: {e}")
+                        continue
+                    try:
+                        self.handle_forecast_update(forecast_data)
                     except Exception as e:
                         logger.error(f"Error handling forecast update: {e}")
         
@@ -309,12 +588,37 @@ class RiskEngine:
         finally:
             pubsub.close()
     
+    def consume_forecast_stream(self):
+        """Consume forecast updates from the Redis Stream as part of the risk-engine group"""
+        logger.info("Starting to consume forecast stream")
+        
+        consumer = StreamConsumer(
+            self.redis_client,
+            stream='forecast_updates',
+            group='risk-engine',
+            consumer=self.consumer_name,
+            handler=lambda data: self.handle_forecast_update(decode_message(data))
+        )
+        consumer.run()
+    
     def run(self):
         """Run the risk engine"""
-        logger.info("Starting risk engine")
+        logger.info(f"Starting risk engine ({self.transport} transport)")
+        
+        self.start_listeners()
         
         # Start listening for forecasts
-        self.listen_for_forecasts()
+        try:
+            if self.async_consumer:
+                consumer = AsyncForecastConsumer(self, self.async_workers, self.async_queue_size)
+                asyncio.run(consumer.run())
+            elif self.transport == 'streams':
+                self.consume_forecast_stream()
+            else:
+                self.listen_for_forecasts()
+        finally:
+            # Write the assessments still queued
+            self.assessment_writer.close()
 
 
 def main():
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+import threading
+import numpy as np
+
+# Redis channel on which the forecast engine publishes new bars
+MARKET_BARS_CHANNEL = 'market_bars'
+
+
+class MarketStateTracker:
+    """
+    Per-asset realized volatility, drawdown and cross-asset covariance,
+    updated one bar at a time.
+
+    Returns are close-to-close and are placed in time slots of `bar_seconds`
+    so that bars of different assets line up. The covariance matrix is an
+    EWMA (RiskMetrics style, `decay` = lambda) of return products. A pair of
+    assets is updated once per slot in which both have a return, whichever
+    asset arrives second. Its diagonal gives the per-asset volatility.
+    Drawdown is measured from the running peak close.
+
+    Updating with a bar costs O(number of assets). State is kept in flat
+    numpy arrays indexed by asset number, and the arrays double in size
+    when a new asset does not fit. Bars that are not newer than the last
+    one seen for an asset are ignored, so replayed history is harmless.
+    Updates and reads hold `lock` (reentrant), which PortfolioRisk shares,
+    so readers never see a half-applied bar.
+    """
+
+    def __init__(self, decay=0.94, min_periods=10, bar_seconds=3600, window=256, capacity=16):
+        self.decay = decay
+        self.min_periods = min_periods
+        self.bar_seconds = bar_seconds
+        self.window = window
+        self.index = {}
+        self.version = 0
+        self.lock = threading.RLock()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.last_time = np.full(capacity, -np.inf)
+        self.last_price = np.full(capacity, np.nan)
+        self.peak_price = np.zeros(capacity)
+        self.returns_seen = np.zeros(capacity, dtype=np.int64)
+        self.covariance = np.zeros((capacity, capacity))
+        self.pairs_seen = np.zeros((capacity, capacity), dtype=np.int64)
+        # Recent returns per asset in a ring of `window` slots
+        self.return_slot = np.full((capacity, self.window), -1, dtype=np.int64)
+        self.return_hist = np.zeros((capacity, self.window))
+
+    def _grow(self):
+        size = len(self.last_time)
+        old = {
+            name: getattr(self, name)
+            for name in ('last_time', 'last_price', 'peak_price', 'returns_seen',
+                         'covariance', 'pairs_seen', 'return_slot', 'return_hist')
+        }
+        self._allocate(size * 2)
+        for name, values in old.items():
+            target = getattr(self, name)
+            if name in ('covariance', 'pairs_seen'):
+                target[:size, :size] = values
+            else:
+                target[:size] = values
+
+    @property
+    def capacity(self):
+        return len(self.last_time)
+
+    def asset_index(self, asset):
+        """Array slot of an asset, assigning a new one on first sight"""
+        i = self.index.get(asset)
+        if i is None:
+            with self.lock:
+                i = self.index.get(asset)
+                if i is None:
+                    i = len(self.index)
+                    if i == len(self.last_time):
+                        self._grow()
+                    self.index[asset] = i
+        return i
+
+    def update(self, asset, timestamp, close):
+        """Apply one bar (timestamp in epoch seconds); returns False if it is not new"""
+        with self.lock:
+            i = self.asset_index(asset)
+            if timestamp <= self.last_time[i]:
+                return False
+
+            last_price = self.last_price[i]
+            if not np.isnan(last_price):
+                self._add_return(i, int(timestamp // self.bar_seconds), close / last_price - 1)
+
+            self.last_time[i] = timestamp
+            self.last_price[i] = close
+            self.peak_price[i] = max(self.peak_price[i], close)
+            self.version += 1
+            return True
+
+    def _add_return(self, i, slot, ret):
+        column = slot % self.window
+        self.return_slot[i, column] = slot
+        self.return_hist[i, column] = ret
+        self.returns_seen[i] += 1
+
+        # Assets with a return in the same slot (including this one)
+        n = len(self.index)
+        peers = np.flatnonzero(self.return_slot[:n, column] == slot)
+        products = ret * self.return_hist[peers, column]
+
+        seen = self.pairs_seen[i, peers]
+        updated = np.where(
+            seen == 0,
+            products,
+            self.decay * self.covariance[i, peers] + (1 - self.decay) * products
+        )
+        self.covariance[i, peers] = updated
+        self.covariance[peers, i] = updated
+        self.pairs_seen[i, peers] = seen + 1
+        self.pairs_seen[peers, i] = seen + 1
+
+    def update_many(self, asset, timestamps, closes):
+        """Apply a sequence of bars in time order; returns the number applied"""
+        with self.lock:
+            return sum(self.update(asset, t, c) for t, c in zip(timestamps, closes))
+
+    def volatility(self, asset, default=None):
+        """Current per-bar volatility, or `default` until enough returns were seen"""
+        with self.lock:
+            i = self.index.get(asset)
+            if i is None or self.returns_seen[i] < self.min_periods:
+                return default
+            return float(np.sqrt(self.covariance[i, i]))
+
+    def drawdown(self, asset, default=None):
+        """Fractional decline of the last close from its running peak"""
+        with self.lock:
+            i = self.index.get(asset)
+            if i is None:
+                return default
+            return float(1 - self.last_price[i] / self.peak_price[i])
+
+    def max_drawdown(self):
+        """Largest current drawdown over all tracked assets (None if nothing is tracked)"""
+        with self.lock:
+            n = len(self.index)
+            if n == 0:
+                return None
+            return float(np.max(1 - self.last_price[:n] / self.peak_price[:n]))
+
+    def mean_volatility(self):
+        """Average volatility over assets past their warm-up (None if there are none)"""
+        with self.lock:
+            n = len(self.index)
+            ready = self.returns_seen[:n] >= self.min_periods
+            if not ready.any():
+                return None
+            return float(np.sqrt(np.diag(self.covariance)[:n][ready]).mean())
+
+    def aligned_returns(self):
+        """Returns of the last `window` slots as a (window, assets) matrix, 0 where missing"""
+        with self.lock:
+            n = len(self.index)
+            if n == 0:
+                return np.zeros((self.window, 0))
+            latest = int(self.return_slot[:n].max())
+            slots = latest - np.arange(self.window)
+            columns = slots % self.window
+            match = self.return_slot[:n, columns] == slots
+            return np.where(match, self.return_hist[:n, columns], 0.0).T
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+import re
+import time
+import heapq
+from collections import namedtuple
+from statistics import NormalDist
+import numpy as np
+
+# Redis channel on which lean-execution reports executed orders
+TRADE_EXECUTIONS_CHANNEL = 'trade_executions'
+
+# LeanExecutionEngine.build_order: order size = position_size * 1000
+ORDER_UNITS = 1000
+
+HORIZON_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+
+# One open position: asset slot, signed exposure, units held and their cost, close time
+Position = namedtuple('Position', ['index', 'trade', 'units', 'cost', 'expires_at'])
+
+
+def horizon_seconds(horizon, default=3600):
+    """Length of a forecast horizon like '1h', '4h' or '1d' in seconds"""
+    match = re.fullmatch(r'(\d+)([mhd])', horizon or '')
+    if match is None:
+        return default
+    return int(match.group(1)) * HORIZON_UNITS[match.group(2)]
+
+
+def parametric_var_cvar(variance, confidence=0.99):
+    """Normal VaR and CVaR (as positive fractions of capital) for a portfolio return variance"""
+    sigma = np.sqrt(max(variance, 0.0))
+    z = NormalDist().inv_cdf(confidence)
+    return z * sigma, sigma * NormalDist().pdf(z) / (1 - confidence)
+
+
+def historical_var_cvar(pnl, confidence=0.99):
+    """Empirical VaR and CVaR (as positive fractions of capital) from P&L samples"""
+    if len(pnl) == 0:
+        return 0.0, 0.0
+    losses = -np.asarray(pnl)
+    k = min(int(np.floor(confidence * len(losses))), len(losses) - 1)
+    tail = np.partition(losses, k)[k:]
+    return max(float(tail[0]), 0.0), max(float(tail.mean()), 0.0)
+
+
+class PortfolioRisk:
+    """
+    Portfolio exposures and the risk of adding a trade to them.
+
+    Exposures are signed fractions of capital per asset, indexed like the
+    MarketStateTracker they read covariance and returns from. The book is
+    a set of positions keyed by forecast id. An approval reserves its
+    trade until lean-execution reports the execution, which replaces the
+    reservation with the size actually filled (nothing for a rejected
+    order). Every position is closed, and its P&L realized, once its
+    forecast horizon has passed.
+
+    The covariance-weighted exposures (Sigma @ w) and the historical P&L of
+    the current book are cached. A proposed trade is then priced in O(1)
+    for parametric VaR, or O(window) for historical VaR. refresh()
+    rebuilds the caches (O(assets^2)) and runs in the market data thread
+    whenever new bars arrive, off the approval path. Assets still warming
+    up are priced with the default volatility everywhere.
+
+    Positions are marked to market against the last close, so the
+    portfolio drawdown from peak equity can be enforced. All state is
+    guarded by the market state's lock, so bars applied by the listener
+    thread never change the arrays under a running evaluation.
+    """
+
+    def __init__(self, market_state, confidence=0.99, method='parametric', default_volatility=0.025):
+        if method not in ('parametric', 'historical'):
+            raise ValueError(f"Unknown VaR method: {method}")
+        self.market_state = market_state
+        self.confidence = confidence
+        self.method = method
+        self.default_variance = default_volatility ** 2
+        self.peak_equity = 1.0
+        self.equity = 1.0
+        self.realized = 0.0
+        self.positions = {}
+        self._expiries = []
+        self._lock = market_state.lock
+        self._allocate(market_state.capacity)
+        self.refresh()
+
+    def _allocate(self, capacity):
+        self.exposure = np.zeros(capacity)
+        self.units = np.zeros(capacity)
+        self.cost = np.zeros(capacity)
+
+    def _ensure_capacity(self):
+        size = len(self.exposure)
+        if size < self.market_state.capacity:
+            old = (self.exposure, self.units, self.cost)
+            self._allocate(self.market_state.capacity)
+            for target, values in zip((self.exposure, self.units, self.cost), old):
+                target[:size] = values
+
+    @property
+    def drawdown(self):
+        return 1 - self.equity / self.peak_equity
+
+    def refresh(self, now=None):
+        """Close expired positions and rebuild the cached risk of the book from the latest market state"""
+        with self._lock:
+            self._expire(time.time() if now is None else now)
+            self._rebuild()
+            self._mark_to_market()
+
+    def _rebuild(self):
+        self._ensure_capacity()
+        n = len(self.market_state.index)
+        w = self.exposure[:n]
+        self.returns = self.market_state.aligned_returns()
+        self.sigma_w = self._covariance(n) @ w
+        self.variance = float(w @ self.sigma_w)
+        self.pnl = self.returns @ w
+
+    def _covariance(self, n):
+        """Covariance of the first n assets, with the default variance for assets still warming up"""
+        covariance = self.market_state.covariance[:n, :n].copy()
+        warming = np.flatnonzero(self.market_state.returns_seen[:n] < self.market_state.min_periods)
+        covariance[warming, warming] = self.default_variance
+        return covariance
+
+    def _mark_to_market(self):
+        n = len(self.market_state.index)
+        prices = self.market_state.last_price[:n]
+        held = self.units[:n] != 0
+        self.equity = 1.0 + self.realized + float(np.sum(self.units[:n][held] * prices[held] - self.cost[:n][held]))
+        self.peak_equity = max(self.peak_equity, self.equity)
+
+    def _asset_variance(self, i):
+        if self.market_state.returns_seen[i] < self.market_state.min_periods:
+            return self.default_variance
+        return self.market_state.covariance[i, i]
+
+    def check_trade(self, asset, trade, now=None):
+        """VaR and CVaR of the book with `trade` added, and the trade's marginal VaR"""
+        with self._lock:
+            if self._expire(time.time() if now is None else now):
+                self._mark_to_market()
+            i = self.market_state.index.get(asset)
+            if self.method == 'historical':
+                before, _ = historical_var_cvar(self.pnl, self.confidence)
+                pnl = self.pnl
+                if i is not None and i < self.returns.shape[1]:
+                    pnl = pnl + trade * self.returns[:, i]
+                var, cvar = historical_var_cvar(pnl, self.confidence)
+            else:
+                before, _ = parametric_var_cvar(self.variance, self.confidence)
+                if i is not None and i < len(self.sigma_w):
+                    variance = self.variance + 2 * trade * self.sigma_w[i] + trade * trade * self._asset_variance(i)
+                else:
+                    # No data for the asset yet: assume the default volatility, uncorrelated
+                    variance = self.variance + trade * trade * self.default_variance
+                var, cvar = parametric_var_cvar(variance, self.confidence)
+
+        return {'var': var, 'cvar': cvar, 'marginal_var': var - before}
+
+    def book(self, key, asset, trade, expires_at):
+        """Set the position of `key` (a forecast id) to `trade`, open until `expires_at` (epoch seconds)"""
+        i = self.market_state.asset_index(asset)
+        with self._lock:
+            previous = self.positions.pop(key, None)
+            if previous is not None:
+                self._apply(previous, -1)
+            if trade == 0:
+                return
+
+            price = self.market_state.last_price[i]
+            units = 0.0 if np.isnan(price) else trade / price
+            position = Position(i, trade, units, trade if units else 0.0, expires_at)
+            self.positions[key] = position
+            heapq.heappush(self._expiries, (expires_at, id(position), key, position))
+            self._apply(position, 1)
+
+    def _expire(self, now):
+        """Close the positions whose horizon has passed; returns whether any were closed"""
+        closed = False
+        while self._expiries and self._expiries[0][0] <= now:
+            _, _, key, position = heapq.heappop(self._expiries)
+            # Skip positions replaced by a later booking
+            if self.positions.get(key) is not position:
+                continue
+            del self.positions[key]
+            price = self.market_state.last_price[position.index]
+            if position.units and not np.isnan(price):
+                self.realized += position.units * price - position.cost
+            self._apply(position, -1)
+            closed = True
+        return closed
+
+    def _apply(self, position, sign):
+        """Add (sign=1) or remove (sign=-1) a position and update the cached risk incrementally"""
+        i = position.index
+        trade = sign * position.trade
+        self._ensure_capacity()
+        self.exposure[i] += trade
+        self.units[i] += sign * position.units
+        self.cost[i] += sign * position.cost
+
+        if i >= len(self.sigma_w):
+            # First position in an asset that appeared after the last refresh
+            self._rebuild()
+            return
+        column = self.market_state.covariance[:len(self.sigma_w), i].copy()
+        column[i] = self._asset_variance(i)
+        self.variance += 2 * trade * self.sigma_w[i] + trade * trade * column[i]
+        self.sigma_w += trade * column
+        if i < self.returns.shape[1]:
+            self.pnl = self.pnl + trade * self.returns[:, i]
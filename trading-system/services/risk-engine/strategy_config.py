@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+from collections import namedtuple
+from datetime import datetime
+
+# Redis channel carrying config changes and the counter that versions them
+STRATEGY_CONFIG_CHANNEL = 'strategy_config'
+STRATEGY_CONFIG_VERSION_KEY = 'strategy_config:version'
+
+# Immutable snapshot of the risk parameters; replaced as a whole on every change
+StrategyConfigSnapshot = namedtuple('StrategyConfigSnapshot', [
+    'risk_factor',
+    'position_size_limit',
+    'confidence_threshold',
+    'max_drawdown_limit',
+    'volatility_multiplier',
+    'version',
+])
+
+DEFAULT_STRATEGY_CONFIG = StrategyConfigSnapshot(
+    risk_factor=1.0,
+    position_size_limit=0.1,
+    confidence_threshold=0.7,
+    max_drawdown_limit=0.05,
+    volatility_multiplier=1.0,
+    version=0,
+)
+
+PARAMETER_KEYS = set(StrategyConfigSnapshot._fields) - {'version'}
+
+
+def merge_strategy_config(snapshot, configs, version=None):
+    """Return a new snapshot with (key, value) rows applied; unknown keys are ignored"""
+    changes = {key: float(value) for key, value in configs if key in PARAMETER_KEYS}
+    if version is not None:
+        changes['version'] = version
+    return snapshot._replace(**changes)
+
+
+def build_config_notification(changes, version):
+    """Message published on the strategy_config channel"""
+    return {
+        'version': version,
+        'config': {key: str(value) for key, value in changes.items()},
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    }
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from trading_shared.codec import encode_message, get_codec
+from async_consumer import AsyncForecastConsumer
+
+
+class FakeEngine:
+    """Records the forecasts it evaluates; approves none, fails on 'fail' assets"""
+
+    codec = get_codec('json')
+    transport = 'streams'
+
+    def __init__(self):
+        self.handled = []
+        self.assessment_writer = SimpleNamespace(submit_async=self.submit_async)
+
+    async def submit_async(self, row):
+        await asyncio.sleep(0)
+
+    def evaluate_forecast_risk(self, forecast):
+        if forecast['asset'] == 'fail':
+            raise ValueError('evaluation failed')
+        self.handled.append((forecast['asset'], forecast['seq']))
+        return {'approved': False}
+
+    def assessment_row(self, risk_assessment):
+        return risk_assessment
+
+
+class FakeStream:
+    def __init__(self):
+        self.acked, self.released, self.dead = [], [], []
+
+    async def ack(self, entry_id):
+        self.acked.append(entry_id)
+
+    def release(self, entry_id):
+        self.released.append(entry_id)
+
+    async def dead_letter(self, entry_id):
+        self.dead.append(entry_id)
+
+
+@pytest.fixture(autouse=True)
+def no_strategy_adjustments(monkeypatch):
+    monkeypatch.setattr('async_consumer.np.random.rand', lambda: 1.0)
+
+
+async def consume(consumer, messages):
+    consumer.stream = FakeStream()
+    consumer.queues = [asyncio.Queue(maxsize=consumer.queue_size) for _ in range(consumer.workers)]
+    workers = [asyncio.create_task(consumer.worker(queue)) for queue in consumer.queues]
+    for entry_id, data in messages:
+        await consumer.dispatch(data, entry_id)
+    await asyncio.gather(*(queue.join() for queue in consumer.queues))
+    for task in workers:
+        task.cancel()
+    return consumer.stream
+
+
+def test_forecasts_for_an_asset_keep_their_order():
+    engine = FakeEngine()
+    consumer = AsyncForecastConsumer(engine, workers=4, queue_size=2)
+    assets = ['BTCUSD', 'ETHUSD', 'SOLUSD', 'ADAUSD', 'XRPUSD']
+    messages = [
+        (f'{seq}-{asset}', encode_message({'asset': asset, 'seq': seq}, FakeEngine.codec))
+        for seq in range(20) for asset in assets
+    ]
+
+    stream = asyncio.run(consume(consumer, messages))
+
+    for asset in assets:
+        assert [seq for a, seq in engine.handled if a == asset] == list(range(20))
+    assert sorted(stream.acked) == sorted(entry_id for entry_id, _ in messages)
+
+
+def test_failed_and_malformed_entries_are_not_acked():
+    engine = FakeEngine()
+    consumer = AsyncForecastConsumer(engine, workers=2)
+    messages = [
+        ('1-0', encode_message({'asset': 'BTCUSD', 'seq': 0}, FakeEngine.codec)),
+        ('2-0', encode_message({'asset': 'fail', 'seq': 0}, FakeEngine.codec)),
+        ('3-0', b'not a forecast'),
+        ('4-0', encode_message({'seq': 0}, FakeEngine.codec)),
+    ]
+
+    stream = asyncio.run(consume(consumer, messages))
+
+    assert stream.acked == ['1-0']
+    # Failed handling is retried after reclaim; malformed entries never could succeed
+    assert stream.released == ['2-0']
+    assert stream.dead == ['3-0', '4-0']
@@ -0,0 +1,62 @@
+import numpy as np
+from trading_shared.risk_batch import ewma_volatility
+from market_state import MarketStateTracker
+
+HOUR = 3600
+
+
+def random_walk(seed, n=300):
+    return 100 * np.cumprod(1 + np.random.default_rng(seed).normal(0, 0.01, n))
+
+
+def test_volatility_matches_the_vectorized_ewma():
+    closes = random_walk(1)
+    tracker = MarketStateTracker(decay=0.94, min_periods=10)
+    tracker.update_many('BTCUSD', np.arange(len(closes)) * HOUR, closes)
+
+    expected = ewma_volatility(closes[1:] / closes[:-1] - 1, decay=0.94, min_periods=10)[-1]
+    assert np.isclose(tracker.volatility('BTCUSD'), expected)
+
+
+def test_volatility_needs_min_periods():
+    tracker = MarketStateTracker(min_periods=10)
+    tracker.update_many('BTCUSD', np.arange(10) * HOUR, random_walk(2, 10))
+    assert tracker.volatility('BTCUSD', default=0.025) == 0.025
+
+    tracker.update('BTCUSD', 10 * HOUR, 101.0)
+    assert tracker.volatility('BTCUSD', default=0.025) != 0.025
+
+
+def test_replayed_bars_are_ignored():
+    tracker = MarketStateTracker()
+    assert tracker.update('BTCUSD', 2 * HOUR, 100.0)
+    assert not tracker.update('BTCUSD', HOUR, 50.0)
+    assert not tracker.update('BTCUSD', 2 * HOUR, 50.0)
+    assert tracker.drawdown('BTCUSD') == 0.0
+
+
+def test_drawdown_from_running_peak():
+    tracker = MarketStateTracker()
+    tracker.update_many('BTCUSD', [0, HOUR, 2 * HOUR], [100.0, 120.0, 90.0])
+    tracker.update_many('ETHUSD', [0, HOUR], [10.0, 9.0])
+
+    assert np.isclose(tracker.drawdown('BTCUSD'), 0.25)
+    assert np.isclose(tracker.max_drawdown(), 0.25)
+
+
+def test_covariance_of_assets_in_the_same_slot_and_growth():
+    tracker = MarketStateTracker(decay=0.94, capacity=2)
+    btc, eth = random_walk(3), random_walk(4)
+    for t in range(len(btc)):
+        tracker.update('BTCUSD', t * HOUR, btc[t])
+        tracker.update('ETHUSD', t * HOUR + 60, eth[t])
+    tracker.update('SOLUSD', 0, 20.0)
+
+    assert tracker.capacity == 4
+    r_btc, r_eth = btc[1:] / btc[:-1] - 1, eth[1:] / eth[:-1] - 1
+    expected = r_btc[0] * r_eth[0]
+    for a, b in zip(r_btc[1:], r_eth[1:]):
+        expected = 0.94 * expected + 0.06 * a * b
+    i, j = tracker.index['BTCUSD'], tracker.index['ETHUSD']
+    assert np.isclose(tracker.covariance[i, j], expected)
+    assert tracker.aligned_returns().shape == (tracker.window, 3)
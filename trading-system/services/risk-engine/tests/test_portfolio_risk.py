@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from market_state import MarketStateTracker
+from portfolio_risk import PortfolioRisk, historical_var_cvar, horizon_seconds, parametric_var_cvar
+
+HOUR = 3600
+ASSETS = ['BTCUSD', 'ETHUSD', 'SOLUSD']
+
+
+@pytest.fixture
+def market_state():
+    rng = np.random.default_rng(5)
+    common = rng.normal(0, 0.01, 200)
+    tracker = MarketStateTracker(min_periods=10)
+    for k, asset in enumerate(ASSETS):
+        closes = 100 * np.cumprod(1 + common + rng.normal(0, 0.005 * (k + 1), 200))
+        tracker.update_many(asset, np.arange(200) * HOUR, closes)
+    return tracker
+
+
+def full_variance(portfolio):
+    n = len(portfolio.market_state.index)
+    w = portfolio.exposure[:n]
+    return float(w @ portfolio._covariance(n) @ w)
+
+
+def test_incremental_var_matches_a_full_rebuild(market_state):
+    portfolio = PortfolioRisk(market_state, confidence=0.99)
+    portfolio.book(1, 'BTCUSD', 0.05, expires_at=10 ** 10)
+    portfolio.book(2, 'ETHUSD', -0.02, expires_at=10 ** 10)
+
+    result = portfolio.check_trade('SOLUSD', 0.03, now=0)
+    portfolio.book(3, 'SOLUSD', 0.03, expires_at=10 ** 10)
+    var, cvar = parametric_var_cvar(full_variance(portfolio), 0.99)
+
+    assert np.isclose(result['var'], var) and np.isclose(result['cvar'], cvar)
+    assert np.isclose(portfolio.variance, full_variance(portfolio))
+
+
+def test_hedging_trade_has_negative_marginal_var(market_state):
+    portfolio = PortfolioRisk(market_state)
+    portfolio.book(1, 'BTCUSD', 0.05, expires_at=10 ** 10)
+
+    assert portfolio.check_trade('BTCUSD', -0.02, now=0)['marginal_var'] < 0
+    assert portfolio.check_trade('ETHUSD', 0.02, now=0)['marginal_var'] > 0
+
+
+def test_rebooking_a_key_replaces_its_position(market_state):
+    portfolio = PortfolioRisk(market_state)
+    portfolio.book(1, 'BTCUSD', 0.05, expires_at=10 ** 10)
+    portfolio.book(1, 'BTCUSD', 0.02, expires_at=10 ** 10)
+    assert np.isclose(portfolio.exposure[market_state.index['BTCUSD']], 0.02)
+
+    portfolio.book(1, 'BTCUSD', 0, expires_at=10 ** 10)
+    assert portfolio.positions == {} and portfolio.variance == pytest.approx(0)
+
+
+def test_expired_positions_realize_their_pnl(market_state):
+    portfolio = PortfolioRisk(market_state)
+    portfolio.book(1, 'BTCUSD', 0.05, expires_at=1000)
+    price = market_state.last_price[market_state.index['BTCUSD']]
+    market_state.update('BTCUSD', 200 * HOUR, price * 1.1)
+
+    portfolio.refresh(now=1001)
+    assert portfolio.positions == {}
+    assert np.isclose(portfolio.realized, 0.05 * 0.1)
+    assert np.isclose(portfolio.equity, 1 + 0.05 * 0.1)
+
+
+def test_historical_var_cvar():
+    # Losses of 0.000 .. 0.099; the worst 5 % are 0.095 .. 0.099
+    pnl = -np.arange(100) / 1000
+    var, cvar = historical_var_cvar(np.random.default_rng(0).permutation(pnl), confidence=0.95)
+    assert np.isclose(var, 0.095) and np.isclose(cvar, 0.097)
+    assert historical_var_cvar(np.full(10, 0.01)) == (0.0, 0.0)
+
+
+def test_horizon_seconds():
+    assert [horizon_seconds(h) for h in ('15m', '4h', '1d')] == [900, 4 * HOUR, 86400]
+    assert horizon_seconds('weekly', default=7) == 7
@@ -0,0 +1,37 @@
+import threading
+import numpy as np
+from main import RiskEngine
+from market_state import MarketStateTracker
+from portfolio_risk import PortfolioRisk
+from strategy_config import DEFAULT_STRATEGY_CONFIG
+
+
+def bare_engine():
+    """A RiskEngine with an empty book and no bars; no database or Redis"""
+    engine = object.__new__(RiskEngine)
+    engine.strategy = DEFAULT_STRATEGY_CONFIG
+    engine._strategy_lock = threading.Lock()
+    engine.market_state = MarketStateTracker()
+    engine.default_volatility = 0.025
+    engine.portfolio = PortfolioRisk(engine.market_state, default_volatility=engine.default_volatility)
+    # Keep the portfolio gates open, so only the per-forecast rules decide
+    engine.max_portfolio_var = float('inf')
+    return engine
+
+
+def test_batch_matches_the_per_forecast_rules():
+    rng = np.random.default_rng(3)
+    predictions = rng.normal(0, 0.06, 200)
+    confidences = rng.uniform(0.4, 1.0, 200)
+
+    engine = bare_engine()
+    batch = engine.evaluate_batch(predictions, confidences, np.full(200, engine.default_volatility))
+
+    for i, (prediction, confidence) in enumerate(zip(predictions, confidences)):
+        engine.portfolio = PortfolioRisk(engine.market_state, default_volatility=engine.default_volatility)
+        single = engine.evaluate_forecast_risk(
+            {'asset': 'BTCUSD', 'horizon': '1h', 'prediction': float(prediction), 'confidence': float(confidence)}
+        )
+        assert single['approved'] == batch['approved'][i]
+        assert np.isclose(single['risk_score'], batch['risk_score'][i])
+        assert np.isclose(single['position_size'], batch['position_size'][i])
@@ -0,0 +1,57 @@
+import threading
+from unittest import mock
+from main import RiskEngine
+from strategy_config import DEFAULT_STRATEGY_CONFIG, build_config_notification, merge_strategy_config
+
+
+def bare_engine():
+    """A RiskEngine with only the strategy state; no database or Redis"""
+    engine = object.__new__(RiskEngine)
+    engine.strategy = DEFAULT_STRATEGY_CONFIG
+    engine._strategy_lock = threading.Lock()
+    engine._strategy_reload = threading.Event()
+    return engine
+
+
+def test_merge_applies_known_keys_and_ignores_the_rest():
+    snapshot = merge_strategy_config(
+        DEFAULT_STRATEGY_CONFIG, [('risk_factor', '1.5'), ('unknown', '3'), ('version', '99')], version=4
+    )
+
+    assert snapshot.risk_factor == 1.5
+    assert snapshot.version == 4
+    assert snapshot.confidence_threshold == DEFAULT_STRATEGY_CONFIG.confidence_threshold
+    assert DEFAULT_STRATEGY_CONFIG.risk_factor == 1.0
+
+
+def test_outdated_notifications_are_ignored():
+    engine = bare_engine()
+    assert engine.apply_strategy_config([('risk_factor', '1.2')], 1)
+    assert not engine.apply_strategy_config([('risk_factor', '0.8')], 1)
+
+    assert engine.risk_factor == 1.2
+    assert not engine._strategy_reload.is_set()
+
+
+def test_version_gap_triggers_a_reload():
+    engine = bare_engine()
+    notification = build_config_notification({'risk_factor': 0.9}, 3)
+
+    engine.apply_strategy_config(notification['config'].items(), notification['version'])
+
+    assert engine.risk_factor == 0.9
+    assert engine._strategy_reload.is_set()
+
+
+def test_reload_does_not_undo_a_newer_notification():
+    engine = bare_engine()
+    engine.apply_strategy_config([('risk_factor', '1.3')], 1)
+
+    # The reload read version 0, then the table; the notification is newer
+    engine.redis_client = mock.Mock(get=mock.Mock(return_value=b'0'))
+    engine.db_conn = mock.Mock()
+    engine.db_conn.cursor.return_value.fetchall.return_value = [('risk_factor', '1.0')]
+    engine.load_strategy_config()
+
+    assert engine.risk_factor == 1.3
+    assert engine.strategy.version == 1
@@ -0,0 +1,56 @@
+import asyncio
+import psycopg2
+from trading_shared import batch_writer
+from trading_shared.batch_writer import BatchWriter
+
+INSERT = "INSERT INTO trades (id, asset) VALUES %s"
+
+
+def make_writer(**kwargs):
+    return BatchWriter({}, INSERT, **kwargs)
+
+
+def test_next_batch_stops_at_batch_size():
+    writer = make_writer(batch_size=3, flush_ms=50)
+    for i in range(5):
+        writer.submit((i, 'BTCUSD'))
+
+    assert writer.next_batch() == [(0, 'BTCUSD'), (1, 'BTCUSD'), (2, 'BTCUSD')]
+    assert writer.next_batch() == [(3, 'BTCUSD'), (4, 'BTCUSD')]
+    assert writer.next_batch() == []
+
+
+def test_submit_nowait_reports_a_full_queue():
+    writer = make_writer(queue_size=1)
+    assert writer.submit_nowait((1, 'BTCUSD'))
+    assert not writer.submit_nowait((2, 'BTCUSD'))
+
+
+def test_submit_async_waits_for_room():
+    writer = make_writer(queue_size=1)
+    writer.submit((1, 'BTCUSD'))
+
+    async def scenario():
+        pending = asyncio.create_task(writer.submit_async((2, 'BTCUSD')))
+        await asyncio.sleep(0.01)
+        assert not pending.done()
+        writer.queue.get_nowait()
+        await asyncio.wait_for(pending, 1)
+
+    asyncio.run(scenario())
+    assert writer.queue.get_nowait() == (2, 'BTCUSD')
+
+
+def test_failed_batch_is_dropped_after_retries(monkeypatch):
+    attempts = []
+
+    def connect(**kwargs):
+        attempts.append(kwargs)
+        raise psycopg2.OperationalError("database is down")
+
+    monkeypatch.setattr(batch_writer.psycopg2, 'connect', connect)
+    monkeypatch.setattr(batch_writer.time, 'sleep', lambda seconds: None)
+
+    writer = make_writer(max_retries=3)
+    assert not writer.write([(1, 'BTCUSD')])
+    assert len(attempts) == 3
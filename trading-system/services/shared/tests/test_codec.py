@@ -0,0 +1,42 @@
+import pytest
+from trading_shared.codec import SCHEMA_VERSION, decode_message, encode_message, get_codec
+
+FORECAST = {
+    'id': 7321456789012345678,
+    'asset': 'BTCUSD',
+    'horizon': '1h',
+    'prediction': -0.0123,
+    'confidence': 0.81,
+    'timestamp': '2026-10-18T12:00:00Z',
+}
+
+
+@pytest.mark.parametrize('name', ['json', 'msgpack'])
+def test_round_trip(name):
+    assert decode_message(encode_message(FORECAST, get_codec(name))) == FORECAST
+
+
+def test_json_is_unframed_for_old_subscribers():
+    assert encode_message(FORECAST, get_codec('json')).startswith(b'{')
+
+
+def test_decodes_str_payload():
+    assert decode_message(encode_message(FORECAST, get_codec('json')).decode()) == FORECAST
+
+
+def test_rejects_newer_schema_version():
+    data = bytearray(encode_message(FORECAST, get_codec('msgpack')))
+    data[1] = SCHEMA_VERSION + 1
+    with pytest.raises(ValueError, match='schema version'):
+        decode_message(bytes(data))
+
+
+@pytest.mark.parametrize('data', [b'', bytes((99, SCHEMA_VERSION)) + b'x'])
+def test_rejects_empty_and_unknown_codec(data):
+    with pytest.raises(ValueError):
+        decode_message(data)
+
+
+def test_unknown_codec_name():
+    with pytest.raises(ValueError, match='Unknown message codec'):
+        get_codec('protobuf')
@@ -0,0 +1,51 @@
+import fakeredis
+import pytest
+from trading_shared.ids import (
+    MAX_WORKER_ID, WORKER_LEASE_KEY, SnowflakeGenerator, WorkerIdLease, create_id_generator, id_timestamp
+)
+
+
+def test_ids_strictly_increase_and_encode_the_worker():
+    generator = SnowflakeGenerator(5)
+    ids = [generator.next_id() for _ in range(10000)]
+
+    assert ids == sorted(set(ids))
+    assert all((i >> 12) & MAX_WORKER_ID == 5 for i in ids)
+
+
+def test_ids_do_not_go_back_with_the_clock(monkeypatch):
+    generator = SnowflakeGenerator(1)
+    first = generator.next_id()
+    monkeypatch.setattr('trading_shared.ids.time.time', lambda: id_timestamp(first).timestamp() - 60)
+    assert generator.next_id() > first
+
+
+def test_rejects_worker_id_out_of_range():
+    with pytest.raises(ValueError):
+        SnowflakeGenerator(MAX_WORKER_ID + 1)
+
+
+def test_leases_distinct_worker_ids_and_releases_them():
+    client = fakeredis.FakeRedis()
+    first = create_id_generator(None, client)
+    second = create_id_generator(None, client)
+
+    assert first.worker_id != second.worker_id
+    first.close()
+    second.close()
+    assert not client.keys(WORKER_LEASE_KEY.format('*'))
+
+
+def test_stops_issuing_ids_once_the_lease_is_lost():
+    client = fakeredis.FakeRedis()
+    lease = WorkerIdLease(client)
+    generator = SnowflakeGenerator(lease.acquire(), lease)
+
+    # The lease expired and another process took the worker id
+    client.set(lease.key, 'other-process')
+    assert not lease.owned()
+    lease.lost = True
+    with pytest.raises(RuntimeError):
+        generator.next_id()
+    lease.release()
+    assert client.get(lease.key) == b'other-process'
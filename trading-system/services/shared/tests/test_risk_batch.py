@@ -0,0 +1,38 @@
+import numpy as np
+from trading_shared.risk_batch import RiskReason, describe_reasons, evaluate_risk_batch, ewma_volatility
+
+
+def test_approves_and_rejects_with_reasons():
+    result = evaluate_risk_batch(
+        predictions=[0.02, -0.02, 0.2, 0.02],
+        confidences=[0.9, 0.5, 0.9, 0.9],
+        volatilities=[0.01, 0.01, 0.01, 0.05],
+    )
+
+    # High volatility only costs score and size; it does not reject on its own
+    assert result['approved'].tolist() == [True, False, False, True]
+    assert describe_reasons(result['reasons'][1]) == ['low_confidence']
+    assert result['reasons'][2] & RiskReason.LARGE_PREDICTION
+    assert result['reasons'][3] & RiskReason.HIGH_VOLATILITY
+    assert result['position_size'][0] == 0.02 * (1 - 0.01)
+
+
+def test_risk_score_of_a_clean_forecast():
+    result = evaluate_risk_batch([0.05], [0.8], [0.015], risk_factor=1.0, position_size_limit=0.1)
+    expected = 0.8 * 0.3 + (1 - 0.05) * 0.2 + (1 - 0.05 / 0.1) * 0.3 + (1 - 0.015 / 0.03) * 0.2
+    assert np.isclose(result['risk_score'][0], expected)
+
+
+def test_ewma_volatility_matches_the_recursion():
+    returns = np.random.default_rng(7).normal(0, 0.02, 1000)
+    decay, min_periods = 0.94, 10
+
+    variance = returns[0] ** 2
+    expected = []
+    for r in returns:
+        variance = decay * variance + (1 - decay) * r * r
+        expected.append(np.sqrt(variance))
+    expected = np.array(expected)
+    expected[:min_periods - 1] = 0.025
+
+    np.testing.assert_allclose(ewma_volatility(returns, decay, min_periods, default=0.025), expected, rtol=1e-9)
@@ -0,0 +1,80 @@
+import time
+import asyncio
+import fakeredis
+import fakeredis.aioredis
+from trading_shared.streams import AsyncStreamConsumer, StreamConsumer, publish_to_stream
+
+
+def make_consumer(client, handler, **kwargs):
+    consumer = StreamConsumer(client, 'signals', 'risk', 'risk-1', handler, claim_idle_ms=1, **kwargs)
+    consumer.ensure_group()
+    return consumer
+
+
+def read_new(consumer):
+    response = consumer.redis_client.xreadgroup(consumer.group, consumer.consumer, {consumer.stream: '>'})
+    for _, entries in response:
+        consumer.process(entries)
+
+
+def test_acks_only_handled_entries():
+    client = fakeredis.FakeRedis()
+    seen = []
+
+    def handler(data):
+        if data == b'bad':
+            raise ValueError(data)
+        seen.append(data)
+
+    consumer = make_consumer(client, handler)
+    publish_to_stream(client, 'signals', b'good')
+    publish_to_stream(client, 'signals', b'bad')
+    read_new(consumer)
+
+    assert seen == [b'good']
+    assert client.xpending('signals', 'risk')['pending'] == 1
+
+
+def test_failed_entry_is_retried_then_dead_lettered():
+    client = fakeredis.FakeRedis()
+    attempts = []
+
+    def handler(data):
+        attempts.append(data)
+        raise ValueError(data)
+
+    consumer = make_consumer(client, handler, max_deliveries=3)
+    publish_to_stream(client, 'signals', b'poison')
+    read_new(consumer)
+    for _ in range(3):
+        time.sleep(0.005)
+        consumer.reclaim_pending()
+
+    assert len(attempts) == 3
+    assert client.xpending('signals', 'risk')['pending'] == 0
+    assert [fields[b'data'] for _, fields in client.xrange('signals:dead')] == [b'poison']
+
+
+def test_async_reclaim_skips_entries_in_progress():
+    async def scenario():
+        client = fakeredis.aioredis.FakeRedis()
+        started = []
+
+        async def handler(entry_id, data):
+            started.append(entry_id)
+
+        consumer = AsyncStreamConsumer(client, 'signals', 'risk', 'risk-1', handler, claim_idle_ms=1)
+        await consumer.ensure_group()
+        await client.xadd('signals', {'data': b'slow'})
+        response = await client.xreadgroup('risk', 'risk-1', {'signals': '>'})
+        await consumer.process(response[0][1])
+
+        # The handler returned but nobody acked yet: the entry must not start twice
+        await asyncio.sleep(0.005)
+        await consumer.reclaim_pending()
+        assert len(started) == 1
+
+        await consumer.ack(started[0])
+        assert (await client.xpending('signals', 'risk'))['pending'] == 0
+
+    asyncio.run(scenario())
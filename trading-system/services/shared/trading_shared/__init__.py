@@ -0,0 +1 @@
+"""Modules shared by forecast-engine, risk-engine and lean-execution"""
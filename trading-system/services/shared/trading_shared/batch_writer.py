@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Buffered multi-row INSERT writer used by risk-engine and lean-execution.
+"""
+
+import time
+import queue
+import asyncio
+import logging
+import threading
+import psycopg2
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """
+    Background writer for row tuples.
+
+    submit() only puts the row on a bounded queue. A writer thread with its
+    own connection inserts queued rows with `insert_query` (an INSERT ...
+    VALUES %s statement) once `batch_size` rows are waiting or `flush_ms`
+    have passed since the first row of the batch. When the database falls
+    behind and the queue is full, submit() blocks, so the producers slow
+    down instead of rows being buffered without limit (asyncio producers use
+    submit_async(), which waits off the event loop). A batch that fails
+    `max_retries` times is logged and dropped.
+    """
+
+    def __init__(self, db_config, insert_query, batch_size=500, flush_ms=200,
+                 queue_size=10000, max_retries=3, name='batch-writer'):
+        self.db_config = db_config
+        self.insert_query = insert_query
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.max_retries = max_retries
+        self.name = name
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.db_conn = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self.run, name=name, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def submit(self, row):
+        """Queue a row for writing (blocks while the queue is full)"""
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            logger.warning(f"{self.name} queue is full, waiting for the writer")
+            self.queue.put(row)
+
+    def submit_nowait(self, row):
+        """Queue a row if there is room; returns False instead of blocking when the queue is full"""
+        try:
+            self.queue.put_nowait(row)
+            return True
+        except queue.Full:
+            return False
+
+    async def submit_async(self, row):
+        """Queue a row from an event loop; waits for room in a worker thread, never on the loop"""
+        if not self.submit_nowait(row):
+            await asyncio.get_running_loop().run_in_executor(None, self.submit, row)
+
+    def next_batch(self):
+        """Collect up to batch_size rows, waiting at most flush_interval after the first"""
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def write(self, batch):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                if self.db_conn is None or self.db_conn.closed:
+                    self.db_conn = psycopg2.connect(**self.db_config)
+                with self.db_conn.cursor() as cursor:
+                    execute_values(cursor, self.insert_query, batch, page_size=self.batch_size)
+                self.db_conn.commit()
+                return True
+            except Exception as e:
+                logger.error(f"{self.name} failed to write {len(batch)} rows (attempt {attempt}): {e}")
+                if self.db_conn is not None and not self.db_conn.closed:
+                    try:
+                        self.db_conn.rollback()
+                    except psycopg2.Error:
+                        self.db_conn.close()
+                time.sleep(min(2 ** attempt * 0.1, 5))
+        logger.error(f"{self.name} dropped {len(batch)} rows")
+        return False
+
+    def run(self):
+        while not (self._stopped.is_set() and self.queue.empty()):
+            batch = self.next_batch()
+            if batch:
+                self.write(batch)
+                for _ in batch:
+                    self.queue.task_done()
+
+    def flush(self):
+        """Block until every queued row has been written (or dropped)"""
+        self.queue.join()
+
+    def close(self):
+        """Write the remaining rows and stop the writer thread"""
+        self._stopped.set()
+        self._thread.join()
+        if self.db_conn is not None:
+            self.db_conn.close()
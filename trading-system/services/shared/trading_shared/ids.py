@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Snowflake-style 64-bit IDs used by forecast-engine, lean-execution and the
+Django backend (bulk forecast ingest).
+
+Layout (most significant bit first):
+- 1 bit unused (IDs stay positive in a signed BIGINT)
+- 41 bits milliseconds since ID_EPOCH_MS
+- 10 bits worker id
+- 12 bits sequence within the millisecond
+
+IDs from one generator strictly increase, and they sort by creation time
+across workers. Each process that writes to the same table needs its own
+worker id: either ID_WORKER_ID, or one leased from Redis (WorkerIdLease).
+"""
+
+import os
+import time
+import socket
+import logging
+import threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+ID_EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+
+# Redis keys of the worker id leases
+WORKER_LEASE_KEY = 'snowflake:worker:{}'
+WORKER_COUNTER_KEY = 'snowflake:worker_counter'
+
+
+class WorkerIdLease:
+    """
+    A worker id leased from Redis, so replicas never share one.
+
+    acquire() claims the first free id with SET NX and a TTL of `ttl`
+    seconds. The search starts at a shared counter, so replicas spread over
+    the id range. A daemon thread renews the lease every ttl/3 seconds. If
+    the lease expired and another process took the id, `lost` is set and
+    the generator stops issuing ids rather than produce duplicates.
+    """
+
+    def __init__(self, redis_client, ttl=60):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{time.time_ns()}"
+        self.worker_id = None
+        self.lost = False
+        self._stopped = threading.Event()
+
+    @property
+    def key(self):
+        return WORKER_LEASE_KEY.format(self.worker_id)
+
+    def acquire(self):
+        """Lease a free worker id and start renewing it; raises RuntimeError if all are taken"""
+        start = self.redis.incr(WORKER_COUNTER_KEY)
+        for i in range(MAX_WORKER_ID + 1):
+            worker_id = (start + i) & MAX_WORKER_ID
+            if self.redis.set(WORKER_LEASE_KEY.format(worker_id), self.token, nx=True, ex=self.ttl):
+                self.worker_id = worker_id
+                threading.Thread(target=self._renew, name='worker-id-lease', daemon=True).start()
+                logger.info(f"Leased worker id {worker_id}")
+                return worker_id
+        raise RuntimeError(f"No free worker id: all {MAX_WORKER_ID + 1} are leased")
+
+    def owned(self):
+        """Check in Redis that the lease still belongs to this process, taking it back if it expired"""
+        if self.redis.set(self.key, self.token, nx=True, ex=self.ttl):
+            return True
+        owner = self.redis.get(self.key)
+        if isinstance(owner, bytes):
+            owner = owner.decode()
+        return owner == self.token
+
+    def _renew(self):
+        while not self._stopped.wait(self.ttl / 3):
+            try:
+                if not self.owned():
+                    self.lost = True
+                    logger.error(f"Worker id {self.worker_id} was leased by another process; no more ids are issued")
+                    return
+                self.redis.expire(self.key, self.ttl)
+            except Exception as e:
+                logger.warning(f"Failed to renew worker id {self.worker_id}: {e}")
+
+    def release(self):
+        self._stopped.set()
+        try:
+            if not self.lost and self.owned():
+                self.redis.delete(self.key)
+        except Exception as e:
+            logger.warning(f"Failed to release worker id {self.worker_id}: {e}")
+
+
+class SnowflakeGenerator:
+    def __init__(self, worker_id, lease=None):
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"Worker id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self.lease = lease
+        self.last_ms = -1
+        self.sequence = 0
+        self._lock = threading.Lock()
+
+    def next_id(self):
+        if self.lease is not None and self.lease.lost:
+            raise RuntimeError(f"Worker id {self.worker_id} is no longer leased")
+        with self._lock:
+            # Never go back in time, even if the wall clock does
+            now = max(int(time.time() * 1000), self.last_ms)
+            if now == self.last_ms:
+                self.sequence = (self.sequence + 1) & SEQUENCE_MASK
+                if self.sequence == 0:
+                    # Sequence exhausted for this millisecond, continue in the next one
+                    now += 1
+            else:
+                self.sequence = 0
+            self.last_ms = now
+            return ((now - ID_EPOCH_MS) << (WORKER_BITS + SEQUENCE_BITS)) | \
+                (self.worker_id << SEQUENCE_BITS) | self.sequence
+
+    def close(self):
+        """Give a leased worker id back"""
+        if self.lease is not None:
+            self.lease.release()
+
+
+def id_timestamp(snowflake_id):
+    """Creation time encoded in an ID"""
+    ms = (snowflake_id >> (WORKER_BITS + SEQUENCE_BITS)) + ID_EPOCH_MS
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def create_id_generator(worker_id, redis_client):
+    """Generator for the configured worker id, or for one leased from Redis if none is configured"""
+    if worker_id is not None:
+        return SnowflakeGenerator(worker_id)
+    lease = WorkerIdLease(redis_client)
+    return SnowflakeGenerator(lease.acquire(), lease)
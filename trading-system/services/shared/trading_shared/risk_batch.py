@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Vectorized risk rules used by risk-engine and forecast-engine (backtests).
+
+These are the per-forecast checks and the risk score of
+RiskEngine.evaluate_forecast_risk. Its portfolio gates (portfolio VaR and
+drawdown limits) and the booking of approved trades as exposure depend on
+the positions open at the time and are not part of it. A forecast
+approved here may still be rejected by the live engine.
+"""
+
+import enum
+import numpy as np
+
+# Thresholds shared with RiskEngine.evaluate_forecast_risk
+MAX_PREDICTION = 0.1
+HIGH_VOLATILITY = 0.03
+MIN_RISK_SCORE = 0.5
+
+
+class RiskReason(enum.IntFlag):
+    """Compact reason codes for a risk decision (combined as bit flags)"""
+    NONE = 0
+    LOW_CONFIDENCE = 1
+    LARGE_PREDICTION = 2
+    POSITION_LIMIT = 4
+    HIGH_VOLATILITY = 8
+    LOW_RISK_SCORE = 16
+
+
+def describe_reasons(code):
+    """Return the reason names contained in a reason code"""
+    return [reason.name.lower() for reason in RiskReason if reason and code & reason]
+
+
+def evaluate_risk_batch(predictions, confidences, volatilities,
+                        risk_factor=1.0, position_size_limit=0.1,
+                        confidence_threshold=0.7, volatility_multiplier=1.0):
+    """
+    Vectorized form of the per-forecast checks of RiskEngine.evaluate_forecast_risk.
+
+    Takes equally sized arrays of predictions, confidences and volatilities
+    and returns a dict of arrays: risk_score, position_size, approved
+    (bool mask) and reasons (RiskReason bit flags as uint8). Scores match
+    the per-forecast implementation. Approvals match it before the
+    portfolio VaR and drawdown gates, which are not applied here.
+    """
+    predictions = np.asarray(predictions, dtype=np.float64)
+    confidences = np.asarray(confidences, dtype=np.float64)
+    volatilities = np.asarray(volatilities, dtype=np.float64)
+
+    reasons = np.zeros(predictions.shape, dtype=np.uint8)
+    risk_score = np.zeros(predictions.shape, dtype=np.float64)
+
+    # 1. Confidence check
+    low_confidence = confidences < confidence_threshold
+    reasons[low_confidence] |= RiskReason.LOW_CONFIDENCE
+    risk_score += np.where(low_confidence, 0.0, confidences * 0.3)
+
+    # 2. Prediction magnitude check
+    abs_prediction = np.abs(predictions)
+    large_prediction = abs_prediction > MAX_PREDICTION
+    reasons[large_prediction] |= RiskReason.LARGE_PREDICTION
+    risk_score += np.where(large_prediction, 0.0, (1 - abs_prediction) * 0.2)
+
+    # 3. Position size check
+    position_size = np.minimum(abs_prediction * risk_factor, position_size_limit)
+    over_limit = position_size > position_size_limit
+    reasons[over_limit] |= RiskReason.POSITION_LIMIT
+    risk_score += np.where(over_limit, 0.0, (1 - position_size / position_size_limit) * 0.3)
+
+    # 4. Volatility adjustment
+    adjusted_position_size = position_size * (1 - volatilities * volatility_multiplier)
+    high_volatility = volatilities > HIGH_VOLATILITY
+    reasons[high_volatility] |= RiskReason.HIGH_VOLATILITY
+    risk_score += np.where(high_volatility, 0.0, (1 - volatilities / HIGH_VOLATILITY) * 0.2)
+
+    # Approval decision
+    low_score = risk_score < MIN_RISK_SCORE
+    reasons[low_score] |= RiskReason.LOW_RISK_SCORE
+    approved = (
+        ~low_confidence &
+        (adjusted_position_size <= position_size_limit) &
+        ~low_score
+    )
+
+    return {
+        'risk_score': np.minimum(risk_score, 1.0),
+        'position_size': np.maximum(0, adjusted_position_size),
+        'approved': approved,
+        'reasons': reasons,
+    }
+
+
+def ewma_volatility(returns, decay=0.94, min_periods=10, default=0.025, block=128):
+    """
+    Vectorized form of MarketStateTracker.volatility over a return series.
+
+    Element i is the volatility known after return i: the square root of
+    the EWMA of squared returns, seeded with the first one, or `default`
+    while fewer than `min_periods` returns have been seen. The recursion
+    is solved in closed form per block of `block` returns, which keeps the
+    powers of `decay` far from underflow.
+    """
+    squared = np.square(np.asarray(returns, dtype=np.float64))
+    variance = np.empty_like(squared)
+    previous = squared[0] if len(squared) else 0.0
+
+    for start in range(0, len(squared), block):
+        chunk = squared[start:start + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        # v_k = decay^(k+1) * v_(-1) + (1 - decay) * sum_j decay^(k-j) * r_j^2
+        variance[start:start + len(chunk)] = powers * previous + (1 - decay) * np.cumsum(chunk / powers) * powers
+        previous = variance[start + len(chunk) - 1]
+
+    volatility = np.sqrt(variance)
+    volatility[:min_periods - 1] = default
+    return volatility
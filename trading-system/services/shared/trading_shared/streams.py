@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+import time
+import asyncio
+import logging
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+def publish_to_stream(redis_client, stream, payload, maxlen=100000):
+    """Append a message to a Redis Stream, trimming it to roughly `maxlen` entries"""
+    return redis_client.xadd(stream, {'data': payload}, maxlen=maxlen, approximate=True)
+
+
+class StreamConsumer:
+    """
+    Consumer-group reader for a Redis Stream (client with decode_responses=False).
+
+    Every replica joins the same group under its own consumer name, so
+    entries are shared out between replicas. An entry is acknowledged only
+    after the handler succeeds. Entries left pending by a failed handler or
+    a crashed replica are reclaimed once idle for `claim_idle_ms`. After
+    `max_deliveries` attempts they move to the `<stream>:dead` stream.
+    """
+
+    def __init__(self, redis_client, stream, group, consumer, handler,
+                 count=10, block_ms=5000, claim_idle_ms=60000, max_deliveries=5):
+        self.redis_client = redis_client
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer
+        self.handler = handler
+        self.count = count
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.dead_letter_stream = f"{stream}:dead"
+
+    def ensure_group(self):
+        """Create the consumer group (and the stream) if they do not exist yet"""
+        try:
+            self.redis_client.xgroup_create(self.stream, self.group, id='$', mkstream=True)
+            logger.info(f"Created consumer group {self.group} on {self.stream}")
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def process(self, entries):
+        """Run the handler for each entry and acknowledge the ones that succeeded"""
+        for entry_id, fields in entries:
+            try:
+                self.handler(fields[b'data'])
+            except Exception as e:
+                # Left pending; it is retried once it has been idle long enough
+                logger.error(f"Failed to handle {self.stream} entry {entry_id}: {e}")
+                continue
+            self.redis_client.xack(self.stream, self.group, entry_id)
+
+    def reclaim_pending(self):
+        """Take over entries other consumers (or earlier attempts) left unacknowledged"""
+        pending = self.redis_client.xpending_range(
+            self.stream, self.group, min='-', max='+', count=100, idle=self.claim_idle_ms
+        )
+        if not pending:
+            return
+
+        retry_ids = []
+        for entry in pending:
+            if entry['times_delivered'] >= self.max_deliveries:
+                self.dead_letter(entry['message_id'])
+            else:
+                retry_ids.append(entry['message_id'])
+
+        if retry_ids:
+            claimed = self.redis_client.xclaim(
+                self.stream, self.group, self.consumer, self.claim_idle_ms, retry_ids
+            )
+            logger.info(f"Reclaimed {len(claimed)} pending entries from {self.stream}")
+            # Entries deleted by MAXLEN trimming come back without fields
+            self.process([(entry_id, fields) for entry_id, fields in claimed if fields])
+
+    def dead_letter(self, entry_id):
+        """Move an entry that keeps failing to the dead-letter stream"""
+        entries = self.redis_client.xrange(self.stream, min=entry_id, max=entry_id)
+        if entries:
+            publish_to_stream(self.redis_client, self.dead_letter_stream, entries[0][1][b'data'])
+        self.redis_client.xack(self.stream, self.group, entry_id)
+        logger.warning(f"Moved {self.stream} entry {entry_id} to {self.dead_letter_stream}")
+
+    def run(self):
+        """Consume the stream until interrupted"""
+        self.ensure_group()
+        logger.info(f"Consuming {self.stream} as {self.consumer} in group {self.group}")
+
+        last_reclaim = 0.0
+        while True:
+            if time.monotonic() - last_reclaim >= self.claim_idle_ms / 1000:
+                self.reclaim_pending()
+                last_reclaim = time.monotonic()
+
+            response = self.redis_client.xreadgroup(
+                self.group, self.consumer, {self.stream: '>'},
+                count=self.count, block=self.block_ms
+            )
+            for _, entries in response or []:
+                self.process(entries)
+
+
+class AsyncStreamConsumer(StreamConsumer):
+    """
+    asyncio variant of StreamConsumer (client from redis.asyncio).
+
+    The handler is a coroutine taking (entry_id, data). It does not ack
+    itself: whoever finishes the work calls ack(entry_id), possibly long
+    after the handler returned. Entries still being worked on are skipped
+    when this consumer reclaims pending entries. Their idle time is also
+    reset every `claim_idle_ms / 3` (XCLAIM JUSTID), so other replicas
+    never see them as idle and slow work is not started twice.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_progress = set()
+
+    async def ensure_group(self):
+        try:
+            await self.redis_client.xgroup_create(self.stream, self.group, id='$', mkstream=True)
+            logger.info(f"Created consumer group {self.group} on {self.stream}")
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    async def ack(self, entry_id):
+        self.in_progress.discard(entry_id)
+        await self.redis_client.xack(self.stream, self.group, entry_id)
+
+    def release(self, entry_id):
+        """Give up on an entry without acking it; it is retried once reclaimed"""
+        self.in_progress.discard(entry_id)
+
+    async def process(self, entries):
+        for entry_id, fields in entries:
+            self.in_progress.add(entry_id)
+            try:
+                await self.handler(entry_id, fields[b'data'])
+            except Exception as e:
+                self.in_progress.discard(entry_id)
+                logger.error(f"Failed to handle {self.stream} entry {entry_id}: {e}")
+
+    async def reclaim_pending(self):
+        pending = await self.redis_client.xpending_range(
+            self.stream, self.group, min='-', max='+', count=100, idle=self.claim_idle_ms
+        )
+        retry_ids = []
+        for entry in pending:
+            if entry['message_id'] in self.in_progress:
+                continue
+            if entry['times_delivered'] >= self.max_deliveries:
+                await self.dead_letter(entry['message_id'])
+            else:
+                retry_ids.append(entry['message_id'])
+
+        if retry_ids:
+            claimed = await self.redis_client.xclaim(
+                self.stream, self.group, self.consumer, self.claim_idle_ms, retry_ids
+            )
+            logger.info(f"Reclaimed {len(claimed)} pending entries from {self.stream}")
+            await self.process([(entry_id, fields) for entry_id, fields in claimed if fields])
+
+    async def keep_alive(self):
+        """Reset the idle time of the entries in progress, so no other consumer reclaims them"""
+        while True:
+            await asyncio.sleep(self.claim_idle_ms / 3000)
+            if self.in_progress:
+                try:
+                    await self.redis_client.xclaim(
+                        self.stream, self.group, self.consumer, 0, list(self.in_progress), justid=True
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to refresh {len(self.in_progress)} entries in progress on {self.stream}: {e}")
+
+    async def dead_letter(self, entry_id):
+        entries = await self.redis_client.xrange(self.stream, min=entry_id, max=entry_id)
+        if entries:
+            await self.redis_client.xadd(
+                self.dead_letter_stream, {'data': entries[0][1][b'data']}, maxlen=100000, approximate=True
+            )
+        await self.redis_client.xack(self.stream, self.group, entry_id)
+        logger.warning(f"Moved {self.stream} entry {entry_id} to {self.dead_letter_stream}")
+
+    async def run(self):
+        await self.ensure_group()
+        logger.info(f"Consuming {self.stream} as {self.consumer} in group {self.group}")
+
+        keep_alive = asyncio.create_task(self.keep_alive())
+        try:
+            last_reclaim = 0.0
+            while True:
+                if time.monotonic() - last_reclaim >= self.claim_idle_ms / 1000:
+                    await self.reclaim_pending()
+                    last_reclaim = time.monotonic()
+
+                response = await self.redis_client.xreadgroup(
+                    self.group, self.consumer, {self.stream: '>'},
+                    count=self.count, block=self.block_ms
+                )
+                for _, entries in response or []:
+                    await self.process(entries)
+        finally:
+            keep_alive.cancel()